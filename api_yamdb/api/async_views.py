@@ -0,0 +1,104 @@
+"""Асинхронные входы для чтения каталога под ASGI.
+
+В Django 3.2 нет асинхронного ORM, а синхронные вьюхи под ASGI
+выполняются через `sync_to_async(thread_sensitive=True)`, то есть все
+по очереди в одном потоке. Здесь GET-запросы к произведениям, отзывам
+и комментариям уходят в отдельный пул потоков: событийный цикл держит
+соединения с медленными клиентами, а запросы к базе и рендеринг идут
+параллельно. Запись остаётся в потоке Django, как и раньше.
+
+Каждый поток пула держит своё соединение, поэтому пул не больше пула
+соединений `core.db.backends.postgresql_pool` за вычетом одного
+соединения для записи: лишние потоки только ждали бы свободного
+соединения до `DB_POOL_TIMEOUT`. Замеры и выбор между ASGI и WSGI —
+в README, раздел «Запуск под ASGI».
+"""
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.urls import URLPattern
+from rest_framework.permissions import SAFE_METHODS
+
+from core.metrics import instrument
+
+ASYNC_READ_ROUTES = (
+    'title-list', 'title-detail', 'title-stats',
+    'reviews-list', 'reviews-detail',
+    'comments-list', 'comments-detail',
+)
+
+_executor = None
+
+
+def read_workers():
+    """`ASYNC_READ_WORKERS`, но не больше соединений с базой, кроме одного.
+
+    Реплики получают те же `OPTIONS`, что и основная база, так что
+    лимит у них тот же.
+    """
+    workers = settings.ASYNC_READ_WORKERS
+    pool = settings.DATABASES['default'].get('OPTIONS', {}).get('pool')
+    if pool:
+        connections_limit = pool['max_size'] + pool['max_overflow']
+        workers = min(workers, max(connections_limit - 1, 1))
+    return workers
+
+
+def read_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=read_workers(),
+            thread_name_prefix='async-read',
+        )
+    return _executor
+
+
+def render_in_worker(view, request, *args, **kwargs):
+    # Сигналы request_started/finished приходят в поток Django,
+    # поэтому соединения рабочего потока закрываются здесь.
+    close_old_connections()
+    for connection in connections.all():
+        instrument(connection)
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """Асинхронная обёртка DRF-вьюхи: чтение идёт в пул потоков."""
+    read = sync_to_async(
+        functools.partial(render_in_worker, view),
+        thread_sensitive=False,
+        executor=read_executor(),
+    )
+    write = sync_to_async(view, thread_sensitive=True)
+
+    async def async_view(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return await read(request, *args, **kwargs)
+        return await write(request, *args, **kwargs)
+
+    async_view.__dict__.update(view.__dict__)
+    async_view.__name__ = view.__name__
+    return async_view
+
+
+def async_read_views(urlpatterns, names=ASYNC_READ_ROUTES):
+    """Заменяет вьюхи маршрутов `names` асинхронными обёртками."""
+    return [
+        URLPattern(
+            pattern.pattern, async_read_view(pattern.callback),
+            pattern.default_args, pattern.name,
+        )
+        if isinstance(pattern, URLPattern) and pattern.name in names
+        else pattern
+        for pattern in urlpatterns
+    ]
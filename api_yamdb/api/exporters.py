@@ -0,0 +1,94 @@
+import csv
+import json
+from collections import defaultdict
+
+from reviews.models import Title
+
+TITLE_FIELDS = (
+    'id', 'name', 'year', 'rating', 'description',
+    'category__name', 'category__slug',
+)
+
+
+def genres_by_title(title_ids):
+    genres = defaultdict(list)
+    rows = (
+        Title.genre.through.objects.filter(title_id__in=title_ids)
+        .order_by('genres_id')
+        .values_list('title_id', 'genres__name', 'genres__slug')
+    )
+    for title_id, name, slug in rows:
+        genres[title_id].append({'name': name, 'slug': slug})
+    return genres
+
+
+def iter_titles(chunk_size=1000):
+    """Произведения в форме ответа API, по `chunk_size` за раз.
+
+    `prefetch_related` не работает с `.iterator()`, поэтому жанры
+    подтягиваются отдельным запросом на каждую пачку: память зависит
+    только от размера пачки, а не от размера каталога.
+    """
+    rows = (
+        Title.objects.order_by('id')
+        .values(*TITLE_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield from serialize_chunk(chunk)
+            chunk = []
+    yield from serialize_chunk(chunk)
+
+
+def serialize_chunk(rows):
+    if not rows:
+        return
+    genres = genres_by_title([row['id'] for row in rows])
+    for row in rows:
+        category_slug = row.pop('category__slug')
+        category_name = row.pop('category__name')
+        row['category'] = (
+            {'name': category_name, 'slug': category_slug}
+            if category_slug is not None else None
+        )
+        row['genre'] = genres.get(row['id'], [])
+        yield row
+
+
+class Echo:
+    """Файлоподобный объект, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(titles):
+    for title in titles:
+        yield json.dumps(title, ensure_ascii=False) + '\n'
+
+
+def csv_lines(titles):
+    writer = csv.writer(Echo())
+    yield writer.writerow(
+        ('id', 'name', 'year', 'rating', 'description', 'category', 'genre')
+    )
+    for title in titles:
+        category = title['category']
+        yield writer.writerow((
+            title['id'],
+            title['name'],
+            title['year'],
+            title['rating'],
+            title['description'],
+            category['slug'] if category else '',
+            ','.join(genre['slug'] for genre in title['genre']),
+        ))
+
+
+EXPORT_FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv'),
+}
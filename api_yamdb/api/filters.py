@@ -1,16 +1,17 @@
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitlesFilter(filters.FilterSet):
     category = filters.CharFilter(
         field_name='category__slug',
-        lookup_expr='icontains'
+        lookup_expr='exact'
     )
     genre = filters.CharFilter(
         field_name='genre__slug',
-        lookup_expr='icontains'
+        lookup_expr='exact'
     )
     name = filters.CharFilter(
         field_name='name',
@@ -20,7 +21,11 @@ class TitlesFilter(filters.FilterSet):
         field_name='year',
         lookup_expr='icontains'
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,138 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from api.pagination import KeysetPagination
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+from reviews import leaderboards
+from reviews.models import LeaderboardEntry, Review
+
+# Полный просмотр таблицы и сортировка результата во временной структуре
+# в планах SQLite и PostgreSQL.
+SCAN_RE = re.compile(
+    r'\bSCAN (?:TABLE )?(?P<table>\w+)\s*$|Seq Scan on (?P<pg_table>\w+)'
+)
+SORT_RE = re.compile(r'USE TEMP B-TREE FOR ORDER BY|^\s*(?:->\s*)?Sort\b')
+
+
+def list_queryset(viewset_class, kwargs, params=None):
+    """Запрос страницы списка так, как его строит вьюсет."""
+    view = viewset_class(
+        action_map={'get': 'list'}, kwargs=kwargs, format_kwarg=None
+    )
+    view.args = ()
+    view.request = view.initialize_request(
+        APIRequestFactory().get('/', params or {})
+    )
+    queryset = view.filter_queryset(view.get_queryset())
+    lean_serializer_class = getattr(view, 'lean_serializer_class', None)
+    if lean_serializer_class is not None:
+        queryset = lean_serializer_class().rows(queryset)
+    if (params or {}).get('pagination') == 'cursor':
+        # Вторая страница: условие на кортеж от первой строки.
+        keyset = KeysetPagination(view.cursor_ordering)
+        queryset = queryset.order_by(*view.cursor_ordering)
+        first = queryset.first()
+        if first is not None:
+            queryset = queryset.filter(keyset.after(
+                [first[name] for name, _ in keyset.fields], reverse=False
+            ))
+    return queryset[:api_settings.PAGE_SIZE]
+
+
+def hot_paths(review):
+    nested = {'title_id': review.title_id}
+    comments = {**nested, 'review_id': review.pk}
+    category = review.title.category
+    return {
+        'titles-list': lambda: list_queryset(TitleViewSet, {}),
+        'titles-list-cursor': lambda: list_queryset(
+            TitleViewSet, {}, {'pagination': 'cursor'}
+        ),
+        'titles-by-category': lambda: list_queryset(
+            TitleViewSet, {},
+            {'category': category.slug if category else 'none'},
+        ),
+        'reviews-list': lambda: list_queryset(ReviewViewSet, nested),
+        'reviews-list-cursor': lambda: list_queryset(
+            ReviewViewSet, nested, {'pagination': 'cursor'}
+        ),
+        'comments-list': lambda: list_queryset(CommentViewSet, comments),
+        'comments-list-cursor': lambda: list_queryset(
+            CommentViewSet, comments, {'pagination': 'cursor'}
+        ),
+        'category-top': lambda: leaderboards.top(
+            LeaderboardEntry.CATEGORY, review.title.category_id or 0
+        ),
+        'category-top-bayesian': lambda: leaderboards.top(
+            LeaderboardEntry.CATEGORY, review.title.category_id or 0,
+            leaderboards.BAYESIAN,
+        ),
+        'review-of-author': lambda: Review.objects.filter(
+            title_id=review.title_id, author_id=review.author_id
+        ),
+        # Как в reviews.signals.author_renamed.
+        'reviews-of-author': lambda: (
+            review.author.reviews.order_by()
+            .values_list('title_id', flat=True).distinct()
+        ),
+    }
+
+
+def problems(plan):
+    found = []
+    for line in plan.splitlines():
+        scan = SCAN_RE.search(line)
+        if scan:
+            table = scan.group('table') or scan.group('pg_table')
+            found.append(f'полный просмотр таблицы {table}')
+        if SORT_RE.search(line):
+            found.append('сортировка без индекса')
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает планы запросов горячих путей API и отмечает полные '
+        'просмотры таблиц и сортировки без индекса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Завершиться с ошибкой, если найдены проблемы (для CI).',
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Имя пути; можно указать несколько раз.',
+        )
+
+    def handle(self, *args, **options):
+        review = Review.objects.select_related(
+            'title__category', 'author'
+        ).first()
+        if review is None:
+            raise CommandError(
+                'Нет ни одного отзыва: загрузите данные (import_csv).'
+            )
+        paths = hot_paths(review)
+        unknown = set(options['paths'] or ()) - set(paths)
+        if unknown:
+            raise CommandError(f'Неизвестные пути: {", ".join(unknown)}.')
+        flagged = 0
+        for name in options['paths'] or paths:
+            plan = paths[name]().explain()
+            found = problems(plan)
+            flagged += bool(found)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            for problem in found:
+                self.stdout.write(self.style.WARNING(f'  !! {problem}'))
+        if flagged and options['check']:
+            raise CommandError(f'Путей с проблемами в плане: {flagged}.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено путей: {len(options["paths"] or paths)}, '
+            f'с проблемами: {flagged}.'
+        ))
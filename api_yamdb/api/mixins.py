@@ -0,0 +1,248 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from core.metrics import registry, timed
+from reviews import leaderboards, versioning
+from reviews.models import Review, Title
+from reviews.versioning import current
+from .serializers import LeanTitleSerializer, TopTitlesQuerySerializer
+
+
+class MetricsMixin:
+    """Замеряет время вьюхи и сериализации для `core.metrics`."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with timed(request, 'view'):
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        to_representation = serializer.to_representation
+
+        def timed_representation(instance):
+            with timed(self.request, 'serializer'):
+                return to_representation(instance)
+
+        serializer.to_representation = timed_representation
+        return serializer
+
+
+class LeanListMixin:
+    """`list` через `lean_serializer_class`, минуя поля DRF.
+
+    Фильтры, пагинация (в том числе курсорная) и кэш ответа работают
+    как раньше: они получают queryset из `.values()`.
+    """
+    lean_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        lean = self.lean_serializer_class(
+            context=self.get_serializer_context()
+        )
+        rows = lean.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        with timed(request, 'serializer'):
+            data = lean.serialize(rows if page is None else page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+class LeaderboardMixin:
+    """`GET <slug>/top/`: первые места рейтинга категории или жанра.
+
+    Места читаются по индексу `LeaderboardEntry`, произведения — одним
+    запросом по их id, так что ответ стоит O(limit), а не O(каталог).
+    Рейтинг меняется вместе с версией `titles`.
+    """
+    leaderboard_kind = None
+    conditional_actions = ('list', 'retrieve', 'top')
+
+    def get_version_collections(self):
+        if self.action == 'top':
+            return (versioning.TITLES,)
+        return super().get_version_collections()
+
+    @action(detail=True)
+    def top(self, request, *args, **kwargs):
+        query = TopTitlesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        ranking = query.validated_data['ranking']
+        entries = list(leaderboards.top(
+            self.leaderboard_kind, self.get_object().pk, ranking,
+            query.validated_data['limit'],
+        ))
+        lean = LeanTitleSerializer()
+        with timed(request, 'serializer'):
+            titles = {
+                title['id']: title for title in lean.serialize(lean.rows(
+                    Title.objects.filter(
+                        pk__in=[entry['title_id'] for entry in entries]
+                    )
+                ))
+            }
+            results = [
+                {
+                    'rank': rank,
+                    'score': round(entry[ranking], 2),
+                    'reviews_count': entry['reviews_count'],
+                    'title': titles[entry['title_id']],
+                }
+                for rank, entry in enumerate(entries, 1)
+            ]
+        return Response({'ranking': ranking, 'results': results})
+
+
+class EarlyResponse(Exception):
+    """Ответ готов ещё в `initial()`, обработчик вызывать не нужно."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def version_etag(versions, renderer_format):
+    parts = [renderer_format]
+    for version in versions:
+        changed_at = version.changed_at and version.changed_at.timestamp()
+        parts.append(f'{version.name}:{version.version}:{changed_at}')
+    return quote_etag(md5('|'.join(parts).encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для чтения по версиям коллекций.
+
+    Версии читаются до запроса данных, поэтому при совпадении
+    `If-None-Match` или `If-Modified-Since` ответ 304 обходится одним
+    запросом к базе. Коллекции задаёт `get_version_collections()`.
+    """
+
+    version_collections = ()
+    conditional_actions = ('list', 'retrieve')
+
+    def get_version_collections(self):
+        return self.version_collections
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_headers = None
+        if (
+            request.method not in ('GET', 'HEAD')
+            or self.action not in self.conditional_actions
+        ):
+            return
+        versions = current(self.get_version_collections())
+        etag = version_etag(versions, request.accepted_renderer.format)
+        self.conditional_headers = {'ETag': etag}
+        changed = [
+            version.changed_at for version in versions if version.changed_at
+        ]
+        last_modified = int(max(changed).timestamp()) if changed else None
+        if last_modified is not None:
+            self.conditional_headers['Last-Modified'] = http_date(
+                last_modified
+            )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            raise EarlyResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, EarlyResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        headers = getattr(self, 'conditional_headers', None)
+        if headers and response.status_code in (200, 304):
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+
+def response_cache_key(request, etag):
+    """Ключ кэша: адрес, нормализованные параметры запроса и ETag.
+
+    Схема и хост входят в ключ: ссылки `next`/`previous` в данных ответа
+    абсолютные, и страница, закэшированная для внутреннего адреса или
+    http за прокси, не должна уходить клиентам с другим адресом.
+
+    Параметры сортируются, пустые значения отбрасываются: для фильтров
+    и пагинации `?year=` равносилен отсутствию параметра. В ETag уже
+    входят версии коллекций и формат ответа, поэтому запись после любой
+    правки просто перестаёт находиться по ключу.
+    """
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values if value
+    ))
+    url = f'{request.scheme}://{request.get_host()}{request.path}'
+    digest = md5(f'{url}?{query}|{etag}'.encode()).hexdigest()
+    return f'response:{digest}'
+
+
+class ResponseCacheMixin(ConditionalGetMixin):
+    """Кэширует данные ответов на чтение, см. `API_CACHE_ALIAS`."""
+
+    def initial(self, request, *args, **kwargs):
+        self.cache_key = None
+        super().initial(request, *args, **kwargs)
+        if self.conditional_headers is None:
+            return
+        self.cache_key = response_cache_key(
+            request, self.conditional_headers['ETag']
+        )
+        data = caches[settings.API_CACHE_ALIAS].get(self.cache_key)
+        if data is None:
+            registry.increment('yamdb_response_cache_misses_total')
+            return
+        registry.increment('yamdb_response_cache_hits_total')
+        self.cache_key = None
+        raise EarlyResponse(Response(data))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self.cache_key and response.status_code == 200:
+            caches[settings.API_CACHE_ALIAS].set(self.cache_key, response.data)
+        return response
+
+
+class NestedParentMixin:
+    """Родители вложенных маршрутов `titles/{title_id}/reviews/...`.
+
+    Каждый родитель читается одним запросом и запоминается на запросе,
+    так что queryset, валидация сериализатора и сохранение его не
+    перечитывают. Отзыв ищется вместе с `title_id` из URL: отзыв
+    другого произведения, как и скрытый модератором, даёт 404.
+    """
+
+    def get_parent(self, model, **lookups):
+        parents = self.request.__dict__.setdefault('nested_parents', {})
+        key = (model, tuple(sorted(lookups.items())))
+        if key not in parents:
+            parents[key] = get_object_or_404(model, **lookups)
+        return parents[key]
+
+    def get_title(self):
+        return self.get_parent(Title, pk=self.kwargs['title_id'])
+
+    def get_review(self):
+        return self.get_parent(
+            Review,
+            pk=self.kwargs['review_id'],
+            title_id=self.kwargs['title_id'],
+            is_hidden=False,
+        )
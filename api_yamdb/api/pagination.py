@@ -0,0 +1,185 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Больше строк за страницу не отдаётся, что бы ни пришло в `?limit=`.
+MAX_PAGE_SIZE = 1000
+
+
+class KeysetPagination(BasePagination):
+    """Курсор — значения всех полей `ordering` у крайней строки страницы.
+
+    Следующая страница выбирается условием на кортеж, например
+    `(pub_date, id) < (:pub_date, :id)`, без OFFSET, поэтому одинаковые
+    значения первого поля не заставляют пропускать строки. Условие
+    записано как `pub_date <= :pub_date AND (pub_date < :pub_date OR
+    id < :id)`: первая часть даёт поиск по составному индексу.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    max_page_size = MAX_PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+        self.fields = [
+            (field.lstrip('-'), field.startswith('-')) for field in ordering
+        ]
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True, cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+
+    def encode_cursor(self, row, reverse):
+        position = []
+        for name, _ in self.fields:
+            value = row[name] if isinstance(row, dict) else getattr(
+                row, name
+            )
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            position.append(value)
+        cursor = json.dumps({'p': position, 'r': int(reverse)})
+        return replace_query_param(
+            self.base_url, self.cursor_query_param,
+            b64encode(cursor.encode()).decode(),
+        )
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            cursor = json.loads(b64decode(encoded.encode()).decode())
+            position = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(
+                    self.fields, cursor['p'], strict=True
+                )
+            ]
+            return position, bool(cursor['r'])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def after(self, position, reverse):
+        """Строки за позицией в порядке обхода (при reverse — перед ней)."""
+        def lookup(name, descending, strict=True):
+            operator = 'lt' if descending != reverse else 'gt'
+            return f'{name}__{operator}' if strict else f'{name}__{operator}e'
+
+        (lead, descending), lead_value = self.fields[0], position[0]
+        condition = Q()
+        equal = {}
+        for (name, field_descending), value in zip(self.fields, position):
+            condition |= Q(**equal, **{lookup(name, field_descending): value})
+            equal[name] = value
+        return Q(**{lookup(lead, descending, False): lead_value}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        position, reverse = self.decode_cursor(request, queryset.model)
+        ordering = self.ordering
+        if reverse:
+            ordering = [
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            ]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+        self.next_link = (
+            self.encode_cursor(rows[-1], False)
+            if has_next and rows else None
+        )
+        if has_previous and rows:
+            self.previous_link = self.encode_cursor(rows[0], True)
+        elif has_previous:
+            # Пустая страница за последней строкой: назад — в начало.
+            self.previous_link = remove_query_param(
+                self.base_url, self.cursor_query_param
+            )
+        else:
+            self.previous_link = None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.next_link),
+            ('previous', self.previous_link),
+            ('results', data),
+        ]))
+
+
+class LimitOffsetOrCursorPagination(BasePagination):
+    """Limit/offset по умолчанию, курсор — по запросу клиента.
+
+    Курсорный режим включается параметром `?pagination=cursor` (или
+    наличием `cursor` в ссылках `next`/`previous`). Он не считает
+    COUNT(*) и не пропускает offset строк, поэтому глубокие страницы
+    стоят столько же, сколько первая. Порядок задаёт атрибут вьюсета
+    `cursor_ordering`, под него в моделях заведены составные индексы.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    def __init__(self):
+        self.paginator = LimitOffsetPagination()
+        self.paginator.max_limit = MAX_PAGE_SIZE
+
+    def use_cursor(self, request, view):
+        if getattr(view, 'cursor_ordering', None) is None:
+            return False
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request, view):
+            self.paginator = KeysetPagination(view.cursor_ordering)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    @property
+    def display_page_controls(self):
+        return self.paginator.display_page_controls
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    def get_schema_fields(self, view):
+        return self.paginator.get_schema_fields(view)
+
+    def get_schema_operation_parameters(self, view):
+        return self.paginator.get_schema_operation_parameters(view)
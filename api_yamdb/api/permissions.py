@@ -34,6 +34,14 @@ class AdminOnly(permissions.BasePermission):
         )
 
 
+class ModeratorOrAdmin(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return (
+            request.user.is_authenticated
+            and (request.user.is_moderator or request.user.is_admin)
+        )
+
+
 class AuthorOrHasRoleOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
@@ -47,7 +55,7 @@ class AuthorOrHasRoleOrReadOnly(permissions.BasePermission):
             or request.user.is_superuser
             or request.user.is_admin
             or request.user.is_moderator
-            or obj.author == request.user
+            or obj.author_id == request.user.id
         )
 
 # Перпишен ReviewAndCommentPermission нигде не использовался, забыл его удалить
@@ -0,0 +1,69 @@
+"""JSON через orjson, а без него — через стандартный `json`.
+
+orjson сериализует `ReturnDict`, `OrderedDict` и `ReturnList` как
+обычные dict и list, без промежуточных копий, и сразу отдаёт байты
+UTF-8. Типы, которых он не знает (Decimal, ленивые строки, QuerySet),
+а также даты передаются кодировщику DRF, поэтому ответ совпадает
+с `JSONRenderer` байт в байт. Отступы orjson умеет только по два
+пробела, так что запросы с `indent` (в том числе от Browsable API)
+рендерятся стандартным путём.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        ret = orjson.dumps(
+            data, default=self.encoder_class().default,
+            option=ORJSON_OPTIONS,
+        )
+        # Как и JSONRenderer: JSON должен оставаться подмножеством JS.
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if (
+            orjson is None
+            or not self.strict
+            or encoding.lower().replace('-', '') != 'utf8'
+        ):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson, как и strict-режим DRF, не принимает NaN и Infinity.
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -1,11 +1,16 @@
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.utils.encoding import smart_str
 from rest_framework import serializers
-from django.shortcuts import get_object_or_404
-from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.exceptions import NotFound
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import User, Genres, Category, Review, Comment, Title
+from core.tokens import RoleAccessToken
+from reviews import bulk, leaderboards, moderation
+from reviews.models import (SCORES, User, Genres, Category, Review, Comment,
+                            Title, TitleStats)
+from .exporters import genres_by_title
 
 
 class SignUpSerializer(serializers.ModelSerializer):
@@ -22,11 +27,7 @@ class SignUpSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         user = User.objects.create_user(**validated_data)
-        user.email_user(
-            subject='confirmation_code',
-            message=user.confirmation_code,
-            fail_silently=False
-        )
+        user.send_confirmation_code()
         return {
             'email': user.email,
             'username': user.username,
@@ -64,7 +65,7 @@ class TokenSerializer(serializers.ModelSerializer, TokenObtainPairSerializer):
                 'Invalid confirmation_code.'
             )
 
-        access = AccessToken.for_user(self.user)
+        access = RoleAccessToken.for_user(self.user)
 
         return {
             'token': str(access)
@@ -95,7 +96,7 @@ class UserSerializer(serializers.ModelSerializer):
 class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
-        exclude = ('id',)
+        exclude = ('id', 'updated_at')
         model = Category
         lookup_field = 'slug'
 
@@ -103,22 +104,46 @@ class CategorySerializer(serializers.ModelSerializer):
 class GenreSerializer(serializers.ModelSerializer):
 
     class Meta:
-        exclude = ('id',)
+        exclude = ('id', 'updated_at')
         model = Genres
         lookup_field = 'slug'
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    scores = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    class Meta:
+        fields = ('scores', 'reviews_count', 'comments_count',
+                  'last_review_at')
+        model = TitleStats
+
+
 class FirstTitleSerializer(serializers.ModelSerializer):
+    """Поле `stats` выводится, только если в контексте `expand_stats`."""
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
-    rating = serializers.IntegerField(
-        source='reviews__score__avg', read_only=True
-    )
+    rating = serializers.IntegerField(read_only=True)
+    stats = serializers.SerializerMethodField()
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'description', 'genre',
+            'category', 'stats',
+        )
         model = Title
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get('expand_stats'):
+            self.fields.pop('stats')
+
+    def get_stats(self, title):
+        # Без строки статистики (загрузка в обход сигналов) — нули.
+        stats = getattr(title, 'stats', None) or TitleStats(title=title)
+        return TitleStatsSerializer(stats).data
+
 
 class SecondTitleSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
@@ -133,10 +158,93 @@ class SecondTitleSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('score_sum', 'score_count', 'updated_at')
+        read_only_fields = ('rating',)
         model = Title
 
 
+class PrefetchedSlugRelatedField(serializers.SlugRelatedField):
+    """Как `SlugRelatedField`, но ищет объект в словаре из контекста.
+
+    Словарь `{slug: объект}` под ключом `objects_key` заполняет
+    `BulkTitleListSerializer` сразу для всех элементов запроса.
+    """
+
+    def __init__(self, objects_key, **kwargs):
+        self.objects_key = objects_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return self.context[self.objects_key][smart_str(data)]
+        except KeyError:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data),
+            )
+
+
+def slugs(value):
+    if isinstance(value, str):
+        return {value}
+    if isinstance(value, list):
+        return {slug for slug in value if isinstance(slug, str)}
+    return set()
+
+
+class BulkTitleListSerializer(serializers.ListSerializer):
+    """Создание пачки произведений: всё или ничего.
+
+    Категории и жанры всех элементов читаются двумя запросами до
+    валидации; ошибки возвращаются списком, по словарю на элемент.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            limit = settings.TITLES_BULK_MAX
+            if len(data) > limit:
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        f'Не больше {limit} произведений за запрос.'
+                    ]
+                })
+            items = [item for item in data if isinstance(item, dict)]
+            self.context['categories'] = Category.objects.in_bulk(
+                set().union(*(slugs(item.get('category')) for item in items)),
+                field_name='slug',
+            )
+            self.context['genres'] = Genres.objects.in_bulk(
+                set().union(*(slugs(item.get('genre')) for item in items)),
+                field_name='slug',
+            )
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        titles = [
+            Title(**{
+                field: value for field, value in item.items()
+                if field != 'genre'
+            })
+            for item in validated_data
+        ]
+        return bulk.create_titles(titles, [
+            [genre.pk for genre in item['genre']] for item in validated_data
+        ])
+
+
+class BulkTitleSerializer(SecondTitleSerializer):
+    category = PrefetchedSlugRelatedField(
+        'categories', queryset=Category.objects.all(), slug_field='slug'
+    )
+    genre = PrefetchedSlugRelatedField(
+        'genres', queryset=Genres.objects.all(), slug_field='slug',
+        many=True,
+    )
+
+    class Meta(SecondTitleSerializer.Meta):
+        list_serializer_class = BulkTitleListSerializer
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатов для отзывов."""
     author = serializers.SlugRelatedField(
@@ -146,17 +254,6 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
     score = serializers.IntegerField(max_value=10, min_value=1)
 
-    def validate(self, data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == 'POST':
-            if Review.objects.filter(title=title, author=author).exists():
-                raise ValidationError('Нельзя добавить более одного отзыва'
-                                      'на произведение')
-        return data
-
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
@@ -173,3 +270,156 @@ class CommentsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class TopTitlesQuerySerializer(serializers.Serializer):
+    """Параметры `?ranking=` и `?limit=` рейтинга категории или жанра."""
+    ranking = serializers.ChoiceField(
+        choices=tuple(leaderboards.RANKINGS), default=leaderboards.AVERAGE
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class ModerationSerializer(serializers.Serializer):
+    """Тело POST /api/v1/moderation/: действие и что модерировать.
+
+    `authors` — имена пользователей, их отзывы и комментарии
+    модерируются целиком; в `validated_data` они заменяются на id.
+    """
+    action = serializers.ChoiceField(choices=moderation.ACTIONS)
+    reviews = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), default=list
+    )
+    comments = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), default=list
+    )
+    authors = serializers.ListField(
+        child=serializers.CharField(), default=list
+    )
+
+    def validate_authors(self, usernames):
+        users = User.objects.in_bulk(set(usernames), field_name='username')
+        unknown = sorted(set(usernames) - users.keys())
+        if unknown:
+            raise serializers.ValidationError(
+                f'Пользователи не найдены: {", ".join(unknown)}.'
+            )
+        return [user.pk for user in users.values()]
+
+    def validate(self, data):
+        count = sum(
+            len(data[field]) for field in ('reviews', 'comments', 'authors')
+        )
+        if not count:
+            raise serializers.ValidationError(
+                'Укажите отзывы, комментарии или авторов.'
+            )
+        limit = settings.MODERATION_BATCH_MAX
+        if count > limit:
+            raise serializers.ValidationError(
+                f'Не больше {limit} id и авторов за запрос.'
+            )
+        return data
+
+
+class LeanSerializer:
+    """Списки только для чтения без полей DRF на каждый объект.
+
+    Словари собираются прямо из строк `.values()` и по форме совпадают
+    с выводом обычного сериализатора списка; это сверяет
+    tests/test_26_lean_serializers.py.
+    """
+    values = ()
+    pub_date = serializers.DateTimeField()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+
+    def rows(self, queryset):
+        return queryset.prefetch_related(None).values(*self.values)
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class LeanTitleSerializer(LeanSerializer):
+    """Как `FirstTitleSerializer(many=True)`."""
+    values = (
+        'id', 'name', 'year', 'rating', 'description',
+        'category__name', 'category__slug',
+    )
+    stats_values = (
+        *(f'stats__score_{score}' for score in SCORES),
+        'stats__reviews_count', 'stats__comments_count',
+        'stats__last_review_at',
+    )
+
+    def rows(self, queryset):
+        values = self.values
+        if self.context.get('expand_stats'):
+            values += self.stats_values
+        return queryset.prefetch_related(None).values(*values)
+
+    def serialize(self, rows):
+        rows = list(rows)
+        genres = genres_by_title([row['id'] for row in rows]) if rows else {}
+        items = [
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'year': row['year'],
+                'rating': row['rating'],
+                'description': row['description'],
+                'genre': genres.get(row['id'], []),
+                'category': {
+                    'name': row['category__name'],
+                    'slug': row['category__slug'],
+                } if row['category__slug'] is not None else None,
+            }
+            for row in rows
+        ]
+        if self.context.get('expand_stats'):
+            for item, row in zip(items, rows):
+                item['stats'] = self.stats(row)
+        return items
+
+    def stats(self, row):
+        # LEFT JOIN: без строки статистики все поля None.
+        return {
+            'scores': {
+                str(score): row[f'stats__score_{score}'] or 0
+                for score in SCORES
+            },
+            'reviews_count': row['stats__reviews_count'] or 0,
+            'comments_count': row['stats__comments_count'] or 0,
+            'last_review_at': self.pub_date.to_representation(
+                row['stats__last_review_at']
+            ),
+        }
+
+
+class LeanReviewSerializer(LeanSerializer):
+    """Как `ReviewSerializer(many=True)`."""
+    values = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': self.pub_date.to_representation(row['pub_date']),
+        }
+
+
+class LeanCommentSerializer(LeanSerializer):
+    """Как `CommentsSerializer(many=True)`."""
+    values = ('id', 'text', 'author__username', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': self.pub_date.to_representation(row['pub_date']),
+        }
@@ -1,10 +1,13 @@
-from django.urls import include, path
+from django.conf import settings
+from django.urls import include, path, re_path
 from rest_framework import routers
 
+from .async_views import async_read_views
 from .views import (SignUpView, TokenView,
                     UserViewSet, CategoryViewSet,
                     GenreViewSet, TitleViewSet, CommentViewSet,
-                    ReviewViewSet,)
+                    ReviewViewSet, TitleExportView, MetricsView,
+                    ModerationView,)
 
 v1_router = routers.DefaultRouter()
 v1_router.register('users', UserViewSet)
@@ -22,6 +25,10 @@ v1_router.register(
     basename='reviews'
 )
 
+v1_urls = v1_router.urls
+if settings.ASYNC_READ_VIEWS:
+    v1_urls = async_read_views(v1_urls)
+
 urlpatterns = [
     path(
         'v1/auth/signup/',
@@ -33,5 +40,12 @@ urlpatterns = [
         TokenView.as_view(),
         name='auth-token'
     ),
-    path('v1/', include(v1_router.urls)),
+    re_path(
+        r'^v1/export/titles\.(?P<export_format>ndjson|csv)$',
+        TitleExportView.as_view(),
+        name='export-titles'
+    ),
+    path('v1/_metrics', MetricsView.as_view(), name='metrics'),
+    path('v1/moderation/', ModerationView.as_view(), name='moderation'),
+    path('v1/', include(v1_urls)),
 ]
@@ -1,7 +1,9 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import filters, status, viewsets
-from django.db.models import Avg
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.decorators import action
 from rest_framework.mixins import (
@@ -12,13 +14,24 @@ from rest_framework.mixins import (
 )
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from rest_framework.filters import SearchFilter
 from rest_framework.viewsets import GenericViewSet
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.views import TokenViewBase
 
-from reviews.models import User, Category, Genres, Title, Review
+from core.metrics import registry
+from reviews import moderation, versioning
+from reviews.models import (User, Category, Genres, LeaderboardEntry, Title,
+                            TitleStats, Review, Comment)
+from .exporters import EXPORT_FORMATS, iter_titles
 from .filters import TitlesFilter
-from .permissions import AdminOnly, AdminOrReadOnly, AuthorOrHasRoleOrReadOnly
+from .mixins import (ConditionalGetMixin, LeaderboardMixin, LeanListMixin,
+                     MetricsMixin, NestedParentMixin, ResponseCacheMixin)
+from .pagination import LimitOffsetOrCursorPagination
+from .permissions import (AdminOnly, AdminOrReadOnly,
+                          AuthorOrHasRoleOrReadOnly, ModeratorOrAdmin)
 from .serializers import (
     SignUpSerializer,
     TokenSerializer,
@@ -27,12 +40,19 @@ from .serializers import (
     GenreSerializer,
     FirstTitleSerializer,
     SecondTitleSerializer,
+    BulkTitleSerializer,
+    TitleStatsSerializer,
     CommentsSerializer,
     ReviewSerializer,
+    ModerationSerializer,
+    LeanCommentSerializer,
+    LeanReviewSerializer,
+    LeanTitleSerializer,
 )
 
 
-class SignUpView(CreateModelMixin,
+class SignUpView(MetricsMixin,
+                 CreateModelMixin,
                  RetrieveModelMixin,
                  viewsets.GenericViewSet):
     queryset = User.objects.all()
@@ -66,22 +86,19 @@ class SignUpView(CreateModelMixin,
         serializer = self.get_serializer(request.data)
         username = serializer.data["username"]
         user = get_object_or_404(User, username=username)
-        user.email_user(
-            subject='confirmation_code',
-            message=user.confirmation_code,
-            fail_silently=False
-        )
+        user.send_confirmation_code()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TokenView(TokenViewBase):
+class TokenView(MetricsMixin, TokenViewBase):
     permission_classes = (AllowAny,)
     serializer_class = TokenSerializer
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(MetricsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    authentication_classes = (JWTAuthentication,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
 
@@ -134,9 +151,12 @@ class UserViewSet(viewsets.ModelViewSet):
         return (AdminOnly(),)
 
 
-class CategoryViewSet(CreateModelMixin, ListModelMixin,
-                      DestroyModelMixin, GenericViewSet):
+class CategoryViewSet(MetricsMixin, LeaderboardMixin, ResponseCacheMixin,
+                      CreateModelMixin, ListModelMixin, DestroyModelMixin,
+                      GenericViewSet):
     queryset = Category.objects.all()
+    leaderboard_kind = LeaderboardEntry.CATEGORY
+    version_collections = (versioning.CATEGORIES,)
     serializer_class = CategorySerializer
     permission_classes = (AdminOrReadOnly,)
     filter_backends = (SearchFilter,)
@@ -144,9 +164,12 @@ class CategoryViewSet(CreateModelMixin, ListModelMixin,
     lookup_field = 'slug'
 
 
-class GenreViewSet(CreateModelMixin, ListModelMixin,
-                   DestroyModelMixin, GenericViewSet):
+class GenreViewSet(MetricsMixin, LeaderboardMixin, ResponseCacheMixin,
+                   CreateModelMixin, ListModelMixin, DestroyModelMixin,
+                   GenericViewSet):
     queryset = Genres.objects.all()
+    leaderboard_kind = LeaderboardEntry.GENRE
+    version_collections = (versioning.GENRES,)
     serializer_class = GenreSerializer
     permission_classes = (AdminOrReadOnly,)
     filter_backends = (SearchFilter,)
@@ -154,49 +177,200 @@ class GenreViewSet(CreateModelMixin, ListModelMixin,
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(MetricsMixin, ResponseCacheMixin, LeanListMixin,
+                   viewsets.ModelViewSet):
+    # Жанры по id, как в LeanTitleSerializer и выгрузке.
     queryset = (
-        Title.objects.all().annotate(Avg('reviews__score')).order_by('name')
+        Title.objects.select_related('category')
+        .prefetch_related(Prefetch('genre', Genres.objects.order_by('id')))
+        .order_by('name')
     )
+    lean_serializer_class = LeanTitleSerializer
     permission_classes = (AdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitlesFilter
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('name', 'id')
+    # Иначе stats_of() получил бы нечисловой id.
+    lookup_value_regex = r'\d+'
+    version_collections = (versioning.TITLES,)
+    conditional_actions = ('list', 'retrieve', 'stats')
+
+    def expands_stats(self):
+        """`?expand=stats`: статистика внутри каждого произведения."""
+        return (
+            self.action in ('list', 'retrieve')
+            and 'stats' in self.request.query_params.get('expand', '')
+            .split(',')
+        )
+
+    def get_version_collections(self):
+        if self.action == 'stats':
+            return (versioning.stats_of(self.kwargs['pk']),)
+        if self.expands_stats():
+            # Комментарии меняют статистику, но не версию `titles`.
+            return (versioning.TITLES, versioning.TITLE_STATS)
+        return self.version_collections
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.expands_stats():
+            return queryset.select_related('stats')
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand_stats'] = self.expands_stats()
+        return context
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return FirstTitleSerializer
+        if self.action == 'stats':
+            return TitleStatsSerializer
+        if self.action == 'bulk':
+            return BulkTitleSerializer
         return SecondTitleSerializer
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Создаёт список произведений целиком или не создаёт ничего."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+        return Response(
+            {'ids': [title.pk for title in titles]},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """Гистограмма оценок и счётчики произведения."""
+        title = get_object_or_404(
+            Title.objects.select_related('stats'), pk=pk
+        )
+        stats = getattr(title, 'stats', None) or TitleStats(title=title)
+        return Response(self.get_serializer(stats).data)
+
+
+class TitleExportView(MetricsMixin, APIView):
+    """Выгрузка всего каталога одним потоковым ответом."""
+
+    permission_classes = (AdminOnly,)
+    chunk_size = 1000
+
+    def get(self, request, export_format):
+        render, content_type = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            render(iter_titles(self.chunk_size)), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="titles.{export_format}"'
+        )
+        return response
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class MetricsView(APIView):
+    """Метрики процесса в текстовом формате Prometheus."""
+
+    permission_classes = (AdminOnly,)
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+class ModerationView(MetricsMixin, APIView):
+    """Массовое удаление и скрытие отзывов и комментариев.
+
+    Права проверяются один раз на весь запрос, без проверки каждого
+    объекта, а всё изменение идёт одной транзакцией.
+    """
+
+    permission_classes = (ModeratorOrAdmin,)
+
+    def post(self, request):
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        summary = moderation.moderate(
+            data['action'],
+            review_ids=data['reviews'],
+            comment_ids=data['comments'],
+            author_ids=data['authors'],
+        )
+        return Response({'action': data['action'], **summary})
+
+
+class ReviewViewSet(MetricsMixin, ConditionalGetMixin, NestedParentMixin,
+                    LeanListMixin, viewsets.ModelViewSet):
     """Вьюсет для отзывов."""
 
     serializer_class = ReviewSerializer
+    lean_serializer_class = LeanReviewSerializer
     permission_classes = (AuthorOrHasRoleOrReadOnly, )
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
+
+    def get_version_collections(self):
+        return (versioning.reviews_of(self.kwargs.get('title_id')),)
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        # Для одного отзыва произведение проверяет сам фильтр по title_id.
+        if self.action == 'list':
+            self.get_title()
+        return Review.objects.filter(
+            title_id=self.kwargs['title_id'], is_hidden=False
+        ).select_related('author')
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        # Повторный отзыв отсекает ограничение unique_review_per_author:
+        # проверка exists() перед вставкой не спасает от гонки.
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=title, author=self.request.user
+            ).exists():
+                raise
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Нельзя добавить более одного отзыва на произведение.'
+            ]})
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Смена оценки сдвигает рейтинг и гистограмму в TitleStats.
+        serializer.save()
+
+
+class CommentViewSet(MetricsMixin, ConditionalGetMixin, NestedParentMixin,
+                     LeanListMixin, viewsets.ModelViewSet):
     """Вьюсет для комментариев."""
 
     serializer_class = CommentsSerializer
+    lean_serializer_class = LeanCommentSerializer
     permission_classes = (AuthorOrHasRoleOrReadOnly, )
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
 
-    def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        return review.comments.all()
+    def get_version_collections(self):
+        return (versioning.comments_of(self.kwargs.get('review_id')),)
 
+    def get_queryset(self):
+        if self.action == 'list':
+            self.get_review()
+        return Comment.objects.filter(
+            review_id=self.kwargs['review_id'],
+            review__title_id=self.kwargs['title_id'],
+            review__is_hidden=False,
+            is_hidden=False,
+        ).select_related('author')
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        serializer.save(author=self.request.user, review=review)
+        # Счётчик комментариев в TitleStats меняется в той же транзакции.
+        serializer.save(author=self.request.user, review=self.get_review())
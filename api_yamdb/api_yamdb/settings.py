@@ -26,11 +26,14 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'django_filters',
+    'core',
     'api',
     'reviews',
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.db.replicas.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,6 +43,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Сколько последних замеров на маршрут хранить для квантилей.
+METRICS_WINDOW = 1024
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -64,13 +70,89 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+DB_ENGINE = os.getenv('DB_ENGINE', 'core.db.backends.sqlite3')
+
+# Профиль SQLite для `core.db.backends.sqlite3`: WAL, чтобы читатели не
+# ждали писателей, и крупные кэш и mmap. Значения — как в PRAGMA.
+SQLITE_PRAGMAS = {
+    'busy_timeout': int(os.getenv('DB_SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'journal_mode': os.getenv('DB_SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('DB_SQLITE_SYNCHRONOUS', 'normal'),
+    'mmap_size': int(os.getenv('DB_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    'cache_size': -int(os.getenv('DB_SQLITE_CACHE_KB', 64 * 1024)),
+    'temp_store': 'memory',
 }
 
+if DB_ENGINE.endswith('sqlite3'):
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.getenv('DB_NAME', 'api_yamdb'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+        }
+    }
+
+# Постоянные соединения: 0 — закрывать после каждого запроса, None — без
+# ограничения. С CONN_HEALTH_CHECKS соединение, оборванное между
+# запросами, проверяется и переоткрывается в начале следующего.
+DB_CONN_MAX_AGE = os.getenv('DB_CONN_MAX_AGE', '0')
+DATABASES['default']['CONN_MAX_AGE'] = (
+    None if DB_CONN_MAX_AGE == 'none' else int(DB_CONN_MAX_AGE)
+)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = (
+    os.getenv('DB_CONN_HEALTH_CHECKS', '') == '1'
+)
+
+if DB_ENGINE == 'core.db.backends.sqlite3':
+    DATABASES['default']['OPTIONS'] = {'pragmas': SQLITE_PRAGMAS}
+elif DB_ENGINE == 'core.db.backends.postgresql_pool':
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'max_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_POOL_OVERFLOW', 10)),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+            'recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+            'pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+        },
+    }
+
+# Реплики для чтения: DB_REPLICAS — через запятую файлы SQLite (от
+# BASE_DIR) или хосты PostgreSQL. GET-запросы к API читают с них по кругу,
+# а после записи клиент REPLICA_PIN_SECONDS секунд читает из default.
+DB_REPLICAS = [
+    replica for replica in os.getenv('DB_REPLICAS', '').split(',') if replica
+]
+DATABASE_REPLICAS = []
+for idx, replica in enumerate(DB_REPLICAS, start=1):
+    alias = f'replica{idx}'
+    DATABASES[alias] = {
+        **DATABASES['default'], 'TEST': {'MIRROR': 'default'},
+    }
+    if DB_ENGINE.endswith('sqlite3'):
+        DATABASES[alias]['NAME'] = BASE_DIR / replica
+    else:
+        DATABASES[alias]['HOST'] = replica
+    if DB_ENGINE == 'core.db.backends.sqlite3':
+        DATABASES[alias]['OPTIONS'] = {
+            'pragmas': {**SQLITE_PRAGMAS, 'query_only': 1},
+        }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+REPLICA_PIN_CACHE = 'default'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.'
@@ -110,11 +192,20 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.jwt_authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 SIMPLE_JWT = {
@@ -129,6 +220,63 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+# Сколько секунд после смены роли или имени не доверять claims старых
+# токенов. Метки отзыва хранит кэш JWT_CLAIMS_REVOCATION_CACHE; при
+# нескольких процессах он должен быть общим (`manage.py check --deploy`
+# предупредит). Если кэш недоступен, claims не используются и
+# пользователь читается из базы.
+JWT_CLAIMS_REVOCATION_TTL = SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds()
+JWT_CLAIMS_REVOCATION_CACHE = 'auth'
+
+# Кэш ответов каталога (`api.mixins.ResponseCacheMixin`). Ключ включает
+# версии коллекций, поэтому записи не инвалидируются, а вытесняются
+# по TIMEOUT. В проде — общий для процессов бэкенд: файловый
+# (`django.core.cache.backends.filebased.FileBasedCache`) или Redis.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.getenv(
+            'API_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('API_CACHE_LOCATION', 'api-responses'),
+        'TIMEOUT': int(os.getenv('API_CACHE_TIMEOUT', 300)),
+    },
+    'auth': {
+        'BACKEND': os.getenv(
+            'AUTH_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('AUTH_CACHE_LOCATION', 'jwt-revocations'),
+    },
+}
+API_CACHE_ALIAS = 'api'
+
+# Чтение произведений, отзывов и комментариев через асинхронные вьюхи
+# (`api.async_views`). Включает asgi.py: под WSGI обёртка только мешает.
+# ASYNC_READ_WORKERS — потоков для ORM, столько же соединений с базой;
+# с пулом соединений не больше DB_POOL_SIZE + DB_POOL_OVERFLOW - 1.
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', '') == '1'
+ASYNC_READ_WORKERS = int(os.getenv('ASYNC_READ_WORKERS', 16))
+
+# Рейтинги категорий и жанров (`reviews.leaderboards`): в них попадают
+# произведения не меньше чем с LEADERBOARD_MIN_REVIEWS отзывами.
+# Байесовская оценка — (PRIOR_WEIGHT * PRIOR_MEAN + сумма) /
+# (PRIOR_WEIGHT + отзывы). Среднее априори фиксировано, иначе каждый
+# отзыв сдвигал бы все рейтинги. После смены значений нужен
+# `manage.py rebuild_leaderboards`.
+LEADERBOARD_MIN_REVIEWS = int(os.getenv('LEADERBOARD_MIN_REVIEWS', 3))
+LEADERBOARD_PRIOR_MEAN = float(os.getenv('LEADERBOARD_PRIOR_MEAN', 5.5))
+LEADERBOARD_PRIOR_WEIGHT = float(os.getenv('LEADERBOARD_PRIOR_WEIGHT', 10))
+
+# Не больше стольких произведений в одном POST /api/v1/titles/bulk/.
+TITLES_BULK_MAX = int(os.getenv('TITLES_BULK_MAX', 5000))
+
+# Не больше стольких id и авторов в одном POST /api/v1/moderation/.
+MODERATION_BATCH_MAX = int(os.getenv('MODERATION_BATCH_MAX', 10000))
+
 AUTHENTICATION_BACKENDS = (
     'django.contrib.auth.backends.ModelBackend',
     'core.custom_authentication.AuthenticationWithoutPassword',
@@ -138,6 +286,13 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Письма кладутся в очередь и отправляются командой send_queued_emails.
+# В режиме EAGER письмо уходит сразу после коммита, без воркера.
+EMAIL_OUTBOX_EAGER = False
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_LEASE = 300
+
 AUTH_USER_MODEL = 'reviews.User'
 
 CODE_LENGTH = 60
@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = 'core'
+
+    def ready(self):
+        from . import metrics  # noqa: F401
+        from .db import health  # noqa: F401
+        from .tokens import start_epoch
+
+        # Токены, выпущенные до первого запуска с этим кэшем, всё равно
+        # проверяются по базе, пока не истекут.
+        try:
+            start_epoch()
+        except Exception:
+            pass
@@ -0,0 +1,50 @@
+"""PostgreSQL с пулом соединений процесса.
+
+    'ENGINE': 'core.db.backends.postgresql_pool',
+    'CONN_MAX_AGE': 0,
+    'OPTIONS': {'pool': {'max_size': 10, 'max_overflow': 10,
+                         'timeout': 30, 'recycle': 1800,
+                         'pre_ping': True}},
+
+`CONN_MAX_AGE` стоит оставить нулевым: в конце запроса Django
+«закрывает» соединение, а бэкенд возвращает его в пул, откуда его
+возьмёт любой другой поток.
+"""
+from django.db.backends.postgresql import base
+
+from core.db.pool import PoolTimeout, get_pool
+from core.metrics import registry
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool', {})
+        return get_pool(self.alias, **options)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        def connect():
+            registry.increment('yamdb_db_connections_opened_total')
+            return super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+
+        try:
+            return self.pool.acquire(connect)
+        except PoolTimeout as error:
+            registry.increment('yamdb_db_pool_timeouts_total')
+            raise base.Database.OperationalError(str(error)) from error
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(
+                    self.connection,
+                    discard=self.errors_occurred and not self.is_usable(),
+                )
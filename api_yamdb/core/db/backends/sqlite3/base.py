@@ -0,0 +1,63 @@
+"""SQLite с профилем PRAGMA для продакшена.
+
+    'ENGINE': 'core.db.backends.sqlite3',
+    'OPTIONS': {'pragmas': {'journal_mode': 'wal',
+                            'synchronous': 'normal', ...}},
+
+В режиме журнала по умолчанию (`delete`) писатель блокирует всех
+читателей базы. В WAL читатели видят последний зафиксированный снимок и
+не ждут записи, а `synchronous=normal` в WAL не теряет целостность при
+сбое процесса. PRAGMA выполняются на каждом новом соединении в порядке
+словаря, поэтому `busy_timeout` стоит ставить первым: смена режима
+журнала тоже может ждать блокировку.
+"""
+import os
+import re
+
+from django.db.backends.sqlite3 import base, creation
+
+PRAGMA_VALUE_RE = re.compile(r'^-?\w+$')
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _create_test_db(self, verbosity, autoclobber, keepdb=False):
+        # Журнал WAL от упавшего прогона применился бы к новой базе.
+        if not keepdb:
+            self._remove_wal_files(self._get_test_db_name())
+        return super()._create_test_db(verbosity, autoclobber, keepdb)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        super()._destroy_test_db(test_database_name, verbosity)
+        self._remove_wal_files(test_database_name)
+
+    def _remove_wal_files(self, database_name):
+        if self.is_in_memory_db(database_name):
+            return
+        for suffix in ('-wal', '-shm'):
+            try:
+                os.remove(f'{database_name}{suffix}')
+            except FileNotFoundError:
+                pass
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pragmas(self):
+        return self.settings_dict['OPTIONS'].get('pragmas', {})
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            # PRAGMA не принимает параметры запроса.
+            if not PRAGMA_VALUE_RE.match(str(value)):
+                raise ValueError(f'Недопустимое значение PRAGMA {name}.')
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
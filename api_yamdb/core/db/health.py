@@ -0,0 +1,25 @@
+"""Проверка постоянных соединений перед запросом.
+
+В Django 3.2 нет `CONN_HEALTH_CHECKS` (он появился в 4.1): соединение,
+оставшееся от прошлого запроса, проверяется только после ошибки. Здесь
+то же поведение, что в 4.1: если в настройках базы включён
+`CONN_HEALTH_CHECKS` и соединения постоянные (`CONN_MAX_AGE` не 0),
+в начале запроса переиспользуемое соединение пингуется и при обрыве
+закрывается, чтобы Django открыл новое.
+"""
+from django.core.signals import request_started
+from django.db import connections
+from django.dispatch import receiver
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    for connection in connections.all():
+        if (
+            connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and connection.settings_dict['CONN_MAX_AGE'] != 0
+            and connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.is_usable()
+        ):
+            connection.close()
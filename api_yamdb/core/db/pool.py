@@ -0,0 +1,152 @@
+"""Пул соединений DB-API, общий для потоков процесса.
+
+Django держит по соединению на поток и на алиас базы. Под WSGI с
+потоками и под ASGI (пул `api.async_views`) потоков больше, чем нужно
+соединений, а без пула каждый запрос открывает своё. `ConnectionPool`
+хранит до `max_size` открытых соединений; сверх них при нагрузке
+открывается до `max_overflow` временных, которые закрываются при
+возврате. Если свободных мест нет, `acquire()` ждёт не дольше `timeout`
+секунд и бросает `PoolTimeout`.
+
+Перед выдачей соединение старше `recycle` секунд закрывается, а при
+`pre_ping` проверяется функцией `ping`: оборванное соединение молча
+заменяется новым.
+"""
+import queue
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+
+    def __init__(self, max_size=10, max_overflow=10, timeout=30.0,
+                 recycle=None, pre_ping=True, ping=None, reset=None):
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.ping = ping or default_ping
+        self.reset = reset or default_reset
+        # LIFO: первым выдаётся самое «тёплое» соединение, а лишние
+        # успевают состариться и уйти по recycle.
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(max_size + max_overflow)
+        self.lock = threading.Lock()
+        self.opened_at = {}
+
+    @property
+    def size(self):
+        """Сколько соединений открыто сейчас (свободных и выданных)."""
+        with self.lock:
+            return len(self.opened_at)
+
+    def acquire(self, connect):
+        """Свободное соединение или новое из `connect()`."""
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f'Нет свободного соединения за {self.timeout} с '
+                f'(max_size={self.max_size}, '
+                f'max_overflow={self.max_overflow}).'
+            )
+        try:
+            while True:
+                try:
+                    connection = self.idle.get_nowait()
+                except queue.Empty:
+                    return self.open(connect)
+                if self.usable(connection):
+                    return connection
+                self.discard(connection)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, connection, discard=False):
+        """Вернуть соединение; временные и сломанные закрываются."""
+        try:
+            if not discard:
+                try:
+                    self.reset(connection)
+                except Exception:
+                    discard = True
+            if discard or self.idle.qsize() >= self.max_size:
+                self.discard(connection)
+            else:
+                self.idle.put(connection)
+        finally:
+            self.slots.release()
+
+    def open(self, connect):
+        connection = connect()
+        with self.lock:
+            self.opened_at[id(connection)] = time.monotonic()
+        return connection
+
+    def usable(self, connection):
+        with self.lock:
+            opened_at = self.opened_at.get(id(connection))
+        if opened_at is None:
+            return False
+        if self.recycle and time.monotonic() - opened_at > self.recycle:
+            return False
+        if not self.pre_ping:
+            return True
+        try:
+            self.ping(connection)
+        except Exception:
+            return False
+        return True
+
+    def discard(self, connection):
+        with self.lock:
+            self.opened_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Закрыть свободные соединения; выданные закроются при возврате."""
+        while True:
+            try:
+                self.discard(self.idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def default_ping(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+def default_reset(connection):
+    # Незакрытая транзакция не должна достаться следующему запросу.
+    connection.rollback()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, **options):
+    """Пул процесса для алиаса базы, создаётся при первом обращении."""
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(**options)
+        return _pools[alias]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
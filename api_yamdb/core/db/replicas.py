@@ -0,0 +1,118 @@
+"""Чтение API с реплик и привязка к основной базе после записи.
+
+`ReplicaPinningMiddleware` выбирает реплику из `DATABASE_REPLICAS` по
+кругу — одну на весь GET/HEAD/OPTIONS-запрос к вьюхам API — и кладёт её
+в `read_replica`. `ReplicaRouter` отправляет на неё все чтения запроса:
+реплики отстают по-разному, и версия для ETag, COUNT и строки страницы
+с разных реплик не сложились бы в один снимок. Всё остальное, включая
+чтение внутри POST/PATCH/DELETE, идёт в `default`.
+
+Реплика отстаёт от основной базы, поэтому клиент, который только что
+успешно записал, `REPLICA_PIN_SECONDS` секунд читает из `default` и
+видит свою запись. Клиент определяется по заголовку Authorization, а
+без него — по адресу. Отметки хранятся в кэше `REPLICA_PIN_CACHE`;
+при нескольких процессах он должен быть общим.
+"""
+import asyncio
+import contextvars
+import hashlib
+import itertools
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+
+DEFAULT_DB_ALIAS = 'default'
+REPLICA_VIEW_MODULES = ('api.',)
+
+read_replica = contextvars.ContextVar('read_replica', default=None)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = read_replica.get()
+        if alias in settings.DATABASE_REPLICAS:
+            return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, объекты с них совместимы.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема приезжает на реплики вместе с данными.
+        return db not in settings.DATABASE_REPLICAS
+
+
+def pin_key(request):
+    client = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return 'replica-pin:' + hashlib.md5(client.encode()).hexdigest()
+
+
+def is_pinned(request):
+    return caches[settings.REPLICA_PIN_CACHE].get(pin_key(request)) is not None
+
+
+def pin(request):
+    caches[settings.REPLICA_PIN_CACHE].set(
+        pin_key(request), 1, settings.REPLICA_PIN_SECONDS
+    )
+
+
+class ReplicaPinningMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.counter = itertools.count()
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = read_replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_replica.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = read_replica.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_replica.reset(token)
+        return self.finish(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Под ASGI метод выполняется через sync_to_async, и asgiref
+        # возвращает изменённые контекстные переменные в запрос.
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and view_func.__module__.startswith(REPLICA_VIEW_MODULES)
+            and not is_pinned(request)
+        ):
+            replicas = settings.DATABASE_REPLICAS
+            read_replica.set(replicas[next(self.counter) % len(replicas)])
+
+    def finish(self, request, response):
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            pin(request)
+        return response
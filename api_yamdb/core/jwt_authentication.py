@@ -0,0 +1,65 @@
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import ROLE_CLAIMS, claims_revoked
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, собранный из claims токена без запроса к базе."""
+
+    @cached_property
+    def id(self):
+        return self.token['uid']
+
+    @cached_property
+    def username(self):
+        return self.token[api_settings.USER_ID_CLAIM]
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin' or self.is_staff or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == 'moderator'
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, которая на чтении не ходит в таблицу юзеров.
+
+    Для безопасных методов пользователь строится из claims токена, если
+    они есть и не отозваны сменой роли. Запись по-прежнему получает
+    настоящий объект `User`: он нужен сериализаторам и внешним ключам.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if (
+            request.method in SAFE_METHODS
+            and self.has_claims(validated_token)
+            and not claims_revoked(validated_token)
+        ):
+            return ClaimsUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    @staticmethod
+    def has_claims(token):
+        return all(
+            claim in token
+            for claim in ('uid', api_settings.USER_ID_CLAIM) + ROLE_CLAIMS
+        )
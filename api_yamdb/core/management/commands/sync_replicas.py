@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик. Замена потоковой '
+        'репликации для локальной проверки чтения с реплик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а копировать каждые --interval с.',
+        )
+        parser.add_argument('--interval', type=float, default=1)
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError(
+                'Копирование поддерживается только для SQLite; для '
+                'PostgreSQL используйте потоковую репликацию.'
+            )
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены (DB_REPLICAS).')
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                self.sync(primary, connections[alias])
+            if not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Скопировано реплик: {len(settings.DATABASE_REPLICAS)}.'
+                ))
+                return
+            time.sleep(options['interval'])
+
+    def sync(self, primary, replica):
+        if str(replica.settings_dict['NAME']) == str(
+            primary.settings_dict['NAME']
+        ):
+            return
+        # Соединение реплики открыто только на чтение (query_only),
+        # поэтому копия пишется отдельным соединением без PRAGMA.
+        replica.close()
+        primary.ensure_connection()
+        target = primary.Database.connect(str(replica.settings_dict['NAME']))
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
@@ -0,0 +1,236 @@
+"""Метрики запросов: число SQL-запросов и время по этапам.
+
+`MetricsMiddleware` считает запросы к базе и их время, добавляет
+заголовок `Server-Timing` и копит выборки по имени маршрута
+(`titles-list`, `reviews-detail`...). Время вьюхи и сериализатора
+пишут DRF-вьюхи через `api.mixins.MetricsMixin`. Данные живут в памяти
+процесса и отдаются в текстовом формате Prometheus.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+UNMATCHED_ROUTE = 'unmatched'
+
+# Название метрики Prometheus и её описание по ключу замера.
+SUMMARIES = {
+    'total': ('yamdb_request_duration_seconds',
+              'Полное время обработки запроса.'),
+    'view': ('yamdb_view_duration_seconds', 'Время внутри DRF-вьюхи.'),
+    'serializer': ('yamdb_serializer_duration_seconds',
+                   'Время сериализации ответа.'),
+    'db': ('yamdb_db_duration_seconds', 'Суммарное время SQL-запросов.'),
+    'queries': ('yamdb_db_queries', 'Число SQL-запросов за запрос.'),
+}
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Замеры запроса, который сейчас обрабатывается в этом контексте.
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class RequestMetrics:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.durations = defaultdict(float)
+
+    def add(self, name, seconds):
+        self.durations[name] += seconds
+
+    def track_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.add('db', time.perf_counter() - started)
+
+    def samples(self):
+        return dict(self.durations, queries=self.queries)
+
+    def server_timing(self):
+        parts = [
+            f'{name};dur={seconds * 1000:.2f}'
+            for name, seconds in self.durations.items()
+        ]
+        parts.append(f'queries;desc="{self.queries} queries"')
+        return ', '.join(parts)
+
+
+class timed:
+    """Добавляет время блока к метрике `name` текущего запроса."""
+
+    def __init__(self, request, name):
+        self.metrics = getattr(request, 'metrics', None)
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.metrics is not None:
+            self.metrics.add(self.name, time.perf_counter() - self.started)
+
+
+class Summary:
+    """Счётчик, сумма и скользящее окно выборок для квантилей."""
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.window = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.window.append(value)
+
+    def quantiles(self):
+        values = sorted(self.window)
+        if not values:
+            return {}
+        return {
+            quantile: values[min(len(values) - 1, int(quantile * len(values)))]
+            for quantile in QUANTILES
+        }
+
+
+class Registry:
+    def __init__(self, window=1024):
+        self.window = window
+        self.lock = threading.Lock()
+        self.summaries = {}
+        self.counters = defaultdict(float)
+
+    def observe(self, route, samples):
+        with self.lock:
+            for name, value in samples.items():
+                key = (name, route)
+                if key not in self.summaries:
+                    self.summaries[key] = Summary(self.window)
+                self.summaries[key].observe(value)
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def reset(self):
+        with self.lock:
+            self.summaries.clear()
+            self.counters.clear()
+
+    def render(self):
+        """Текст в формате Prometheus exposition 0.0.4."""
+        with self.lock:
+            summaries = {
+                key: (summary.count, summary.total, summary.quantiles())
+                for key, summary in self.summaries.items()
+            }
+            counters = dict(self.counters)
+        lines = []
+        for name, (metric, description) in SUMMARIES.items():
+            routes = sorted(
+                route for sample, route in summaries if sample == name
+            )
+            if not routes:
+                continue
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} summary')
+            for route in routes:
+                count, total, quantiles = summaries[(name, route)]
+                for quantile, value in quantiles.items():
+                    lines.append(
+                        f'{metric}{{route="{route}",quantile="{quantile}"}} '
+                        f'{value:.6g}'
+                    )
+                lines.append(f'{metric}_sum{{route="{route}"}} {total:.6g}')
+                lines.append(f'{metric}_count{{route="{route}"}} {count}')
+        for name, value in sorted(counters.items()):
+            lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name} {value:.6g}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry(getattr(settings, 'METRICS_WINDOW', 1024))
+
+
+def track_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.track_query(execute, sql, params, many, context)
+
+
+def instrument(connection):
+    """Подключает `track_query` к соединению, если ещё не подключён.
+
+    Обёртка ставится первой в списке: `connection.execute_wrapper()`
+    снимает свою обёртку через `pop()`, и чужая не должна пострадать.
+    Замеры текущего запроса берутся из `current_metrics`, поэтому
+    запросы из потоков `sync_to_async` тоже учитываются.
+    """
+    if track_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, track_query)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    instrument(connection)
+    # Бэкенд с пулом сам считает новые соединения, а не выдачи из пула.
+    if not hasattr(connection, 'pool'):
+        registry.increment('yamdb_db_connections_opened_total')
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Обработчик Django узнаёт асинхронный middleware по метке.
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        for connection in connections.all():
+            instrument(connection)
+        started, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, started)
+
+    async def __acall__(self, request):
+        started, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, started)
+
+    def start(self, request):
+        request.metrics = RequestMetrics()
+        return time.perf_counter(), current_metrics.set(request.metrics)
+
+    def finish(self, request, response, started):
+        metrics = request.metrics
+        metrics.add('total', time.perf_counter() - started)
+        match = request.resolver_match
+        route = match.url_name if match and match.url_name else None
+        registry.observe(route or UNMATCHED_ROUTE, metrics.samples())
+        response['Server-Timing'] = metrics.server_timing()
+        return response
@@ -0,0 +1,101 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.checks import Warning, register
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+ROLE_CLAIMS = ('role', 'is_staff', 'is_superuser')
+REVOCATION_KEY = 'jwt-claims-revoked:{}'
+# С какого момента кэш помнит все метки отзыва. Токены старше этого
+# момента могли быть отозваны до очистки или перезапуска кэша.
+EPOCH_KEY = 'jwt-claims-epoch'
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен, в который зашиты id и права пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['uid'] = user.pk
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+def revocation_cache():
+    return caches[settings.JWT_CLAIMS_REVOCATION_CACHE]
+
+
+def revocation_ttl():
+    return getattr(
+        settings,
+        'JWT_CLAIMS_REVOCATION_TTL',
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds(),
+    )
+
+
+def start_epoch(cache=None):
+    """Отметить, с какого момента кэш хранит метки отзыва.
+
+    `add()` не перезаписывает уже начатую эпоху другого процесса.
+    """
+    (cache or revocation_cache()).add(
+        EPOCH_KEY, int(time.time()), timeout=None
+    )
+
+
+def revoke_claims(username):
+    """Перестать доверять правам из уже выданных токенов пользователя.
+
+    Токены, выпущенные раньше этого момента, снова проверяются по базе.
+    Метка живёт не дольше самих access-токенов.
+    """
+    revocation_cache().set(
+        REVOCATION_KEY.format(username), int(time.time()), revocation_ttl()
+    )
+
+
+def claims_revoked(token):
+    """Можно ли доверять claims токена без чтения пользователя из базы.
+
+    Отказывает при любой неуверенности: кэш недоступен (бэкенды
+    memcached в этом случае молча возвращают пустой ответ) или эпоха
+    началась позже выпуска токена, то есть метки могли потеряться.
+    """
+    cache = revocation_cache()
+    key = REVOCATION_KEY.format(token[api_settings.USER_ID_CLAIM])
+    try:
+        values = cache.get_many([EPOCH_KEY, key])
+        if EPOCH_KEY not in values:
+            start_epoch(cache)
+            return True
+    except Exception:
+        return True
+    issued_at = token.get('iat', 0)
+    # Эпоха и iat — целые секунды, токен той же секунды не отсекается.
+    return issued_at < values[EPOCH_KEY] or (
+        key in values and issued_at <= values[key]
+    )
+
+
+@register(deploy=True)
+def check_revocation_cache(app_configs, **kwargs):
+    alias = settings.JWT_CLAIMS_REVOCATION_CACHE
+    if settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        f'Метки отзыва JWT хранит кэш `{alias}` в памяти процесса.',
+        hint=(
+            'Задайте AUTH_CACHE_BACKEND и AUTH_CACHE_LOCATION: при '
+            'нескольких процессах пониженный или удалённый пользователь '
+            'иначе сохранит права в остальных до истечения токена.'
+        ),
+        id='core.W001',
+    )]
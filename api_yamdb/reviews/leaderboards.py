@@ -0,0 +1,184 @@
+"""Рейтинги произведений по категориям и жанрам.
+
+Произведение, у которого не меньше `LEADERBOARD_MIN_REVIEWS` отзывов,
+получает строку `LeaderboardEntry` в рейтинге своей категории и каждого
+своего жанра. Сигналы пересчитывают строки при записи отзывов и при
+смене категории или жанров, поэтому первые N мест читаются по индексу,
+без сортировки всего каталога. Расхождения исправляет
+`rebuild_leaderboards()`.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, FloatField, OuterRef, Subquery
+from django.db.models.functions import Cast
+
+from .models import LeaderboardEntry, Title, TitleStats
+
+AVERAGE = 'average'
+BAYESIAN = 'bayesian'
+RANKINGS = {
+    AVERAGE: ('-average', '-reviews_count', 'title_id'),
+    BAYESIAN: ('-bayesian', '-reviews_count', 'title_id'),
+}
+
+GenreTitle = Title.genre.through
+
+
+def scores(score_sum, score_count):
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    prior = weight * settings.LEADERBOARD_PRIOR_MEAN
+    return {
+        'average': score_sum / score_count,
+        'bayesian': (prior + score_sum) / (weight + score_count),
+        'reviews_count': score_count,
+    }
+
+
+def min_reviews():
+    return max(settings.LEADERBOARD_MIN_REVIEWS, 1)
+
+
+def collect_entries(title_ids=None):
+    """Строки рейтингов, какими они должны быть, по таблице произведений."""
+    titles = Title.objects.filter(score_count__gte=min_reviews())
+    links = GenreTitle.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+        links = links.filter(title_id__in=title_ids)
+    ranked = {
+        row['id']: row
+        for row in titles.values(
+            'id', 'category_id', 'score_sum', 'score_count'
+        ).order_by()
+    }
+    if not ranked:
+        return []
+    boards = [
+        (row['id'], LeaderboardEntry.CATEGORY, row['category_id'])
+        for row in ranked.values() if row['category_id'] is not None
+    ]
+    boards.extend(
+        (title_id, LeaderboardEntry.GENRE, genre_id)
+        for title_id, genre_id in links.values_list('title_id', 'genres_id')
+        if title_id in ranked
+    )
+    return [
+        LeaderboardEntry(
+            title_id=title_id, kind=kind, board_id=board_id,
+            **scores(
+                ranked[title_id]['score_sum'],
+                ranked[title_id]['score_count'],
+            ),
+        )
+        for title_id, kind, board_id in boards
+    ]
+
+
+def place_titles(title_ids):
+    LeaderboardEntry.objects.bulk_create(
+        collect_entries(title_ids), ignore_conflicts=True
+    )
+
+
+def score_expressions():
+    """То же, что `scores()`, но в SQL по строке произведения."""
+    weight = float(settings.LEADERBOARD_PRIOR_WEIGHT)
+    prior = weight * settings.LEADERBOARD_PRIOR_MEAN
+    score_sum = Cast('score_sum', FloatField())
+    return {
+        'average': score_sum / F('score_count'),
+        'bayesian': (prior + score_sum) / (weight + F('score_count')),
+        'reviews_count': F('score_count'),
+    }
+
+
+def refresh_title(title_id, delta):
+    """Пересчитывает места произведения после записи отзыва.
+
+    delta — изменение числа отзывов. Значения берутся из строки
+    произведения подзапросами прямо в UPDATE, без отдельного чтения.
+    Вставлять строки может только новый отзыв: удаление не делает
+    произведение проходящим по порогу, а при каскадном удалении самого
+    произведения вставка сорвала бы транзакцию.
+    """
+    entries = LeaderboardEntry.objects.filter(title_id=title_id)
+    if delta < 0:
+        entries.filter(title__score_count__lt=min_reviews()).delete()
+    title = Title.objects.filter(pk=OuterRef('title_id'))
+    updated = entries.update(**{
+        field: Subquery(title.values(value=expression))
+        for field, expression in score_expressions().items()
+    })
+    if not updated and delta > 0 and TitleStats.objects.filter(
+        pk=title_id, reviews_count__gte=min_reviews()
+    ).exists():
+        # Произведение только что прошло порог (или у него нет
+        # ни категории, ни жанров).
+        place_titles([title_id])
+
+
+def resync_titles(title_ids):
+    """После смены категории или жанров: места заново."""
+    entries = collect_entries(title_ids)
+    stale = LeaderboardEntry.objects.filter(title_id__in=title_ids)
+    if not entries:
+        # Обычный случай для новых произведений: без отзывов им нечего
+        # вставлять, и транзакция не нужна.
+        stale.delete()
+        return
+    with transaction.atomic():
+        stale.delete()
+        LeaderboardEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def drop_board(kind, board_id):
+    LeaderboardEntry.objects.filter(kind=kind, board_id=board_id).delete()
+
+
+def top(kind, board_id, ranking=AVERAGE, limit=10):
+    return LeaderboardEntry.objects.filter(
+        kind=kind, board_id=board_id
+    ).order_by(*RANKINGS[ranking]).values(
+        'title_id', 'average', 'bayesian', 'reviews_count'
+    )[:limit]
+
+
+def entry_key(entry):
+    return entry.title_id, entry.kind, entry.board_id
+
+
+def entry_values(entry):
+    return (
+        round(entry.average, 9), round(entry.bayesian, 9),
+        entry.reviews_count,
+    )
+
+
+def rebuild_leaderboards(verify=False):
+    """Пересобирает все рейтинги.
+
+    Возвращает список расхождений в виде кортежей
+    ((id произведения, вид, id категории или жанра), в таблице, ожидается),
+    где значения — (среднее, байесовская оценка, отзывы) или None для
+    лишней либо недостающей строки. При verify=True ничего не
+    записывается.
+    """
+    expected = {entry_key(entry): entry for entry in collect_entries()}
+    stored = {
+        entry_key(entry): entry for entry in LeaderboardEntry.objects.all()
+    }
+    drift = []
+    for key in sorted(expected.keys() | stored.keys(), key=str):
+        values = [
+            entry_values(entries[key]) if key in entries else None
+            for entries in (stored, expected)
+        ]
+        if values[0] != values[1]:
+            drift.append((key, *values))
+    if drift and not verify:
+        with transaction.atomic():
+            LeaderboardEntry.objects.all().delete()
+            LeaderboardEntry.objects.bulk_create(
+                expected.values(), batch_size=1000
+            )
+    return drift
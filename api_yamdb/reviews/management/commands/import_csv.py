@@ -0,0 +1,232 @@
+import csv
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from reviews import versioning
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Category, Comment, Genres, Review, Title, User
+from reviews.ratings import rebuild_ratings
+from reviews.search import rebuild_index
+from reviews.stats import rebuild_stats
+
+GenreTitle = Title.genre.through
+
+
+def build_user(row, known):
+    return User(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        role=row['role'] or 'user',
+        bio=row['bio'],
+        first_name=row['first_name'],
+        last_name=row['last_name'],
+        password='',
+        confirmation_code=User.objects.make_random_password(
+            length=settings.CODE_LENGTH
+        ),
+    )
+
+
+def build_category(row, known):
+    return Category(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def build_genre(row, known):
+    return Genres(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def build_title(row, known):
+    category = int(row['category']) if row['category'] else None
+    return Title(
+        id=row['id'],
+        name=row['name'],
+        year=row['year'],
+        category_id=category if category in known['category'] else None,
+    )
+
+
+def build_genre_title(row, known):
+    title, genre = int(row['title_id']), int(row['genre_id'])
+    if title not in known['titles'] or genre not in known['genre']:
+        return None
+    return GenreTitle(id=row['id'], title_id=title, genres_id=genre)
+
+
+def build_review(row, known):
+    title, author = int(row['title_id']), int(row['author'])
+    if title not in known['titles'] or author not in known['users']:
+        return None
+    return Review(
+        id=row['id'],
+        title_id=title,
+        author_id=author,
+        text=row['text'],
+        score=row['score'],
+        pub_date=parse_datetime(row['pub_date']),
+    )
+
+
+def build_comment(row, known):
+    review, author = int(row['review_id']), int(row['author'])
+    if review not in known['review'] or author not in known['users']:
+        return None
+    return Comment(
+        id=row['id'],
+        review_id=review,
+        author_id=author,
+        text=row['text'],
+        pub_date=parse_datetime(row['pub_date']),
+    )
+
+
+# Порядок важен: строки ссылаются на уже загруженные таблицы.
+SOURCES = (
+    ('users', User, build_user),
+    ('category', Category, build_category),
+    ('genre', Genres, build_genre),
+    ('titles', Title, build_title),
+    ('genre_title', GenreTitle, build_genre_title),
+    ('review', Review, build_review),
+    ('comments', Comment, build_comment),
+)
+
+
+def timestamp_fields(model):
+    """Поля auto_now_add: `bulk_create()` подставил бы в них текущее время."""
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает CSV из static/data через bulk_create в одной '
+        'транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=Path(settings.BASE_DIR) / 'static' / 'data',
+            type=Path,
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            choices=[name for name, _, _ in SOURCES],
+            help='Загрузить только указанные файлы (без расширения).',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path.is_dir():
+            raise CommandError(f'Каталог {path} не найден.')
+        only = options['only']
+        sources = [
+            source for source in SOURCES if not only or source[0] in only
+        ]
+        known = {
+            name: set(model.objects.values_list('id', flat=True))
+            for name, model, _ in SOURCES
+        }
+        with transaction.atomic():
+            for name, model, build in sources:
+                self.load(path / f'{name}.csv', model, build, known[name],
+                          known, options['batch_size'])
+            self.reset_sequences([model for _, model, _ in sources])
+            rebuild_ratings()
+            rebuild_stats()
+            rebuild_leaderboards()
+            rebuild_index()
+            versioning.reset()
+
+    def load(self, filename, model, build, ids, known, batch_size):
+        if not filename.exists():
+            self.stdout.write(f'{filename.name}: файл не найден, пропущен.')
+            return
+        started = time.monotonic()
+        inserted = skipped = existing = 0
+        stamps = timestamp_fields(model)
+        with open(filename, encoding='utf-8', newline='') as source:
+            for rows in batches(csv.DictReader(source), batch_size):
+                objects = []
+                for row in rows:
+                    if int(row['id']) in ids:
+                        # Строка уже загружена: повторный запуск ничего
+                        # не дублирует.
+                        existing += 1
+                        continue
+                    obj = build(row, known)
+                    if obj is None:
+                        skipped += 1
+                        continue
+                    objects.append(obj)
+                self.insert(model, objects, stamps, batch_size)
+                ids.update(int(obj.id) for obj in objects)
+                inserted += len(objects)
+        elapsed = time.monotonic() - started
+        rate = inserted / elapsed if elapsed else inserted
+        self.stdout.write(
+            f'{filename.name}: {inserted} строк за {elapsed:.2f} с '
+            f'({rate:.0f} строк/с), пропущено {skipped}, '
+            f'уже загружено {existing}.'
+        )
+
+    def insert(self, model, objects, stamps, batch_size):
+        """Вставляет строки; даты из файла в полях stamps сохраняются.
+
+        `bulk_create()` заменил бы их текущим временем, поэтому такие
+        модели пишутся через `executemany` с явными значениями: каждое
+        поле готовится так же, как в `bulk_create()`, кроме stamps.
+        """
+        if not objects:
+            return
+        if not stamps:
+            model.objects.bulk_create(objects, batch_size=batch_size)
+            return
+        fields = model._meta.concrete_fields
+        quote = connection.ops.quote_name
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        rows = [
+            [
+                field.get_db_prep_save(
+                    getattr(obj, field.attname) if field.attname in stamps
+                    else field.pre_save(obj, add=True),
+                    connection,
+                )
+                for field in fields
+            ]
+            for obj in objects
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает рейтинги категорий и жанров по произведениям.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Только проверить расхождения, ничего не записывая.',
+        )
+
+    def handle(self, *args, **options):
+        verify = options['verify']
+        drift = rebuild_leaderboards(verify=verify)
+        for (title_id, kind, board_id), stored, expected in drift:
+            self.stdout.write(
+                f'{kind} {board_id}, title {title_id}: stored {stored}, '
+                f'expected {expected}'
+            )
+        if verify and drift:
+            raise CommandError(f'Расхождений: {len(drift)}.')
+        action = 'Найдено' if verify else 'Исправлено'
+        self.stdout.write(
+            self.style.SUCCESS(f'{action} расхождений: {len(drift)}.')
+        )
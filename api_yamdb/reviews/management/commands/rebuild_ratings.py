@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает накопленные рейтинги произведений по отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Только проверить расхождения, ничего не записывая.',
+        )
+        parser.add_argument(
+            '--title',
+            type=int,
+            action='append',
+            dest='title_ids',
+            help='id произведения; можно указать несколько раз.',
+        )
+
+    def handle(self, *args, **options):
+        verify = options['verify']
+        drift = rebuild_ratings(options['title_ids'], verify=verify)
+        for title_id, stored, expected in drift:
+            self.stdout.write(
+                f'title {title_id}: stored sum/count {stored}, '
+                f'expected {expected}'
+            )
+        if verify and drift:
+            raise CommandError(f'Расхождений: {len(drift)}.')
+        action = 'Найдено' if verify else 'Исправлено'
+        self.stdout.write(
+            self.style.SUCCESS(f'{action} расхождений: {len(drift)}.')
+        )
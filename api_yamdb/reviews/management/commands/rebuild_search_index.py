@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Заново строит полнотекстовый индекс произведений.'
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Индекс произведений обновлён.'))
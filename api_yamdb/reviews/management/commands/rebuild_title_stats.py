@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает гистограмму оценок и счётчики произведений '
+        'по отзывам и комментариям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Только проверить расхождения, ничего не записывая.',
+        )
+        parser.add_argument(
+            '--title',
+            type=int,
+            action='append',
+            dest='title_ids',
+            help='id произведения; можно указать несколько раз.',
+        )
+
+    def handle(self, *args, **options):
+        verify = options['verify']
+        drift = rebuild_stats(options['title_ids'], verify=verify)
+        for title_id, stored, expected in drift:
+            self.stdout.write(
+                f'title {title_id}: stored {stored}, expected {expected}'
+            )
+        if verify and drift:
+            raise CommandError(f'Расхождений: {len(drift)}.')
+        action = 'Найдено' if verify else 'Исправлено'
+        self.stdout.write(
+            self.style.SUCCESS(f'{action} расхождений: {len(drift)}.')
+        )
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import DEFAULT_BATCH_SIZE, drain
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Сколько писем воркер забирает за раз.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество потоков-отправителей.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с.',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = drain(
+                    options['batch_size'], options['workers']
+                )
+            except Exception as error:
+                # Например, база недоступна: в режиме --loop ждём и
+                # пробуем снова, письма остаются в очереди.
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Ошибка отправки: {error!r}.')
+            else:
+                if sent or failed or not options['loop']:
+                    self.stdout.write(
+                        f'Отправлено: {sent}, ошибок: {failed}.'
+                    )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,68 @@
+# Generated by Django 3.2 on 2026-10-18 21:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_stats(apps, schema_editor):
+    """Статистика для уже существующих произведений."""
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    stats = {
+        pk: TitleStats(title_id=pk)
+        for pk in Title.objects.values_list('pk', flat=True)
+    }
+    reviews = Review.objects.order_by().values('title_id', 'score').annotate(
+        count=models.Count('id'), last=models.Max('pub_date')
+    )
+    for row in reviews:
+        title_stats = stats[row['title_id']]
+        if 1 <= row['score'] <= 10:
+            setattr(title_stats, f"score_{row['score']}", row['count'])
+        title_stats.reviews_count += row['count']
+        if (title_stats.last_review_at is None
+                or row['last'] > title_stats.last_review_at):
+            title_stats.last_review_at = row['last']
+    comments = Comment.objects.order_by().values('review__title_id').annotate(
+        count=models.Count('id')
+    )
+    for row in comments:
+        stats[row['review__title_id']].comments_count = row['count']
+    TitleStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.title')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок 10')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Отзывов')),
+                ('comments_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('last_review_at', models.DateTimeField(null=True, verbose_name='Последний отзыв')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Статистика произведения',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 3.2 on 2026-10-18 21:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_leaderboards(apps, schema_editor):
+    """Места в рейтингах для уже существующих произведений."""
+    Title = apps.get_model('reviews', 'Title')
+    LeaderboardEntry = apps.get_model('reviews', 'LeaderboardEntry')
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    prior = weight * settings.LEADERBOARD_PRIOR_MEAN
+    titles = Title.objects.filter(
+        score_count__gte=max(settings.LEADERBOARD_MIN_REVIEWS, 1)
+    ).prefetch_related('genre')
+    entries = []
+    for title in titles:
+        boards = [('genre', genre.pk) for genre in title.genre.all()]
+        if title.category_id is not None:
+            boards.append(('category', title.category_id))
+        entries.extend(
+            LeaderboardEntry(
+                title=title, kind=kind, board_id=board_id,
+                average=title.score_sum / title.score_count,
+                bayesian=(prior + title.score_sum) / (
+                    weight + title.score_count
+                ),
+                reviews_count=title.score_count,
+            )
+            for kind, board_id in boards
+        )
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('category', 'Категория'), ('genre', 'Жанр')], max_length=8, verbose_name='Вид рейтинга')),
+                ('board_id', models.PositiveIntegerField(verbose_name='id категории или жанра')),
+                ('average', models.FloatField(verbose_name='Средняя оценка')),
+                ('bayesian', models.FloatField(verbose_name='Байесовская оценка')),
+                ('reviews_count', models.PositiveIntegerField(verbose_name='Отзывов')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['kind', 'board_id', '-average', '-reviews_count', 'title'], name='leaderboard_average_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['kind', 'board_id', '-bayesian', '-reviews_count', 'title'], name='leaderboard_bayesian_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('title', 'kind', 'board_id'), name='unique_leaderboard_entry'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
@@ -68,12 +69,8 @@ class CustomUserManager(BaseUserManager):
         )
         user.is_superuser = True
         user.is_staff = True
-        user.email_user(
-            subject='confirmation_code',
-            message=user.confirmation_code,
-            fail_silently=False
-        )
         user.save()
+        user.send_confirmation_code()
 
         return user
 
@@ -102,6 +99,26 @@ class User(AbstractUser):
     class Meta:
         ordering = ['-date_joined']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_access = instance.access_state
+        instance._loaded_username = instance.__dict__.get('username')
+        return instance
+
+    def send_confirmation_code(self):
+        from .outbox import enqueue_email
+
+        return enqueue_email(
+            self.email, 'confirmation_code', self.confirmation_code
+        )
+
+    @property
+    def access_state(self):
+        return (
+            self.role, self.is_staff, self.is_superuser, self.is_active
+        )
+
     @property
     def is_admin(self):
         return self.role == 'admin' or self.is_staff or self.is_superuser
@@ -121,6 +138,9 @@ class Category(models.Model):
         unique=True,
         db_index=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
 
     class Meta:
         verbose_name = 'Категория'
@@ -136,6 +156,9 @@ class Genres(models.Model):
         db_index=True,
         max_length=50
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
 
     class Meta:
         verbose_name = 'Жанр'
@@ -159,7 +182,9 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='категория',
         null=True,
-        blank=True
+        blank=True,
+        # Поиск по категории покрывает индекс (category, name).
+        db_index=False,
     )
     description = models.TextField(
         'описание',
@@ -177,9 +202,26 @@ class Title(models.Model):
         null=True,
         default=None
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0
+    )
+    score_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
 
     class Meta:
         verbose_name = 'Произведение'
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+            models.Index(
+                fields=('category', 'name'), name='title_category_name_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -187,18 +229,24 @@ class Title(models.Model):
 
 class Review(models.Model):
     """Модель отзыва."""
+    # Отдельные индексы по внешним ключам не нужны: title — первое поле
+    # review_title_pub_date_idx, author — первое поле review_author_idx.
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
         related_name='reviews',
+        db_index=False,
     )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='reviews',
-        unique=True
+        db_index=False,
     )
     pub_date = models.DateTimeField(
         'Дата публикации', auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
     text = models.TextField(null=False)
     score = models.IntegerField(
         default=0,
@@ -207,9 +255,33 @@ class Review(models.Model):
             MinValueValidator(1, 'Оценка не может быть меньше 1'),
         ],
     )
+    # Скрытый модератором отзыв не выводится и не входит в рейтинг и
+    # статистику; меняет флаг только `reviews.moderation`.
+    is_hidden = models.BooleanField('Скрыт', default=False)
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'title'), name='review_author_idx'
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'author'),
+                name='unique_review_per_author',
+            ),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
 
 
 class Comment(models.Model):
@@ -218,6 +290,9 @@ class Comment(models.Model):
     pub_date = models.DateTimeField(
         'Дата публикации', auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -226,8 +301,137 @@ class Comment(models.Model):
     review = models.ForeignKey(
         Review,
         on_delete=models.CASCADE,
-        related_name='comments'
+        related_name='comments',
+        # Покрыт comment_review_pub_date_idx.
+        db_index=False,
     )
+    is_hidden = models.BooleanField('Скрыт', default=False)
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx',
+            ),
+        )
+
+
+SCORES = range(1, 11)
+
+
+class TitleStats(models.Model):
+    """Гистограмма оценок и счётчики произведения, ведут сигналы."""
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0)
+    reviews_count = models.PositiveIntegerField('Отзывов', default=0)
+    comments_count = models.PositiveIntegerField('Комментариев', default=0)
+    last_review_at = models.DateTimeField('Последний отзыв', null=True)
+    updated_at = models.DateTimeField('Дата изменения', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Статистика произведения'
+
+    @property
+    def scores(self):
+        return {
+            str(score): getattr(self, f'score_{score}') for score in SCORES
+        }
+
+
+class LeaderboardEntry(models.Model):
+    """Произведение в рейтинге категории или жанра.
+
+    Строки ведёт `reviews.leaderboards`; индексы отдают первые N мест
+    рейтинга без сортировки всех произведений.
+    """
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    KIND_CHOICES = (
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+    )
+    kind = models.CharField('Вид рейтинга', max_length=8, choices=KIND_CHOICES)
+    board_id = models.PositiveIntegerField('id категории или жанра')
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+    )
+    average = models.FloatField('Средняя оценка')
+    bayesian = models.FloatField('Байесовская оценка')
+    reviews_count = models.PositiveIntegerField('Отзывов')
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        indexes = (
+            models.Index(
+                fields=(
+                    'kind', 'board_id', '-average', '-reviews_count', 'title'
+                ),
+                name='leaderboard_average_idx',
+            ),
+            models.Index(
+                fields=(
+                    'kind', 'board_id', '-bayesian', '-reviews_count', 'title'
+                ),
+                name='leaderboard_bayesian_idx',
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'kind', 'board_id'),
+                name='unique_leaderboard_entry',
+            ),
+        )
+
+
+class CollectionVersion(models.Model):
+    """Счётчик изменений коллекции для ETag и ключей кэша."""
+    name = models.CharField(max_length=64, primary_key=True)
+    version = models.PositiveBigIntegerField(default=1)
+    changed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name} v{self.version}'
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+    recipient = models.EmailField('Получатель')
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    claim = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        indexes = (
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='outgoing_email_pending_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
@@ -0,0 +1,94 @@
+"""Массовая модерация отзывов и комментариев.
+
+Отзывы и комментарии удаляются или скрываются запросами по спискам id
+в одной транзакции, с выключенными сигналами (`bulk_maintenance()`).
+Затем рейтинг, статистика и места в лидербордах затронутых произведений
+пересчитываются по видимым отзывам, а версии коллекций растут одним
+UPDATE.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import leaderboards, versioning
+from .models import Comment, Review
+from .ratings import rebuild_ratings
+from .signals import bulk_maintenance
+from .stats import rebuild_stats
+
+DELETE = 'delete'
+HIDE = 'hide'
+UNHIDE = 'unhide'
+ACTIONS = (DELETE, HIDE, UNHIDE)
+
+
+def targets(review_ids=(), comment_ids=(), author_ids=()):
+    """Отзывы и комментарии по id, а также всё, что написали авторы."""
+    reviews = Review.objects.filter(
+        Q(pk__in=review_ids) | Q(author_id__in=author_ids)
+    )
+    comments = Comment.objects.filter(
+        Q(pk__in=comment_ids) | Q(author_id__in=author_ids)
+    )
+    return reviews.order_by(), comments.order_by()
+
+
+def chunks(items, size):
+    items = sorted(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def recount(title_ids, batch_size):
+    for batch in chunks(title_ids, batch_size):
+        rebuild_ratings(batch)
+        rebuild_stats(batch)
+        leaderboards.resync_titles(batch)
+
+
+def moderate(action, review_ids=(), comment_ids=(), author_ids=(),
+             batch_size=500):
+    """Удаляет (`delete`), скрывает (`hide`) или возвращает (`unhide`).
+
+    Возвращает словарь с числом затронутых отзывов, комментариев
+    (при удалении — вместе с удалёнными каскадом) и произведений.
+    """
+    reviews, comments = targets(review_ids, comment_ids, author_ids)
+    if action != DELETE:
+        hidden = action == HIDE
+        reviews = reviews.exclude(is_hidden=hidden)
+        comments = comments.exclude(is_hidden=hidden)
+    with transaction.atomic(), bulk_maintenance():
+        review_rows = list(reviews.values_list('pk', 'title_id'))
+        comment_rows = list(
+            comments.values_list('review_id', 'review__title_id')
+        )
+        if action == DELETE:
+            counts = {}
+            for queryset in (comments, reviews):
+                for label, count in queryset.delete()[1].items():
+                    counts[label] = counts.get(label, 0) + count
+            reviews_count = counts.get(Review._meta.label, 0)
+            comments_count = counts.get(Comment._meta.label, 0)
+        else:
+            now = timezone.now()
+            reviews_count = reviews.update(is_hidden=hidden, updated_at=now)
+            comments_count = comments.update(
+                is_hidden=hidden, updated_at=now
+            )
+        title_ids = {title_id for _, title_id in review_rows + comment_rows}
+        recount(title_ids, batch_size)
+        versioning.bump(versioning.TITLES, versioning.TITLE_STATS)
+        names = {
+            versioning.comments_of(review_id)
+            for review_id, _ in review_rows + comment_rows
+        }
+        names.update(map(versioning.reviews_of, title_ids))
+        names.update(map(versioning.stats_of, title_ids))
+        for batch in chunks(names, batch_size):
+            versioning.bump_existing(*batch)
+    return {
+        'reviews': reviews_count,
+        'comments': comments_count,
+        'titles': len(title_ids),
+    }
@@ -0,0 +1,149 @@
+"""Очередь исходящих писем.
+
+Запрос только записывает письмо в таблицу, а отправляет его команда
+`send_queued_emails`. Воркеры забирают письма пачками, помечая их
+случайной меткой `claim` с арендой по `next_attempt_at`, поэтому
+несколько процессов не отправят одно письмо дважды. Неудачные
+попытки повторяются с экспоненциальной задержкой.
+"""
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 30
+DEFAULT_LEASE = 300
+
+
+def outbox_setting(name, default):
+    return getattr(settings, f'EMAIL_OUTBOX_{name}', default)
+
+
+def enqueue_email(recipient, subject, body):
+    email = OutgoingEmail.objects.create(
+        recipient=recipient, subject=subject, body=body
+    )
+    if outbox_setting('EAGER', False):
+        transaction.on_commit(lambda: deliver(claim_batch(ids=[email.pk])))
+    return email
+
+
+def pending():
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=outbox_setting('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS),
+        next_attempt_at__lte=timezone.now(),
+    )
+
+
+def claim_batch(batch_size=DEFAULT_BATCH_SIZE, ids=None):
+    """Забирает пачку писем и продлевает их аренду на время отправки."""
+    now = timezone.now()
+    queryset = pending()
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    candidates = list(
+        queryset.order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not candidates:
+        return []
+    claim = uuid.uuid4().hex
+    OutgoingEmail.objects.filter(
+        pk__in=candidates, next_attempt_at__lte=now, sent_at__isnull=True
+    ).update(
+        claim=claim,
+        next_attempt_at=now + timedelta(
+            seconds=outbox_setting('LEASE', DEFAULT_LEASE)
+        ),
+    )
+    return list(OutgoingEmail.objects.filter(claim=claim).order_by('id'))
+
+
+def deliver(emails):
+    """Отправляет письма через одно соединение с почтовым бэкендом."""
+    if not emails:
+        return 0, 0
+    sent, failed = [], []
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as error:
+        # Почтовый сервер недоступен: вся пачка откладывается, как при
+        # ошибке отправки каждого письма, и аренда снимается сразу.
+        failed = [(email, error) for email in emails]
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[email.recipient],
+                    connection=mail_connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    failed.append((email, error))
+                else:
+                    sent.append(email.pk)
+        finally:
+            mail_connection.close()
+
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        sent_at=timezone.now(), claim=''
+    )
+    retry_delay = outbox_setting('RETRY_DELAY', DEFAULT_RETRY_DELAY)
+    for email, error in failed:
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            attempts=F('attempts') + 1,
+            claim='',
+            last_error=repr(error),
+            next_attempt_at=timezone.now() + timedelta(
+                seconds=retry_delay * 2 ** email.attempts
+            ),
+        )
+    return len(sent), len(failed)
+
+
+def drain_worker(batch_size):
+    sent = failed = 0
+    while True:
+        batch = claim_batch(batch_size)
+        if not batch:
+            return sent, failed
+        batch_sent, batch_failed = deliver(batch)
+        sent += batch_sent
+        failed += batch_failed
+
+
+def drain_thread(batch_size):
+    try:
+        return drain_worker(batch_size)
+    finally:
+        connection.close()
+
+
+def drain(batch_size=DEFAULT_BATCH_SIZE, workers=1):
+    """Отправляет все готовые письма; возвращает (отправлено, ошибок)."""
+    if workers == 1:
+        results = [drain_worker(batch_size)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                drain_thread, [batch_size] * workers
+            ))
+    return (
+        sum(sent for sent, _ in results),
+        sum(failed for _, failed in results),
+    )
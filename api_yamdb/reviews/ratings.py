@@ -0,0 +1,63 @@
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.utils import timezone
+
+from .models import Review, Title
+
+
+def apply_score_delta(title_id, sum_delta, count_delta):
+    """Сдвигает накопленные сумму и количество оценок произведения."""
+    new_sum = F('score_sum') + sum_delta
+    new_count = F('score_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        score_sum=new_sum,
+        score_count=new_count,
+        rating=Case(
+            When(score_count__gt=-count_delta, then=new_sum / new_count),
+            default=Value(None),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def collect_aggregates(title_ids=None):
+    """Считает суммы и количество оценок заново по видимым отзывам."""
+    reviews = Review.objects.filter(is_hidden=False)
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+    rows = (
+        reviews.order_by()
+        .values('title_id')
+        .annotate(total=Sum('score'), count=Count('id'))
+    )
+    return {row['title_id']: (row['total'], row['count']) for row in rows}
+
+
+def rebuild_ratings(title_ids=None, verify=False):
+    """Пересобирает денормализованный рейтинг.
+
+    Возвращает список расхождений в виде кортежей
+    (id, (сумма, количество) в таблице, (сумма, количество) по отзывам).
+    При verify=True таблица произведений не изменяется, иначе
+    расхождения исправляются одним UPDATE на пачку произведений.
+    """
+    expected = collect_aggregates(title_ids)
+    titles = Title.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    drift, changed = [], []
+    now = timezone.now()
+    for title in titles.only('id', 'score_sum', 'score_count', 'rating'):
+        score_sum, score_count = expected.get(title.pk, (0, 0))
+        rating = score_sum // score_count if score_count else None
+        stored = (title.score_sum, title.score_count)
+        if stored == (score_sum, score_count) and title.rating == rating:
+            continue
+        drift.append((title.pk, stored, (score_sum, score_count)))
+        title.score_sum, title.score_count = score_sum, score_count
+        title.rating, title.updated_at = rating, now
+        changed.append(title)
+    if changed and not verify:
+        Title.objects.bulk_update(
+            changed, ['score_sum', 'score_count', 'rating', 'updated_at']
+        )
+    return drift
@@ -0,0 +1,207 @@
+"""Полнотекстовый индекс по названию и описанию произведений.
+
+Для SQLite это виртуальная таблица FTS5, для PostgreSQL — таблица с
+колонкой tsvector и GIN-индексом. Индекс обновляется сигналами при
+сохранении и удалении произведения; на прочих СУБД поиск сводится к
+`icontains` по названию.
+"""
+from django.db import connection, connections
+from django.db.models.expressions import RawSQL
+
+from .models import Title
+
+
+class TitleSearchIndex:
+    """Поиск без отдельного индекса."""
+
+    def create(self, cursor):
+        pass
+
+    def update(self, cursor, title):
+        pass
+
+    def add_many(self, cursor, titles):
+        """Новые произведения одним executemany."""
+        for title in titles:
+            self.update(cursor, title)
+
+    def remove(self, cursor, title_id):
+        pass
+
+    def clear(self, cursor):
+        pass
+
+    def search(self, queryset, query):
+        return queryset.filter(name__icontains=query)
+
+
+class SQLiteTitleSearchIndex(TitleSearchIndex):
+    table = 'reviews_title_fts'
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} '
+            'USING fts5(name, description, '
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def update(self, cursor, title):
+        self.remove(cursor, title.pk)
+        cursor.execute(
+            f'INSERT INTO {self.table} (rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            [title.pk, title.name, title.description or ''],
+        )
+
+    def add_many(self, cursor, titles):
+        cursor.executemany(
+            f'INSERT INTO {self.table} (rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            [
+                [title.pk, title.name, title.description or '']
+                for title in titles
+            ],
+        )
+
+    def remove(self, cursor, title_id):
+        cursor.execute(
+            f'DELETE FROM {self.table} WHERE rowid = %s', [title_id]
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {self.table}')
+
+    @staticmethod
+    def to_match(query):
+        """Каждое слово запроса — префикс, взятый в кавычки.
+
+        Так пользовательский ввод не разбирается как синтаксис FTS5.
+        """
+        terms = query.replace('"', '""').split()
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, query):
+        match = self.to_match(query)
+        if not match:
+            return queryset
+        table = Title._meta.db_table
+        return queryset.filter(
+            pk__in=RawSQL(
+                f'SELECT rowid FROM {self.table} '
+                f'WHERE {self.table} MATCH %s',
+                [match],
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT bm25({self.table}, 10.0, 1.0) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s AND rowid = "{table}"."id"',
+                [match],
+            )
+        ).order_by('search_rank', 'name')
+
+
+class PostgreSQLTitleSearchIndex(TitleSearchIndex):
+    table = 'reviews_title_search'
+    config = 'simple'
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            f'title_id bigint PRIMARY KEY REFERENCES '
+            f'{Title._meta.db_table} (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL)'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {self.table}_document_idx '
+            f'ON {self.table} USING GIN (document)'
+        )
+
+    upsert = (
+        f'INSERT INTO {table} (title_id, document) VALUES (%s, '
+        f"setweight(to_tsvector('{config}', %s), 'A') || "
+        f"setweight(to_tsvector('{config}', %s), 'B')) "
+        'ON CONFLICT (title_id) DO UPDATE SET document = EXCLUDED.document'
+    )
+
+    def update(self, cursor, title):
+        cursor.execute(
+            self.upsert, [title.pk, title.name, title.description or '']
+        )
+
+    def add_many(self, cursor, titles):
+        cursor.executemany(self.upsert, [
+            [title.pk, title.name, title.description or '']
+            for title in titles
+        ])
+
+    def remove(self, cursor, title_id):
+        cursor.execute(
+            f'DELETE FROM {self.table} WHERE title_id = %s', [title_id]
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, queryset, query):
+        if not query.split():
+            return queryset
+        table = Title._meta.db_table
+        tsquery = f"plainto_tsquery('{self.config}', %s)"
+        return queryset.filter(
+            pk__in=RawSQL(
+                f'SELECT title_id FROM {self.table} '
+                f'WHERE document @@ {tsquery}',
+                [query],
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT ts_rank(document, {tsquery}) FROM {self.table} '
+                f'WHERE title_id = "{table}"."id"',
+                [query],
+            )
+        ).order_by('-search_rank', 'name')
+
+
+INDEXES = {
+    'sqlite': SQLiteTitleSearchIndex,
+    'postgresql': PostgreSQLTitleSearchIndex,
+}
+
+
+def get_index(conn=connection):
+    return INDEXES.get(conn.vendor, TitleSearchIndex)()
+
+
+def create_index(using='default'):
+    conn = connections[using]
+    with conn.cursor() as cursor:
+        get_index(conn).create(cursor)
+
+
+def index_title(title):
+    with connection.cursor() as cursor:
+        get_index().update(cursor, title)
+
+
+def index_titles(titles):
+    with connection.cursor() as cursor:
+        get_index().add_many(cursor, titles)
+
+
+def unindex_title(title_id):
+    with connection.cursor() as cursor:
+        get_index().remove(cursor, title_id)
+
+
+def rebuild_index(batch_size=1000):
+    index = get_index()
+    with connection.cursor() as cursor:
+        index.create(cursor)
+        index.clear(cursor)
+        titles = Title.objects.only('id', 'name', 'description')
+        for title in titles.iterator(chunk_size=batch_size):
+            index.update(cursor, title)
+
+
+def search_titles(queryset, query):
+    return get_index().search(queryset, query)
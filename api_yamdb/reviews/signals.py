@@ -0,0 +1,213 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from core.tokens import revoke_claims
+
+from . import leaderboards, search, stats, versioning
+from .models import (Category, Comment, Genres, LeaderboardEntry, Review,
+                     Title, TitleStats, User)
+from .ratings import apply_score_delta
+
+# Внутри `bulk_maintenance()` сигналы отзывов и комментариев ничего не
+# делают: счётчики и версии пересчитывает сама массовая операция.
+maintenance = ContextVar('reviews_bulk_maintenance', default=False)
+
+
+@contextmanager
+def bulk_maintenance():
+    token = maintenance.set(True)
+    try:
+        yield
+    finally:
+        maintenance.reset(token)
+
+
+@receiver(post_migrate)
+def create_search_index(sender, app_config=None, using='default', **kwargs):
+    if app_config is not None and app_config.label == 'reviews':
+        search.create_index(using)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        TitleStats.objects.create(title=instance)
+    else:
+        # Могла смениться категория.
+        leaderboards.resync_titles([instance.pk])
+    search.index_title(instance)
+    versioning.bump(versioning.TITLES)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    search.unindex_title(instance.pk)
+    # Версия отзывов удалённого произведения не удаляется, а растёт:
+    # иначе старый ETag совпал бы с версией «пустой» коллекции.
+    versioning.bump(
+        versioning.TITLES,
+        versioning.reviews_of(instance.pk),
+        versioning.stats_of(instance.pk),
+        versioning.TITLE_STATS,
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        leaderboards.resync_titles([instance.pk])
+    elif action == 'post_clear':
+        leaderboards.drop_board(LeaderboardEntry.GENRE, instance.pk)
+    else:
+        leaderboards.resync_titles(pk_set)
+    versioning.bump(versioning.TITLES)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, raw=False, **kwargs):
+    if not raw:
+        versioning.bump(versioning.CATEGORIES, versioning.TITLES)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    # Произведения получают category=NULL запросом UPDATE, без сигналов.
+    leaderboards.drop_board(LeaderboardEntry.CATEGORY, instance.pk)
+
+
+@receiver(post_save, sender=Genres)
+@receiver(post_delete, sender=Genres)
+def genre_changed(sender, raw=False, **kwargs):
+    if not raw:
+        versioning.bump(versioning.GENRES, versioning.TITLES)
+
+
+@receiver(post_delete, sender=Genres)
+def genre_deleted(sender, instance, **kwargs):
+    # Связи с произведениями удаляются каскадом, без m2m_changed.
+    leaderboards.drop_board(LeaderboardEntry.GENRE, instance.pk)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or maintenance.get():
+        return
+    # Скрытый отзыв не входит в счётчики.
+    if created and not instance.is_hidden:
+        apply_score_delta(instance.title_id, instance.score, 1)
+        stats.apply_review_delta(
+            instance.title_id, instance.score, 1, instance.pub_date
+        )
+        leaderboards.refresh_title(instance.title_id, 1)
+    elif not instance.is_hidden:
+        previous = getattr(instance, '_loaded_score', instance.score)
+        if previous != instance.score:
+            apply_score_delta(
+                instance.title_id, instance.score - previous, 0
+            )
+            stats.move_score(instance.title_id, previous, instance.score)
+            leaderboards.refresh_title(instance.title_id, 0)
+    instance._loaded_score = instance.score
+    versioning.bump(
+        versioning.reviews_of(instance.title_id),
+        versioning.stats_of(instance.title_id),
+        versioning.TITLES,
+        versioning.TITLE_STATS,
+    )
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    if maintenance.get():
+        return
+    if not instance.is_hidden:
+        score = getattr(instance, '_loaded_score', instance.score)
+        apply_score_delta(instance.title_id, -score, -1)
+        stats.apply_review_delta(instance.title_id, score, -1)
+        leaderboards.refresh_title(instance.title_id, -1)
+    versioning.bump(
+        versioning.reviews_of(instance.title_id),
+        versioning.comments_of(instance.pk),
+        versioning.stats_of(instance.title_id),
+        versioning.TITLES,
+        versioning.TITLE_STATS,
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or maintenance.get():
+        return
+    title_id = stats.title_of(instance) if created else None
+    if title_id is None:
+        versioning.bump(versioning.comments_of(instance.review_id))
+        return
+    stats.apply_comment_delta(title_id, 1)
+    versioning.bump(
+        versioning.comments_of(instance.review_id),
+        versioning.stats_of(title_id),
+        versioning.TITLE_STATS,
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    # При каскадном удалении отзыва комментарии удаляются раньше него,
+    # так что произведение ещё находится по review_id.
+    if maintenance.get():
+        return
+    title_id = stats.title_of(instance)
+    if title_id is None:
+        versioning.bump(versioning.comments_of(instance.review_id))
+        return
+    stats.apply_comment_delta(title_id, -1)
+    versioning.bump(
+        versioning.comments_of(instance.review_id),
+        versioning.stats_of(title_id),
+        versioning.TITLE_STATS,
+    )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, '_loaded_access', None)
+    if not created and previous != instance.access_state:
+        revoke_claims(instance.username)
+    instance._loaded_access = instance.access_state
+    username = getattr(instance, '_loaded_username', instance.username)
+    if not created and username != instance.username:
+        # В токенах старое имя: его claims больше не годятся.
+        revoke_claims(username)
+        author_renamed(instance)
+    instance._loaded_username = instance.username
+
+
+def author_renamed(user):
+    """Имя автора выводится в отзывах и комментариях — сбросить их версии."""
+    # order_by(): иначе DISTINCT идёт и по pub_date из Meta.ordering.
+    title_ids = (
+        user.reviews.order_by().values_list('title_id', flat=True).distinct()
+    )
+    review_ids = (
+        user.comments.order_by().values_list('review_id', flat=True)
+        .distinct()
+    )
+    versioning.bump(
+        *map(versioning.reviews_of, title_ids),
+        *map(versioning.comments_of, review_ids),
+    )
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    revoke_claims(instance.username)
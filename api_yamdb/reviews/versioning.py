@@ -0,0 +1,128 @@
+"""Версии коллекций: дешёвый признак того, что ответ API устарел.
+
+Коллекция — это `titles`, `categories`, `genres`, а также отзывы одного
+произведения (`reviews:<title_id>`), комментарии одного отзыва
+(`comments:<review_id>`) и статистика произведения (`stats:<title_id>`,
+а для всех произведений сразу — `title-stats`). Сигналы увеличивают
+версию при любой записи, в том числе при удалении и смене жанров. Если
+строки версии ещё нет, она создаётся с `changed_at`, равным последнему
+`updated_at` коллекции; у пустой коллекции версия 0 и `changed_at`
+не задан.
+
+Версии читаются там же, где и коллекция (с реплики, если запрос читает
+с неё), а строку, которой там нет, `create()` вставляет и при гонке
+перечитывает в основной базе: реплика может ещё не получить строку,
+созданную другим запросом.
+"""
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import (Category, CollectionVersion, Comment, Genres, Review,
+                     Title, TitleStats)
+
+TITLES = 'titles'
+CATEGORIES = 'categories'
+GENRES = 'genres'
+TITLE_STATS = 'title-stats'
+
+
+def reviews_of(title_id):
+    return f'reviews:{title_id}'
+
+
+def comments_of(review_id):
+    return f'comments:{review_id}'
+
+
+def stats_of(title_id):
+    return f'stats:{title_id}'
+
+
+def collection_queryset(name):
+    kind, _, parent = name.partition(':')
+    if kind == TITLES:
+        return Title.objects.all()
+    if kind == CATEGORIES:
+        return Category.objects.all()
+    if kind == GENRES:
+        return Genres.objects.all()
+    if kind == 'reviews':
+        return Review.objects.filter(title_id=parent)
+    if kind == 'comments':
+        return Comment.objects.filter(review_id=parent)
+    if kind == TITLE_STATS:
+        return TitleStats.objects.all()
+    if kind == 'stats':
+        return TitleStats.objects.filter(pk=parent)
+    raise ValueError(f'Неизвестная коллекция: {name}')
+
+
+def bump(*names):
+    """Увеличивает версии одним UPDATE; недостающие строки создаются."""
+    names = set(names)
+    now = timezone.now()
+    versions = CollectionVersion.objects.filter(name__in=names)
+    updated = versions.update(version=F('version') + 1, changed_at=now)
+    if updated == len(names):
+        return
+    for name in names - set(versions.values_list('name', flat=True)):
+        create(name, now)
+
+
+def bump_existing(*names):
+    """Как `bump()`, но строки без версии не создаются.
+
+    Для массовых операций с тысячами коллекций: строку версии создаёт
+    `current()` при первой выдаче ETag, так что без строки клиентам
+    нечего сбрасывать.
+    """
+    if names:
+        CollectionVersion.objects.filter(name__in=set(names)).update(
+            version=F('version') + 1, changed_at=timezone.now()
+        )
+
+
+def primary():
+    """Менеджер версий на базе для записи."""
+    return CollectionVersion.objects.db_manager(
+        router.db_for_write(CollectionVersion)
+    )
+
+
+def create(name, changed_at):
+    versions = primary()
+    try:
+        with transaction.atomic(using=versions.db):
+            return versions.create(name=name, changed_at=changed_at)
+    except IntegrityError:
+        return versions.get(name=name)
+
+
+def reset():
+    """Сбросить все версии после массовой загрузки в обход сигналов."""
+    CollectionVersion.objects.all().delete()
+
+
+def current(names):
+    """Версии коллекций `names` одним запросом (плюс создание новых)."""
+    versions = {
+        version.name: version
+        for version in CollectionVersion.objects.filter(name__in=names)
+    }
+    for name in names:
+        if name in versions:
+            continue
+        changed_at = collection_queryset(name).aggregate(
+            changed_at=Max('updated_at')
+        )['changed_at']
+        if changed_at is None:
+            # Пустую коллекцию не сохраняем: URL с несуществующим
+            # родителем не должны плодить строки. Первая запись в неё
+            # создаст версию 1 через `bump()`.
+            versions[name] = CollectionVersion(
+                name=name, version=0, changed_at=None
+            )
+        else:
+            versions[name] = create(name, changed_at)
+    return [versions[name] for name in names]
@@ -0,0 +1,68 @@
+"""Нагрузочные прогоны API.
+
+Запуск: `pytest benchmarks/` из корня репозитория. Основной набор
+`tests/` эти файлы не собирает.
+
+Параметры:
+    --bench-size=small|medium|large  объём засеянных данных;
+    --bench-requests=N               запросов на каждый эндпоинт;
+    --bench-threshold=0.5            допустимый рост отношения к эталону
+                                     относительно baseline (доля);
+    --bench-slack=0.05               допуск сверх порога в долях эталона
+                                     для WSGI/ASGI и режимов журнала;
+    --bench-save                     записать число запросов и отношения
+                                     в baseline.json для этого размера;
+    --bench-concurrency=200          одновременных клиентов в прогоне
+                                     WSGI против ASGI;
+    --bench-client-delay-ms=250      сколько медленный клиент читает ответ;
+    --bench-wsgi-threads=16          потоков синхронного воркера.
+"""
+import pytest
+
+from tests.fixtures.fixture_db import *  # noqa: F401,F403
+from tests.fixtures.fixture_user import *  # noqa: F401,F403
+
+from .harness import BASELINE_PATH, load
+from .seed import SIZES
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--bench-size', default='small', choices=sorted(SIZES))
+    group.addoption('--bench-requests', type=int, default=50)
+    group.addoption('--bench-threshold', type=float, default=0.5)
+    group.addoption('--bench-slack', type=float, default=0.05)
+    group.addoption('--bench-save', action='store_true')
+    group.addoption('--bench-concurrency', type=int, default=200)
+    group.addoption('--bench-client-delay-ms', type=float, default=250.0)
+    group.addoption('--bench-wsgi-threads', type=int, default=16)
+
+
+@pytest.fixture(autouse=True)
+def bench_database(file_database):
+    """Замеры идут на базе в файле, как в работе, а не в памяти."""
+    return file_database
+
+
+@pytest.fixture(scope='session')
+def bench_results():
+    """Группы, замеренные в этой сессии: эталоны для других тестов."""
+    return {}
+
+
+@pytest.fixture
+def bench_config(request):
+    config = request.config
+    size = config.getoption('--bench-size')
+    return {
+        'size': size,
+        'dimensions': SIZES[size],
+        'requests': config.getoption('--bench-requests'),
+        'threshold': config.getoption('--bench-threshold'),
+        'slack': config.getoption('--bench-slack'),
+        'save': config.getoption('--bench-save'),
+        'concurrency': config.getoption('--bench-concurrency'),
+        'client_delay': config.getoption('--bench-client-delay-ms') / 1000,
+        'wsgi_threads': config.getoption('--bench-wsgi-threads'),
+        'baseline': load(BASELINE_PATH).get(size, {}),
+    }
@@ -0,0 +1,403 @@
+"""Замеры эндпоинтов и сравнение с сохранённым baseline.
+
+Baseline не хранит миллисекунд и RPS: они зависят от машины. В нём для
+каждого размера набора лежат число SQL-запросов и `relative` — стоимость
+замера относительно эталона из того же прогона (см. `relative`).
+"""
+import asyncio
+import json
+import re
+import socket
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                          WSGIRequestHandler)
+from django.core.wsgi import get_wsgi_application
+from django.test import RequestFactory
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = BENCH_DIR / 'baseline.json'
+RESULTS_PATH = BENCH_DIR / 'results.json'
+
+QUERIES_RE = re.compile(r'queries;desc="(\d+) queries"')
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def queries_from(response):
+    """Число SQL-запросов из заголовка `Server-Timing`."""
+    match = QUERIES_RE.search(response.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
+
+
+class NoDelayRequestHandler(WSGIRequestHandler):
+    """Без Nagle: иначе заголовки и тело ответа ждут отложенный ACK."""
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WSGIServer:
+    """Многопоточный WSGI-сервер Django в фоновом потоке."""
+
+    def __init__(self, host='127.0.0.1'):
+        self.server = ThreadedWSGIServer((host, 0), NoDelayRequestHandler)
+        self.server.set_app(get_wsgi_application())
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+class ClientTransport:
+    """Запросы через тестовый клиент DRF, без сети."""
+    name = 'client'
+
+    def __init__(self, clients):
+        self.clients = clients
+
+    def request(self, role, method, url, data=None):
+        client = self.clients[role]
+        response = getattr(client, method)(url, data=data, format='json')
+        return response.status_code, response
+
+
+class WSGITransport:
+    """Запросы по HTTP к настоящему WSGI-серверу."""
+    name = 'wsgi'
+
+    def __init__(self, base_url, tokens):
+        self.base_url = base_url
+        self.sessions = {}
+        for role, token in tokens.items():
+            session = requests.Session()
+            if token:
+                session.headers['Authorization'] = f'Bearer {token}'
+            self.sessions[role] = session
+
+    def request(self, role, method, url, data=None):
+        response = self.sessions[role].request(
+            method.upper(), self.base_url + url, json=data
+        )
+        return response.status_code, response.headers
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+
+
+class ConcurrentWSGI:
+    """Синхронный воркер с `threads` потоками и медленными клиентами.
+
+    Как у gthread-воркера, поток занят запросом, пока ответ не ушёл
+    клиенту: `client_delay` секунд после рендеринга поток не свободен.
+    """
+    name = 'wsgi-concurrent'
+
+    def __init__(self, application, threads, client_delay):
+        self.application = application
+        self.slots = threading.BoundedSemaphore(threads)
+        self.client_delay = client_delay
+        self.factory = RequestFactory()
+
+    def request(self, url):
+        environ = self.factory.get(url).environ
+        statuses = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(int(status.split()[0]))
+
+        with self.slots:
+            response = self.application(environ, start_response)
+            try:
+                b''.join(response)
+            finally:
+                response.close()
+            time.sleep(self.client_delay)
+        return statuses[0]
+
+    def run(self, url, concurrency, total):
+        def client(count):
+            latencies = []
+            for _ in range(count):
+                started = time.perf_counter()
+                status = self.request(url)
+                latencies.append((time.perf_counter() - started, status))
+            return latencies
+
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            return [
+                sample
+                for samples in clients.map(client, split(total, concurrency))
+                for sample in samples
+            ]
+
+
+class ConcurrentASGI:
+    """Один событийный цикл; медленный клиент ждёт в `send`."""
+    name = 'asgi-concurrent'
+
+    def __init__(self, application, client_delay):
+        self.application = application
+        self.client_delay = client_delay
+
+    async def request(self, url):
+        path, _, query = url.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'},
+            'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+        }
+        statuses = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif not message.get('more_body'):
+                await asyncio.sleep(self.client_delay)
+
+        await self.application(scope, receive, send)
+        return statuses[0]
+
+    def run(self, url, concurrency, total):
+        async def client(count):
+            latencies = []
+            for _ in range(count):
+                started = time.perf_counter()
+                status = await self.request(url)
+                latencies.append((time.perf_counter() - started, status))
+            return latencies
+
+        async def clients():
+            return await asyncio.gather(
+                *map(client, split(total, concurrency))
+            )
+
+        return [
+            sample for samples in asyncio.run(clients()) for sample in samples
+        ]
+
+
+def split(total, parts):
+    """`total` запросов поровну на `parts` клиентов."""
+    return [total // parts + (idx < total % parts) for idx in range(parts)]
+
+
+def measure_concurrent(driver, url, concurrency, total):
+    driver.run(url, min(concurrency, WARMUP), WARMUP)
+    started = time.perf_counter()
+    samples = driver.run(url, concurrency, total)
+    elapsed = time.perf_counter() - started
+    statuses = {status for _, status in samples}
+    assert statuses == {200}, f'{driver.name}: {url} вернул {statuses}.'
+    latencies = [latency for latency, _ in samples]
+    return {
+        'requests': total,
+        'concurrency': concurrency,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'queries': None,
+        'rps': round(total / elapsed, 1),
+    }
+
+
+WARMUP = 5
+
+
+def measure(transport, endpoints, iterations):
+    """Гоняет эндпоинты по `iterations` раз и возвращает сводки по именам.
+
+    Запросы идут по кругу: за итерацию — по одному на каждый эндпоинт.
+    Так дрейф машины (частота процессора, сборщик мусора, рост базы)
+    ложится на все замеры поровну и не искажает отношения к эталону.
+    Первые `WARMUP` кругов не учитываются: они прогревают кэши Python,
+    ORM и SQLite.
+    """
+    for iteration in range(WARMUP):
+        for endpoint in endpoints:
+            transport.request(endpoint.role, *endpoint.build(-1 - iteration))
+    latencies = {endpoint.name: [] for endpoint in endpoints}
+    queries = {endpoint.name: [] for endpoint in endpoints}
+    for iteration in range(iterations):
+        for endpoint in endpoints:
+            method, url, data = endpoint.build(iteration)
+            started = time.perf_counter()
+            status, headers = transport.request(
+                endpoint.role, method, url, data
+            )
+            latencies[endpoint.name].append(time.perf_counter() - started)
+            assert status == endpoint.status, (
+                f'{endpoint.name}: {method.upper()} {url} вернул {status}, '
+                f'ожидался {endpoint.status}.'
+            )
+            count = queries_from(headers)
+            if count is not None:
+                queries[endpoint.name].append(count)
+    return {
+        name: summary(samples, queries[name])
+        for name, samples in latencies.items()
+    }
+
+
+def measure_calls(calls, iterations):
+    """Замеры функций без HTTP: `calls` сопоставляет имени функцию.
+
+    Как и в `measure`, вызовы идут по кругу, по одному на функцию за
+    итерацию, а первые `WARMUP` кругов не учитываются.
+    """
+    for _ in range(WARMUP):
+        for call in calls.values():
+            call()
+    latencies = {name: [] for name in calls}
+    for _ in range(iterations):
+        for name, call in calls.items():
+            started = time.perf_counter()
+            call()
+            latencies[name].append(time.perf_counter() - started)
+    return {
+        name: summary(samples, []) for name, samples in latencies.items()
+    }
+
+
+def summary(latencies, queries):
+    """Перцентили, медиана SQL-запросов и RPS по задержкам одного замера."""
+    elapsed = sum(latencies)
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'queries': statistics.median(queries) if queries else None,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+    }
+
+
+def load(path):
+    if not Path(path).exists():
+        return {}
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def merge(path, size, transport, results):
+    """Дописывает результаты прогона в JSON, не трогая другие размеры."""
+    data = load(path)
+    data.setdefault(size, {})[transport] = results
+    with open(path, 'w', encoding='utf-8') as target:
+        json.dump(data, target, ensure_ascii=False, indent=2, sort_keys=True)
+        target.write('\n')
+
+
+def relative(results, references, metric='p50_ms'):
+    """Дописывает в замеры `relative` — стоимость относительно эталона.
+
+    `references` сопоставляет имени замера замер-эталон того же прогона.
+    Миллисекунды зависят от машины, а отношение двух замеров одного
+    прогона — почти нет. Для `rps` отношение перевёрнуто: и здесь
+    больше единицы — медленнее эталона.
+    """
+    for name, current in results.items():
+        reference = references.get(name)
+        current['relative'] = None
+        if reference is None or not current[metric] or not reference[metric]:
+            continue
+        if metric == 'rps':
+            value = reference[metric] / current[metric]
+        else:
+            value = current[metric] / reference[metric]
+        current['relative'] = round(value, 3)
+    return results
+
+
+def baseline_entries(results):
+    """Часть замеров для baseline: SQL-запросы и отношения к эталону."""
+    return {
+        name: {'queries': current['queries'], 'relative': current['relative']}
+        for name, current in results.items()
+        if current['queries'] is not None or current['relative'] is not None
+    }
+
+
+def regressions(results, baseline, threshold, slack=0.0):
+    """Замеры, где отношение к эталону или число запросов хуже baseline.
+
+    Отношение может вырасти на долю `threshold`; `slack` в долях эталона
+    добавляется сверху для прогонов, где шумит сама машина (потоки,
+    блокировки SQLite). Число SQL-запросов расти не должно вовсе.
+    """
+    problems = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if (
+            current['relative'] is not None
+            and previous.get('relative') is not None
+        ):
+            limit = previous['relative'] * (1 + threshold) + slack
+            if current['relative'] > limit:
+                problems.append(
+                    f'{name}: {current["relative"]} от эталона > '
+                    f'{limit:.3f} (baseline {previous["relative"]})'
+                )
+        if (
+            current['queries'] is not None
+            and previous.get('queries') is not None
+            and current['queries'] > previous['queries']
+        ):
+            problems.append(
+                f'{name}: {current["queries"]} SQL-запросов на запрос '
+                f'против {previous["queries"]} в baseline'
+            )
+    return problems
+
+
+def record(bench_config, group, results, noisy=False):
+    """Сохраняет замеры группы и возвращает регрессии против baseline.
+
+    В baseline (`--bench-save`) попадают только `baseline_entries`.
+    `--bench-slack` действует только на группы с `noisy`.
+    """
+    size = bench_config['size']
+    merge(RESULTS_PATH, size, group, results)
+    if bench_config['save']:
+        merge(BASELINE_PATH, size, group, baseline_entries(results))
+    return regressions(
+        results, bench_config['baseline'].get(group, {}),
+        bench_config['threshold'], bench_config['slack'] if noisy else 0,
+    )
@@ -0,0 +1,136 @@
+"""Синтетический каталог для нагрузочных прогонов."""
+import random
+
+from django.conf import settings
+
+from reviews import versioning
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Category, Comment, Genres, Review, Title, User
+from reviews.ratings import rebuild_ratings
+from reviews.search import rebuild_index
+from reviews.stats import rebuild_stats
+
+# Произведений, отзывов на произведение, комментариев на отзыв.
+SIZES = {
+    'small': (50, 5, 2),
+    'medium': (500, 10, 3),
+    'large': (5000, 20, 5),
+}
+BATCH_SIZE = 1000
+AUTHORS = 100
+WORDS = (
+    'побег', 'крёстный', 'отец', 'тёмный', 'рыцарь', 'список', 'шиндлера',
+    'властелин', 'колец', 'бойцовский', 'клуб', 'форрест', 'гамп',
+    'начало', 'матрица', 'славные', 'парни', 'семь', 'самураев',
+)
+
+
+def at_least(dimensions, titles):
+    """Размеры набора, но не меньше `titles` произведений.
+
+    Прогонам крупных страниц нужно столько строк, сколько на странице,
+    иначе в наборе `small` все страницы одинаковые.
+    """
+    titles_count, *per_title = dimensions
+    return (max(titles_count, titles), *per_title)
+
+
+def seed(dimensions, rng=None):
+    """Заполняет базу и возвращает id для построения URL."""
+    rng = rng or random.Random(0)
+    titles_count, reviews_per_title, comments_per_review = dimensions
+
+    # SQLite не возвращает id из bulk_create, поэтому id перечитываются.
+    Category.objects.bulk_create(
+        Category(name=f'Категория {idx}', slug=f'category-{idx}')
+        for idx in range(3)
+    )
+    Genres.objects.bulk_create(
+        Genres(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(10)
+    )
+    categories = list(Category.objects.order_by('id'))
+    genres = list(Genres.objects.order_by('id'))
+    Title.objects.bulk_create(
+        (
+            Title(
+                name=' '.join(rng.sample(WORDS, 3)).capitalize(),
+                year=rng.randint(1950, 2022),
+                description=' '.join(rng.choices(WORDS, k=12)),
+                category_id=categories[idx % len(categories)].pk,
+            )
+            for idx in range(titles_count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    title_ids = list(Title.objects.values_list('id', flat=True))
+    genre_ids = [genre.pk for genre in genres]
+    GenreTitle = Title.genre.through
+    GenreTitle.objects.bulk_create(
+        (
+            GenreTitle(title_id=title_id, genres_id=genre_id)
+            for title_id in title_ids
+            for genre_id in rng.sample(genre_ids, 2)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    # Отзывы на произведение пишут разные авторы из общего пула.
+    authors_count = max(AUTHORS, reviews_per_title)
+    User.objects.bulk_create(
+        (
+            User(
+                username=f'bench{idx}',
+                email=f'bench{idx}@yamdb.fake',
+                confirmation_code='x' * settings.CODE_LENGTH,
+            )
+            for idx in range(authors_count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    author_ids = list(
+        User.objects.filter(username__startswith='bench')
+        .order_by('id').values_list('id', flat=True)
+    )
+    Review.objects.bulk_create(
+        (
+            Review(
+                title_id=title_id,
+                author_id=author_ids[
+                    (title_idx + review_idx) % len(author_ids)
+                ],
+                text=' '.join(rng.choices(WORDS, k=20)),
+                score=rng.randint(1, 10),
+            )
+            for title_idx, title_id in enumerate(title_ids)
+            for review_idx in range(reviews_per_title)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    review_ids = list(Review.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                review_id=review_id,
+                author_id=rng.choice(author_ids),
+                text=' '.join(rng.choices(WORDS, k=8)),
+            )
+            for review_id in review_ids
+            for _ in range(comments_per_review)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    rebuild_ratings()
+    rebuild_stats()
+    rebuild_leaderboards()
+    rebuild_index()
+    versioning.reset()
+
+    review = Review.objects.filter(comments__isnull=False).first()
+    return {
+        'title_ids': title_ids,
+        'title_id': review.title_id,
+        'review_id': review.pk,
+        'comment_id': review.comments.first().pk,
+        'category': categories[0].slug,
+        'genre': genres[0].slug,
+    }
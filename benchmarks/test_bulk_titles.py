@@ -0,0 +1,85 @@
+"""Загрузка пачки произведений: по одному POST против `titles/bulk/`.
+
+Замеряется время загрузки всей пачки целиком; число SQL-запросов —
+на всю пачку, из заголовка `Server-Timing` ответа (у одиночных POST —
+сумма).
+"""
+import time
+
+import pytest
+
+from .harness import percentile, queries_from, record, relative
+from .seed import seed
+
+BATCH = 300
+RUNS = 3
+
+
+def payload(run, category, genres):
+    return [
+        {
+            'name': f'Сезон {run}, произведение {idx}', 'year': 2022,
+            'category': category, 'genre': genres,
+        }
+        for idx in range(BATCH)
+    ]
+
+
+def post_single(client, items):
+    queries = 0
+    for item in items:
+        response = client.post('/api/v1/titles/', item, format='json')
+        assert response.status_code == 201
+        queries += queries_from(response) or 0
+    return queries
+
+
+def post_bulk(client, items):
+    response = client.post('/api/v1/titles/bulk/', items, format='json')
+    assert response.status_code == 201
+    assert len(response.json()['ids']) == len(items)
+    return queries_from(response) or 0
+
+
+def measure_load(load, client, category, genres):
+    durations, queries = [], []
+    for run in range(RUNS):
+        items = payload(f'{load.__name__}-{run}', category, genres)
+        started = time.perf_counter()
+        queries.append(load(client, items))
+        durations.append(time.perf_counter() - started)
+    return {
+        'requests': RUNS,
+        'p50_ms': round(percentile(durations, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(durations, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(durations, 0.99) * 1000, 3),
+        'queries': max(queries),
+        'rps': round(BATCH * RUNS / sum(durations), 1),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_titles(bench_config, admin_client):
+    ids = seed(bench_config['dimensions'])
+    genres = [ids['genre']]
+    results = {
+        f'titles-{BATCH}-{load.__name__}': measure_load(
+            load, admin_client, ids['category'], genres
+        )
+        for load in (post_single, post_bulk)
+    }
+    relative(results, dict.fromkeys(
+        results, results[f'titles-{BATCH}-post_single']
+    ))
+    problems = record(bench_config, 'bulk-titles', results)
+
+    bulk = results[f'titles-{BATCH}-post_bulk']
+    single = results[f'titles-{BATCH}-post_single']
+    assert bulk['p50_ms'] < single['p50_ms'], (
+        f'titles/bulk/ {bulk["p50_ms"]} мс не быстрее одиночных POST '
+        f'{single["p50_ms"]} мс.'
+    )
+    assert bulk['queries'] < single['queries'] / 10
+    assert not problems, 'Регрессия массовой загрузки:\n' + '\n'.join(
+        problems
+    )
@@ -0,0 +1,74 @@
+"""WSGI против ASGI при множестве одновременных медленных клиентов.
+
+Оба приложения вызываются в процессе, без сети. Синхронный воркер
+держит поток, пока клиент читает ответ; под ASGI ожидание клиента
+идёт в событийном цикле, а потоки нужны только ORM и рендерингу
+(`api.async_views`). Пропускная способность ASGI сравнивается с WSGI
+того же прогона, поэтому `asgi_driver` отдельно от `wsgi_driver` с
+baseline не сверяется.
+"""
+import pytest
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import include, path
+
+from api.async_views import async_read_views
+from api.urls import v1_router
+
+from .harness import (ConcurrentASGI, ConcurrentWSGI, measure_concurrent,
+                      record, relative)
+from .seed import seed
+
+# Маршруты как под asgi.py с ASYNC_READ_VIEWS=1.
+urlpatterns = [
+    path('api/v1/', include(async_read_views(v1_router.urls))),
+]
+
+
+def read_urls(ids):
+    title = f'/api/v1/titles/{ids["title_id"]}'
+    return {
+        'titles-list': '/api/v1/titles/',
+        'reviews-list': f'{title}/reviews/',
+        'comments-list': f'{title}/reviews/{ids["review_id"]}/comments/',
+    }
+
+
+@pytest.fixture
+def wsgi_driver(bench_config):
+    return ConcurrentWSGI(
+        WSGIHandler(), bench_config['wsgi_threads'],
+        bench_config['client_delay'],
+    )
+
+
+@pytest.fixture
+def asgi_driver(bench_config, settings):
+    settings.ROOT_URLCONF = __name__
+    return ConcurrentASGI(ASGIHandler(), bench_config['client_delay'])
+
+
+@pytest.mark.parametrize('driver_fixture', ('wsgi_driver', 'asgi_driver'))
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_reads(request, bench_config, bench_results,
+                          driver_fixture):
+    ids = seed(bench_config['dimensions'])
+    driver = request.getfixturevalue(driver_fixture)
+    concurrency = bench_config['concurrency']
+    results = {
+        name: measure_concurrent(driver, url, concurrency, concurrency * 2)
+        for name, url in read_urls(ids).items()
+    }
+
+    bench_results[driver.name] = results
+    relative(
+        results,
+        bench_results.get(ConcurrentWSGI.name, {})
+        if driver.name == ConcurrentASGI.name else {},
+        metric='rps',
+    )
+
+    problems = record(bench_config, driver.name, results, noisy=True)
+    assert not problems, 'Регрессия пропускной способности:\n' + '\n'.join(
+        problems
+    )
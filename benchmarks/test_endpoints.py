@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+
+import pytest
+
+from reviews.models import Review
+
+from .harness import (ClientTransport, WSGIServer, WSGITransport, measure,
+                      record, relative)
+from .seed import seed
+
+
+# Эталон для отношений: самый простой список, один короткий запрос.
+REFERENCE = 'categories-list'
+
+
+@dataclass
+class Endpoint:
+    name: str
+    url: str
+    role: str = 'anon'
+    method: str = 'get'
+    data: dict = None
+    status: int = 200
+
+    def build(self, iteration):
+        data = self.data
+        if data is not None:
+            data = {
+                key: value.format(n=iteration) if isinstance(value, str)
+                else value
+                for key, value in data.items()
+            }
+        return self.method, self.url.format(n=iteration), data
+
+
+def endpoints(ids):
+    title = f'/api/v1/titles/{ids["title_id"]}'
+    review = f'{title}/reviews/{ids["review_id"]}'
+    own_review = f'{title}/reviews/{ids["own_review_id"]}'
+    return (
+        Endpoint('titles-list', '/api/v1/titles/'),
+        Endpoint('titles-list-limit-100', '/api/v1/titles/?limit=100'),
+        Endpoint('titles-list-deep-offset',
+                 f'/api/v1/titles/?offset={len(ids["title_ids"]) - 10}'),
+        Endpoint('titles-list-cursor', '/api/v1/titles/?pagination=cursor'),
+        Endpoint('titles-filter-genre',
+                 f'/api/v1/titles/?genre={ids["genre"]}'),
+        Endpoint('titles-search', '/api/v1/titles/?search=рыцарь'),
+        Endpoint('titles-detail', f'{title}/'),
+        Endpoint('categories-list', '/api/v1/categories/'),
+        Endpoint('genres-list', '/api/v1/genres/'),
+        Endpoint('reviews-list', f'{title}/reviews/'),
+        Endpoint('reviews-list-authenticated', f'{title}/reviews/',
+                 role='user'),
+        Endpoint('reviews-detail', f'{review}/'),
+        Endpoint('comments-list', f'{review}/comments/'),
+        Endpoint('comments-detail',
+                 f'{review}/comments/{ids["comment_id"]}/'),
+        Endpoint('comments-create', f'{review}/comments/', role='user',
+                 method='post', data={'text': 'комментарий {n}'},
+                 status=201),
+        Endpoint('reviews-update', f'{own_review}/', role='user',
+                 method='patch', data={'score': 7}),
+        Endpoint('titles-create', '/api/v1/titles/', role='admin',
+                 method='post', status=201, data={
+                     'name': 'Новинка {n}', 'year': 2022,
+                     'category': ids['category'], 'genre': [ids['genre']],
+                 }),
+    )
+
+
+@pytest.fixture
+def catalogue(bench_config, user):
+    ids = seed(bench_config['dimensions'])
+    ids['own_review_id'] = Review.objects.create(
+        title_id=ids['title_ids'][-1], author=user, text='мой', score=5
+    ).pk
+    return ids
+
+
+@pytest.fixture
+def client_transport(client, user_client, admin_client):
+    return ClientTransport(
+        {'anon': client, 'user': user_client, 'admin': admin_client}
+    )
+
+
+@pytest.fixture
+def wsgi_transport(transactional_db, token_user, token_admin):
+    with WSGIServer() as server:
+        transport = WSGITransport(server.url, {
+            'anon': None,
+            'user': token_user['access'],
+            'admin': token_admin['access'],
+        })
+        yield transport
+        transport.close()
+
+
+@pytest.mark.parametrize('transport_fixture',
+                         ('client_transport', 'wsgi_transport'))
+@pytest.mark.django_db(transaction=True)
+def test_endpoints(request, bench_config, catalogue, transport_fixture):
+    transport = request.getfixturevalue(transport_fixture)
+    requests = bench_config['requests']
+    reads, writes = [], []
+    for endpoint in endpoints(catalogue):
+        if endpoint.name == REFERENCE:
+            reference = endpoint
+        (reads if endpoint.method == 'get' else writes).append(endpoint)
+    # Записи сбрасывают кэш ответов, поэтому чтения и записи идут
+    # отдельными кругами, и в каждом свой замер эталона.
+    results = measure(transport, reads, requests)
+    relative(results, dict.fromkeys(results, results[REFERENCE]))
+    written = measure(transport, [reference, *writes], requests)
+    relative(written, dict.fromkeys(written, written[REFERENCE]))
+    results.update(
+        (endpoint.name, written[endpoint.name]) for endpoint in writes
+    )
+
+    problems = record(bench_config, transport.name, results)
+    assert not problems, 'Регрессия производительности:\n' + '\n'.join(
+        problems
+    )
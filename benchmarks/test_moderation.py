@@ -0,0 +1,127 @@
+"""Волна спама: удаление по одному DELETE против `moderation/`.
+
+Спамер пишет по отзыву на каждое произведение и комментарии к чужим
+отзывам, всего SPAM объектов; замеряется время удаления всей волны.
+Число SQL-запросов — на всю волну, из заголовка `Server-Timing`
+ответа (у одиночных DELETE — сумма).
+"""
+import time
+
+import pytest
+
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Comment, Review, Title, User
+from reviews.ratings import rebuild_ratings
+from reviews.stats import rebuild_stats
+
+from .harness import percentile, queries_from, record, relative
+from .seed import seed
+
+SPAM = 300
+RUNS = 3
+
+
+def spam_wave(run):
+    """Отзывы и комментарии спамера через ORM, с сигналами."""
+    spammer = User.objects.create(
+        username=f'spammer-{run}', email=f'spammer-{run}@yamdb.fake'
+    )
+    title_ids = list(Title.objects.values_list('id', flat=True)[:SPAM // 2])
+    reviews = [
+        Review.objects.create(
+            title_id=title_id, author=spammer, text='спам', score=10
+        )
+        for title_id in title_ids
+    ]
+    targets = Review.objects.exclude(author=spammer).values_list(
+        'id', 'title_id'
+    )[:SPAM - len(reviews)]
+    comments = [
+        (
+            Comment.objects.create(
+                review_id=review_id, author=spammer, text='спам'
+            ),
+            title_id,
+        )
+        for review_id, title_id in targets
+    ]
+    return reviews, comments
+
+
+def delete_single(client, reviews, comments):
+    queries = 0
+    urls = [
+        f'/api/v1/titles/{title_id}/reviews/{comment.review_id}/comments/'
+        f'{comment.pk}/'
+        for comment, title_id in comments
+    ] + [
+        f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+        for review in reviews
+    ]
+    for url in urls:
+        response = client.delete(url)
+        assert response.status_code == 204
+        queries += queries_from(response) or 0
+    return queries
+
+
+def delete_bulk(client, reviews, comments):
+    response = client.post(
+        '/api/v1/moderation/',
+        {
+            'action': 'delete',
+            'reviews': [review.pk for review in reviews],
+            'comments': [comment.pk for comment, _ in comments],
+        },
+        format='json',
+    )
+    assert response.status_code == 200
+    assert response.json()['reviews'] == len(reviews)
+    return queries_from(response) or 0
+
+
+def measure_wave(delete, client):
+    durations, queries, sizes = [], [], []
+    for run in range(RUNS):
+        reviews, comments = spam_wave(f'{delete.__name__}-{run}')
+        sizes.append(len(reviews) + len(comments))
+        started = time.perf_counter()
+        queries.append(delete(client, reviews, comments))
+        durations.append(time.perf_counter() - started)
+    return {
+        'requests': RUNS,
+        'p50_ms': round(percentile(durations, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(durations, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(durations, 0.99) * 1000, 3),
+        'queries': max(queries),
+        'rps': round(sum(sizes) / sum(durations), 1),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_moderation(bench_config, moderator_client):
+    seed(bench_config['dimensions'])
+    results = {
+        f'spam-{SPAM}-{delete.__name__}': measure_wave(
+            delete, moderator_client
+        )
+        for delete in (delete_single, delete_bulk)
+    }
+    relative(results, dict.fromkeys(
+        results, results[f'spam-{SPAM}-delete_single']
+    ))
+    problems = record(bench_config, 'moderation', results)
+
+    assert not rebuild_ratings(verify=True)
+    assert not rebuild_stats(verify=True)
+    assert not rebuild_leaderboards(verify=True)
+    bulk = results[f'spam-{SPAM}-delete_bulk']
+    single = results[f'spam-{SPAM}-delete_single']
+    assert bulk['p50_ms'] < single['p50_ms'], (
+        f'moderation/ {bulk["p50_ms"]} мс не быстрее одиночных DELETE '
+        f'{single["p50_ms"]} мс.'
+    )
+    assert bulk['queries'] < single['queries'] / 10
+    assert not problems, 'Регрессия массовой модерации:\n' + '\n'.join(
+        problems
+    )
@@ -0,0 +1,55 @@
+"""Рендеринг крупных страниц каталога: `JSONRenderer` против orjson.
+
+Данные берутся из настоящего ответа `/api/v1/titles/?limit=N` (с
+вложенными жанрами и категорией), замеряется только рендеринг. Каталог
+засевается не меньше чем на max(LIMITS) произведений при любом
+`--bench-size`, и каждая страница полная. Страница собирается заново
+из тела ответа: объекты ORM разбросаны по памяти, и от запуска к
+запуску это сдвигало отношение orjson к json в полтора раза.
+"""
+import json
+from functools import partial
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+
+from .harness import measure_calls, record, relative
+from .seed import at_least, seed
+
+LIMITS = (100, 500, 1000)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_render_large_pages(bench_config, client):
+    seed(at_least(bench_config['dimensions'], max(LIMITS)))
+    results = {}
+    for limit in LIMITS:
+        response = client.get(f'/api/v1/titles/?limit={limit}')
+        data = json.loads(response.content)
+        assert len(data['results']) == limit, (
+            f'Страница limit={limit} неполная: {len(data["results"])} строк.'
+        )
+        results.update(measure_calls({
+            f'titles-limit-{limit}-{name}': partial(renderer.render, data)
+            for name, renderer in (
+                ('stdlib', JSONRenderer()),
+                ('fast', renderers.FastJSONRenderer()),
+            )
+        }, bench_config['requests']))
+    # orjson — относительно json той же страницы.
+    relative(results, {
+        f'titles-limit-{limit}-fast': results[f'titles-limit-{limit}-stdlib']
+        for limit in LIMITS
+    })
+    problems = record(bench_config, 'renderers', results)
+
+    if renderers.orjson is not None:
+        for limit in LIMITS:
+            fast = results[f'titles-limit-{limit}-fast']['p50_ms']
+            stdlib = results[f'titles-limit-{limit}-stdlib']['p50_ms']
+            assert fast < stdlib, (
+                f'limit={limit}: orjson {fast} мс не быстрее json {stdlib} мс.'
+            )
+    assert not problems, 'Регрессия рендеринга:\n' + '\n'.join(problems)
@@ -0,0 +1,73 @@
+"""Сериализация страниц списков: `ModelSerializer` против `.values()`.
+
+Замер включает запросы к базе: быстрый путь читает строки через
+`.values()`, обычный — модели с `select_related`/`prefetch_related`.
+Каталог засевается так, чтобы каждая страница была полной (PAGE строк)
+при любом `--bench-size`.
+"""
+from functools import partial
+
+import pytest
+
+from api.serializers import (CommentsSerializer, FirstTitleSerializer,
+                             LeanCommentSerializer, LeanReviewSerializer,
+                             LeanTitleSerializer, ReviewSerializer)
+from api.views import TitleViewSet
+from reviews.models import Comment, Review
+
+from .harness import measure_calls, record, relative
+from .seed import at_least, seed
+
+PAGE = 1000
+
+
+def serialize(serializer_class, queryset):
+    return serializer_class(queryset[:PAGE], many=True).data
+
+
+def lean_page(lean, queryset):
+    return lean.serialize(lean.rows(queryset)[:PAGE])
+
+
+def pages():
+    reviews = Review.objects.select_related('author').order_by('-id')
+    comments = Comment.objects.select_related('author').order_by('-id')
+    return (
+        ('titles', TitleViewSet.queryset.all(), FirstTitleSerializer,
+         LeanTitleSerializer),
+        ('reviews', reviews, ReviewSerializer, LeanReviewSerializer),
+        ('comments', comments, CommentsSerializer, LeanCommentSerializer),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_serialize_pages(bench_config):
+    seed(at_least(bench_config['dimensions'], PAGE))
+    calls = {}
+    for name, queryset, serializer_class, lean_class in pages():
+        lean = lean_class()
+        rows = len(lean.rows(queryset)[:PAGE])
+        assert rows == PAGE, f'Страница {name} неполная: {rows} строк.'
+        calls[f'{name}-{PAGE}-serializer'] = partial(
+            serialize, serializer_class, queryset
+        )
+        calls[f'{name}-{PAGE}-lean'] = partial(lean_page, lean, queryset)
+    results = measure_calls(calls, bench_config['requests'])
+    # `.values()` — относительно сериализатора того же списка,
+    # сериализаторы — относительно сериализатора произведений.
+    relative(results, {
+        f'{name}-{PAGE}-{kind}': results[
+            f'{name if kind == "lean" else "titles"}-{PAGE}-serializer'
+        ]
+        for name, *_ in pages()
+        for kind in ('serializer', 'lean')
+    })
+    problems = record(bench_config, 'serializers', results)
+
+    for name, *_ in pages():
+        lean = results[f'{name}-{PAGE}-lean']['p50_ms']
+        full = results[f'{name}-{PAGE}-serializer']['p50_ms']
+        assert lean < full, (
+            f'{name}: .values() {lean} мс не быстрее сериализатора {full} мс.'
+        )
+    assert not problems, 'Регрессия сериализации:\n' + '\n'.join(problems)
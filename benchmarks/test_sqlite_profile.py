@@ -0,0 +1,135 @@
+"""Чтение во время записи отзывов: журнал `delete` против WAL.
+
+Писатель публикует по отзыву на каждое произведение, а читатели всё это
+время запрашивают списки отзывов. В режиме `delete` фиксация записи
+берёт эксклюзивную блокировку файла и читатели ждут её (или получают
+`database is locked`); в WAL они читают последний снимок. Пропускная
+способность WAL сравнивается с `delete` того же прогона.
+"""
+import threading
+import time
+
+import pytest
+from django.conf import settings
+from django.db import connection, connections
+from django.test import Client
+from rest_framework.test import APIClient
+
+from .harness import percentile, record, relative
+from .seed import seed
+
+READERS = 8
+
+
+def summary(samples, elapsed):
+    latencies = [latency for latency, _ in samples]
+    return {
+        'requests': len(samples),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'queries': None,
+        'rps': round(len(samples) / elapsed, 1),
+        'errors': sum(
+            status != expected for _, (status, expected) in samples
+        ),
+    }
+
+
+def timed(samples, expected, call):
+    started = time.perf_counter()
+    try:
+        status = call().status_code
+    except Exception:
+        status = None
+    samples.append((time.perf_counter() - started, (status, expected)))
+
+
+def write_reviews(token, title_ids, samples, done):
+    """По отзыву на каждое произведение, затем сигнал читателям."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    try:
+        for title_id in title_ids:
+            timed(samples, 201, lambda: client.post(
+                f'/api/v1/titles/{title_id}/reviews/',
+                data={'text': 'Отзыв под нагрузкой', 'score': 7},
+            ))
+    finally:
+        done.set()
+        connections.close_all()
+
+
+def read_reviews(title_ids, offset, samples, done):
+    client = Client()
+    try:
+        idx = offset
+        while not done.is_set():
+            title_id = title_ids[idx % len(title_ids)]
+            timed(samples, 200, lambda: client.get(
+                f'/api/v1/titles/{title_id}/reviews/'
+            ))
+            idx += READERS
+    finally:
+        connections.close_all()
+
+
+@pytest.fixture
+def journal_mode(request, monkeypatch):
+    connections.close_all()
+    monkeypatch.setitem(
+        connection.settings_dict['OPTIONS'], 'pragmas',
+        {**settings.SQLITE_PRAGMAS, 'journal_mode': request.param},
+    )
+    yield request.param
+    connections.close_all()
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Профиль только для SQLite.'
+)
+@pytest.mark.parametrize('journal_mode', ('delete', 'wal'), indirect=True)
+@pytest.mark.django_db(transaction=True)
+def test_reads_during_writes(bench_config, bench_results, journal_mode,
+                             token_user):
+    ids = seed(bench_config['dimensions'])
+    title_ids = ids['title_ids']
+    done = threading.Event()
+    reads, writes = [], []
+    threads = [threading.Thread(
+        target=write_reviews,
+        args=(token_user['access'], title_ids, writes, done),
+    )] + [
+        threading.Thread(
+            target=read_reviews, args=(title_ids, idx, reads, done)
+        )
+        for idx in range(READERS)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    results = {
+        'reviews-list-during-writes': summary(reads, elapsed),
+        'reviews-create': summary(writes, elapsed),
+    }
+    name = f'sqlite-{journal_mode}'
+    bench_results[name] = results
+    relative(
+        results,
+        bench_results.get('sqlite-delete', {}) if journal_mode == 'wal'
+        else {},
+        metric='rps',
+    )
+    problems = record(bench_config, name, results, noisy=True)
+
+    if journal_mode == 'wal':
+        assert not any(
+            result['errors'] for result in results.values()
+        ), f'В WAL чтение и запись не должны падать: {results}'
+    assert not problems, 'Регрессия пропускной способности:\n' + '\n'.join(
+        problems
+    )
@@ -0,0 +1,32 @@
+import sqlite3
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+@pytest.fixture
+def file_database(transactional_db, tmp_path):
+    """Тестовая база SQLite в файле на время одного теста.
+
+    Общая тестовая база живёт в памяти. SQLite в памяти с общим кэшем
+    не ждёт блокировок, поэтому тесты с записью из потоков, WAL и
+    закрытием соединений работают с копией схемы в файле. Потоки
+    открывают соединения по тем же настройкам, что и основное.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    path = str(tmp_path / 'test_db.sqlite3')
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    connection.connection.backup(target)
+    target.close()
+    # Соединение с базой в памяти не закрывается: иначе она пропадёт.
+    memory, memory_name = connection.connection, connection.settings_dict[
+        'NAME'
+    ]
+    connection.connection = None
+    connection.settings_dict['NAME'] = path
+    yield path
+    BaseDatabaseWrapper.close(connection)
+    connection.settings_dict['NAME'] = memory_name
+    connection.connection = memory
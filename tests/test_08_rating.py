@@ -0,0 +1,58 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08Rating:
+
+    def get_rating(self, client, title_id):
+        return client.get(f'/api/v1/titles/{title_id}/').json()['rating']
+
+    def test_01_rating_follows_review_writes(self, admin_client, user_client,
+                                             moderator_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Рейтинг произведения без отзывов должен быть `None`.'
+        )
+
+        review = create_single_review(user_client, title_id, 'раз', 3).json()
+        create_single_review(moderator_client, title_id, 'два', 8)
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Рейтинг должен обновляться при создании отзыва.'
+        )
+
+        user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 10}
+        )
+        assert self.get_rating(admin_client, title_id) == 9, (
+            'Рейтинг должен обновляться при изменении оценки.'
+        )
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) == 8, (
+            'Рейтинг должен обновляться при каскадном удалении отзывов.'
+        )
+
+    def test_02_rebuild_ratings(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'текст', 7)
+        Title.objects.filter(pk=title_id).update(
+            score_sum=0, score_count=0, rating=None
+        )
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--verify', stdout=StringIO())
+        call_command('rebuild_ratings', stdout=StringIO())
+        call_command('rebuild_ratings', '--verify', stdout=StringIO())
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Команда `rebuild_ratings` должна восстанавливать рейтинг.'
+        )
@@ -0,0 +1,59 @@
+import pytest
+
+from tests.utils import create_comments, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    def create_many_titles(self, admin_client, count):
+        titles, categories, genres = create_titles(admin_client)
+        for idx in range(count):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {idx}',
+                'year': 2000,
+                'genre': [genre['slug'] for genre in genres],
+                'category': categories[idx % 2]['slug'],
+            })
+        return titles
+
+    @pytest.mark.parametrize('limit', (1, 10, 1000))
+    def test_01_titles_list(self, client, admin_client,
+                            django_assert_num_queries, limit):
+        self.create_many_titles(admin_client, 15)
+        # Версия коллекции, COUNT(*), страница произведений с категориями,
+        # жанры страницы.
+        with django_assert_num_queries(4):
+            response = client.get(f'/api/v1/titles/?limit={limit}')
+        assert response.json()['results'][0]['genre'], (
+            'Проверьте, что жанры произведений попадают в ответ.'
+        )
+
+    def test_02_title_detail(self, client, admin_client,
+                             django_assert_num_queries):
+        titles = self.create_many_titles(admin_client, 2)
+        # Версия коллекции, произведение с категорией, жанры.
+        with django_assert_num_queries(3):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+
+    def test_03_reviews_list(self, client, admin_client, user_client,
+                             django_assert_num_queries, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        # Версия коллекции, произведение, COUNT(*), страница отзывов
+        # с авторами.
+        with django_assert_num_queries(4):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+
+    def test_04_comments_list(self, client, admin_client, user_client,
+                              moderator_client, user, moderator,
+                              django_assert_num_queries):
+        _, reviews, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        # Версия коллекции, отзыв, COUNT(*), страница комментариев
+        # с авторами.
+        with django_assert_num_queries(4):
+            client.get(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                f'{reviews[0]["id"]}/comments/'
+            )
@@ -0,0 +1,110 @@
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_titles_cursor(self, client, admin_client,
+                              django_assert_num_queries):
+        create_titles(admin_client)
+        url = '/api/v1/titles/?pagination=cursor&limit=1'
+        # Без COUNT(*): версия коллекции, страница произведений и жанры
+        # страницы.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        data = response.json()
+        assert 'count' not in data, (
+            'В курсорном режиме пагинации не должно быть ключа `count`.'
+        )
+        assert data['previous'] is None and data['next'], (
+            'В курсорном режиме первая страница должна содержать ссылку '
+            'на следующую.'
+        )
+        names = [data['results'][0]['name']]
+        data = client.get(data['next']).json()
+        names.append(data['results'][0]['name'])
+        assert names == sorted(names) and data['next'] is None, (
+            'Курсорная пагинация `/api/v1/titles/` должна обходить '
+            'произведения по имени.'
+        )
+
+    def test_02_reviews_cursor(self, client, admin_client, user_client,
+                               moderator_client, user, moderator):
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            '?pagination=cursor&limit=1'
+        )
+        ids = []
+        while url:
+            data = client.get(url).json()
+            ids.extend(review['id'] for review in data['results'])
+            url = data['next']
+        assert ids == [review['id'] for review in reversed(reviews)], (
+            'Курсорная пагинация отзывов должна возвращать все отзывы '
+            'от новых к старым.'
+        )
+
+    def test_03_default_is_limit_offset(self, client, admin_client):
+        create_titles(admin_client)
+        data = client.get('/api/v1/titles/').json()
+        assert data['count'] == 2, (
+            'По умолчанию должна использоваться пагинация limit/offset.'
+        )
+
+    def test_04_equal_pub_dates(self, client, admin_client, user_client,
+                                moderator_client, user, moderator,
+                                monkeypatch):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from api.pagination import KeysetPagination
+        from reviews.models import Review
+
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        title_id = titles[0]['id']
+        Review.objects.filter(title_id=title_id).update(
+            pub_date=Review.objects.filter(title_id=title_id)
+            .values('pub_date')[:1]
+        )
+        url = f'/api/v1/titles/{title_id}/reviews/?pagination=cursor&limit=1'
+        ids = []
+        with CaptureQueriesContext(connection) as context:
+            while url:
+                data = client.get(url).json()
+                ids.extend(review['id'] for review in data['results'])
+                url = data['next']
+        assert ids == sorted(
+            (review['id'] for review in reviews), reverse=True
+        ), (
+            'При одинаковой дате публикации курсор должен упорядочивать '
+            'отзывы по id без пропусков и повторов.'
+        )
+        assert not any(
+            'OFFSET' in query['sql'] for query in context.captured_queries
+        ), 'Курсорная пагинация не должна использовать OFFSET.'
+
+        previous = data['previous']
+        data = client.get(previous).json()
+        assert [review['id'] for review in data['results']] == ids[-2:-1], (
+            'Ссылка `previous` должна вести на предыдущую страницу.'
+        )
+
+        monkeypatch.setattr(KeysetPagination, 'max_page_size', 1)
+        data = client.get(
+            f'/api/v1/titles/{title_id}/reviews/'
+            '?pagination=cursor&limit=1000000'
+        ).json()
+        assert len(data['results']) == 1, (
+            '`?limit=` больше `max_page_size` должен урезаться.'
+        )
+        response = client.get(
+            f'/api/v1/titles/{title_id}/reviews/?cursor=broken'
+        )
+        assert response.status_code == 404
@@ -0,0 +1,64 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+    url = '/api/v1/titles/'
+
+    def test_01_search(self, client, admin_client):
+        create_titles(admin_client)
+        admin_client.post(self.url, data={
+            'name': 'Орешек знаний',
+            'year': 2001,
+            'genre': ['drama'],
+            'category': 'books',
+            'description': 'Крепкий, но не тот.'
+        })
+
+        data = client.get(f'{self.url}?search=крепк').json()
+        assert [title['name'] for title in data['results']] == [
+            'Крепкий орешек', 'Орешек знаний'
+        ], (
+            f'Параметр `search` эндпоинта `{self.url}` должен искать по '
+            'названию и описанию и ставить совпадения в названии выше.'
+        )
+
+        data = client.get(f'{self.url}?search=back').json()
+        assert [title['name'] for title in data['results']] == [
+            'Терминатор'
+        ], (
+            f'Параметр `search` эндпоинта `{self.url}` должен искать '
+            'по описанию произведения.'
+        )
+
+    def test_02_search_follows_updates(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.url}{titles[0]["id"]}/', data={'name': 'Робокоп'}
+        )
+        admin_client.delete(f'{self.url}{titles[1]["id"]}/')
+
+        assert client.get(f'{self.url}?search=Терминатор').json()[
+            'count'] == 0
+        assert client.get(f'{self.url}?search=робокоп').json()['count'] == 1
+        assert client.get(f'{self.url}?search=орешек').json()['count'] == 0, (
+            'Удалённое произведение не должно находиться поиском.'
+        )
+
+    def test_03_search_syntax_is_escaped(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(f'{self.url}?search="AND (OR*')
+        assert response.status_code == 200, (
+            'Спецсимволы в параметре `search` не должны приводить к ошибке.'
+        )
+
+    def test_04_slug_filters_are_exact(self, client, admin_client):
+        create_titles(admin_client)
+        assert client.get(f'{self.url}?genre=dram').json()['count'] == 0
+        assert client.get(f'{self.url}?genre=drama').json()['count'] == 1
+        assert client.get(f'{self.url}?category=film').json()['count'] == 0
+        assert client.get(f'{self.url}?year=19').json()['count'] == 2, (
+            'Фильтр `year` по-прежнему ищет по части года.'
+        )
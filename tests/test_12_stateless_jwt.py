@@ -0,0 +1,113 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.tokens import (EPOCH_KEY, RoleAccessToken, revocation_cache,
+                         start_epoch)
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12StatelessJWT:
+    url = '/api/v1/categories/'
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        revocation_cache().clear()
+        start_epoch()
+        yield
+        revocation_cache().clear()
+
+    def test_01_token_contains_role(self, client, user):
+        response = client.post(
+            '/api/v1/auth/token/',
+            data={
+                'username': user.username,
+                'confirmation_code': user.confirmation_code,
+            }
+        )
+        token = RoleAccessToken(response.json()['token'])
+        assert token['role'] == user.role and token['uid'] == user.pk, (
+            'Токен должен содержать роль и id пользователя.'
+        )
+
+    def test_02_safe_request_skips_user_lookup(self, admin,
+                                               django_assert_num_queries):
+        from reviews.models import Category
+
+        Category.objects.create(name='Музыка', slug='music')
+        client = claims_client(admin)
+        # Версия коллекции, COUNT(*) и страница категорий, без SELECT
+        # из таблицы юзеров.
+        with django_assert_num_queries(3):
+            response = client.get(self.url)
+        assert response.status_code == 200
+
+    def test_03_role_change_revokes_claims(self, admin,
+                                           django_assert_num_queries):
+        client = claims_client(admin)
+        admin.role = 'user'
+        admin.save()
+        # Роль в токене устарела: пользователь снова читается из базы.
+        # Категорий нет, поэтому версия коллекции ищется по updated_at.
+        with django_assert_num_queries(4):
+            client.get(self.url)
+
+    def test_04_deleted_user_is_rejected(self, admin):
+        client = claims_client(admin)
+        assert client.get(self.url).status_code == 200
+        admin.delete()
+        assert client.get(self.url).status_code == 401, (
+            'Токен удалённого пользователя не должен приниматься.'
+        )
+
+    def test_05_rename_revokes_claims(self, admin):
+        client = claims_client(admin)
+        admin.username = 'RenamedAdmin'
+        admin.save()
+        assert client.get(self.url).status_code == 401, (
+            'После смены имени токен со старым именем не должен '
+            'приниматься по claims.'
+        )
+
+    def test_06_fails_closed(self, admin, monkeypatch):
+        client = claims_client(admin)
+
+        def reads_user():
+            with CaptureQueriesContext(connection) as context:
+                assert client.get(self.url).status_code == 200
+            return any(
+                'reviews_user' in query['sql']
+                for query in context.captured_queries
+            )
+
+        assert not reads_user()
+        cache = revocation_cache()
+        cache.set(EPOCH_KEY, int(time.time()) + 60)
+        assert reads_user(), (
+            'Токен старше эпохи кэша отзыва должен проверяться по базе: '
+            'метки отзыва могли потеряться.'
+        )
+        cache.clear()
+        assert reads_user(), (
+            'После очистки кэша отзыва старые токены проверяются по базе.'
+        )
+
+        def broken(*args, **kwargs):
+            raise ConnectionError('кэш недоступен')
+
+        start_epoch()
+        monkeypatch.setattr(cache, 'get_many', broken)
+        assert reads_user(), (
+            'Без кэша отзыва запрос должен проверяться по базе.'
+        )
@@ -0,0 +1,123 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+
+class DownBackend(EmailBackend):
+    """Почтовый сервер недоступен: соединение не открывается."""
+
+    def open(self):
+        raise ConnectionRefusedError('smtp down')
+
+
+class StopLoop(Exception):
+    pass
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def queued(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+    def signup(self, client, count):
+        for idx in range(count):
+            response = client.post(self.url_signup, data={
+                'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'
+            })
+            assert response.status_code == 200
+
+    def test_01_signup_only_enqueues(self, client):
+        from reviews.models import OutgoingEmail
+
+        outbox_before = len(mail.outbox)
+        self.signup(client, 1)
+        assert len(mail.outbox) == outbox_before, (
+            'Регистрация не должна отправлять письмо внутри запроса.'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipient='user0@yamdb.fake', sent_at__isnull=True
+        ).exists(), 'Регистрация должна ставить письмо в очередь.'
+
+    def test_02_command_drains_queue(self, client):
+        from reviews.models import OutgoingEmail, User
+
+        self.signup(client, 5)
+        outbox_before = len(mail.outbox)
+        call_command(
+            'send_queued_emails', '--batch-size', '2', stdout=StringIO()
+        )
+        assert len(mail.outbox) == outbox_before + 5
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+        user = User.objects.get(username='user3')
+        assert any(
+            message.to == [user.email]
+            and message.body == user.confirmation_code
+            for message in mail.outbox
+        ), 'Письмо должно содержать код подтверждения пользователя.'
+
+        call_command('send_queued_emails', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before + 5, (
+            'Отправленные письма не должны уходить повторно.'
+        )
+
+    def test_03_failed_delivery_is_retried(self, client, monkeypatch):
+        from django.core.mail import EmailMessage
+
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import drain
+
+        self.signup(client, 1)
+
+        def broken_send(self, fail_silently=False):
+            raise ConnectionError('smtp down')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailMessage, 'send', broken_send)
+            assert drain() == (0, 1)
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1 and 'smtp down' in email.last_error
+
+        assert drain() == (0, 0), (
+            'Повторная попытка должна ждать задержку.'
+        )
+        OutgoingEmail.objects.update(next_attempt_at=email.created_at)
+        assert drain() == (1, 0)
+
+    def test_04_unreachable_server(self, client, settings, monkeypatch):
+        from django.utils import timezone
+
+        from reviews.management.commands import send_queued_emails
+        from reviews.models import OutgoingEmail
+
+        self.signup(client, 2)
+        settings.EMAIL_BACKEND = 'tests.test_13_email_outbox.DownBackend'
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 2:
+                raise StopLoop
+
+        monkeypatch.setattr(send_queued_emails.time, 'sleep', sleep)
+        with pytest.raises(StopLoop):
+            call_command(
+                'send_queued_emails', '--loop', '--interval', '1',
+                stdout=StringIO(),
+            )
+        assert len(sleeps) == 2, (
+            'Команда с `--loop` не должна падать, если соединение с '
+            'почтовым сервером не открывается.'
+        )
+        for email in OutgoingEmail.objects.all():
+            assert email.attempts == 1 and 'smtp down' in email.last_error
+            assert email.claim == '' and email.sent_at is None
+            assert email.next_attempt_at > timezone.now(), (
+                'Пачка должна откладываться с задержкой.'
+            )
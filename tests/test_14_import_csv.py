@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ImportCSV:
+
+    def test_01_import_catalogue(self, client):
+        from reviews.models import Title
+
+        out = StringIO()
+        call_command(
+            'import_csv', '--batch-size', '7',
+            '--only', 'users', 'category', 'genre', 'titles', 'genre_title',
+            stdout=out,
+        )
+        assert 'строк/с' in out.getvalue(), (
+            'Команда `import_csv` должна сообщать скорость загрузки.'
+        )
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+
+        title = client.get('/api/v1/titles/1/').json()
+        assert title['category']['slug'] == 'movie'
+        assert {genre['slug'] for genre in title['genre']} == {'drama'}
+        data = client.get('/api/v1/titles/?search=шоушенка').json()
+        assert data['results'][0]['id'] == 1, (
+            'После загрузки произведения должны находиться поиском.'
+        )
+
+    def test_02_import_everything(self, client):
+        from reviews.models import Comment, Review, Title
+
+        call_command('import_csv', stdout=StringIO())
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        title = Title.objects.filter(score_count__gt=0).first()
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert title.rating == sum(scores) // len(scores), (
+            'После загрузки отзывов рейтинг должен быть пересчитан.'
+        )
+        response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.json()['count'] == len(scores)
+
+    def test_03_rerun_is_idempotent(self):
+        from datetime import datetime, timezone
+
+        from reviews.models import Comment, Review, User
+
+        call_command('import_csv', stdout=StringIO())
+        review = Review.objects.get(pk=1)
+        assert review.pub_date == datetime(
+            2019, 9, 24, 21, 8, 21, 567000, tzinfo=timezone.utc
+        ), 'Дата публикации должна браться из файла.'
+
+        out = StringIO()
+        call_command('import_csv', stdout=out)
+        assert 'review.csv: 0 строк' in out.getvalue(), (
+            'Повторный запуск `import_csv` не должен ничего вставлять.'
+        )
+        assert (
+            Review.objects.count(), Comment.objects.count()
+        ) == (72, 3)
+        assert User.objects.filter(pk=100).count() == 1
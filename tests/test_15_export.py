@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Export:
+    url = '/api/v1/export/titles.{}'
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_01_ndjson(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        response = admin_client.get(self.url.format('ndjson'))
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        assert rows == [
+            client.get(f'/api/v1/titles/{title["id"]}/').json()
+            for title in titles
+        ], (
+            'Каждая строка выгрузки должна совпадать с ответом '
+            '`/api/v1/titles/{title_id}/`.'
+        )
+
+    def test_02_csv(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get(self.url.format('csv'))
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        assert [row['genre'] for row in rows] == ['horror,comedy', 'drama']
+        assert rows[1]['category'] == 'books'
+
+    def test_03_admin_only(self, client, user_client, admin_client):
+        for fmt in ('ndjson', 'csv'):
+            url = self.url.format(fmt)
+            assert client.get(url).status_code == 401
+            assert user_client.get(url).status_code == 403
+
+    def test_04_chunks(self, admin_client, django_assert_num_queries,
+                       monkeypatch):
+        from api.views import TitleExportView
+
+        create_titles(admin_client)
+        monkeypatch.setattr(TitleExportView, 'chunk_size', 1)
+        response = admin_client.get(self.url.format('ndjson'))
+        # Произведения одним курсором и жанры на каждую из двух пачек.
+        with django_assert_num_queries(3):
+            lines = self.read(response).splitlines()
+        assert len(lines) == 2
@@ -0,0 +1,52 @@
+import re
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Metrics:
+    url = '/api/v1/_metrics'
+
+    @pytest.fixture(autouse=True)
+    def reset_registry(self):
+        from core.metrics import registry
+
+        registry.reset()
+
+    def test_01_server_timing(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        timing = response['Server-Timing']
+        for name in ('db', 'view', 'serializer', 'total'):
+            assert re.search(rf'\b{name};dur=\d+\.\d+', timing), (
+                f'Заголовок `Server-Timing` должен содержать `{name}`.'
+            )
+        assert 'queries;desc="4 queries"' in timing
+
+    def test_02_prometheus_endpoint(self, client, admin_client,
+                                    user_client):
+        from core.metrics import registry
+
+        create_titles(admin_client)
+        registry.reset()
+        for _ in range(3):
+            client.get('/api/v1/titles/')
+
+        assert client.get(self.url).status_code == 401
+        assert user_client.get(self.url).status_code == 403
+        response = admin_client.get(self.url)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert '# TYPE yamdb_request_duration_seconds summary' in text
+        assert (
+            'yamdb_request_duration_seconds_count{route="title-list"} 3'
+            in text
+        )
+        assert 'yamdb_db_queries{route="title-list",quantile="0.99"} 4' in text
+        assert re.search(
+            r'yamdb_serializer_duration_seconds_sum\{route="title-list"\}',
+            text
+        )
@@ -0,0 +1,120 @@
+import pytest
+
+from tests.utils import create_comments, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ConditionalGet:
+
+    def revalidate(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag'), (
+            f'Ответ `{url}` должен содержать заголовок `ETag`.'
+        )
+        assert response.has_header('Last-Modified'), (
+            f'Ответ `{url}` должен содержать заголовок `Last-Modified`.'
+        )
+        return response['ETag'], client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+
+    def test_01_not_modified(self, client, admin_client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{titles[0]["id"]}/',
+                    '/api/v1/categories/', '/api/v1/genres/'):
+            etag, response = self.revalidate(client, url)
+            assert response.status_code == 304, (
+                f'GET `{url}` с актуальным `If-None-Match` должен вернуть '
+                '304.'
+            )
+            assert response['ETag'] == etag
+            assert not response.content
+        etag = client.get('/api/v1/titles/')['ETag']
+        # Повторная проверка стоит один запрос к таблице версий.
+        with django_assert_num_queries(1):
+            client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+
+    def test_02_if_modified_since(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        response = client.get(
+            '/api/v1/titles/',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        assert response.status_code == 304
+
+    def test_03_writes_change_etag(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        etag = client.get('/api/v1/titles/')['ETag']
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Новое'}
+        )
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'После изменения произведения старый ETag не должен подходить.'
+        )
+        etag = response['ETag']
+        admin_client.delete('/api/v1/categories/films/')
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Удаление категории меняет список произведений.'
+        )
+        etag = response['ETag']
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'genre': ['horror']}
+        )
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Смена жанров произведения меняет список произведений.'
+        )
+
+    def test_04_reviews_and_comments(self, client, admin_client,
+                                     user_client, user, moderator,
+                                     moderator_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        etags = {
+            url: client.get(url)['ETag']
+            for url in ('/api/v1/titles/', reviews_url, comments_url,
+                        other_url)
+        }
+        user_client.patch(f'{reviews_url}{reviews[0]["id"]}/',
+                          data={'score': 9})
+        changed = {
+            url for url, etag in etags.items()
+            if client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+        }
+        assert changed == {'/api/v1/titles/', reviews_url}, (
+            'Изменение отзыва должно менять ETag отзывов этого произведения '
+            'и списка произведений (рейтинг), но не чужих коллекций.'
+        )
+        etag = client.get(comments_url)['ETag']
+        user_client.delete(f'{comments_url}{comments[0]["id"]}/')
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+
+    def test_05_deleted_title(self, client, admin_client, user_client, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 404, (
+            'Старый ETag удалённого произведения не должен давать 304.'
+        )
+
+    def test_06_missing_parent(self, client):
+        from reviews.models import CollectionVersion
+
+        assert client.get('/api/v1/titles/404/reviews/').status_code == 404
+        assert not CollectionVersion.objects.exists(), (
+            'Запросы к несуществующим произведениям не должны создавать '
+            'версии коллекций.'
+        )
@@ -0,0 +1,85 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ResponseCache:
+
+    def test_01_cache_hit(self, client, admin_client,
+                          django_assert_num_queries):
+        create_titles(admin_client)
+        for url in ('/api/v1/titles/', '/api/v1/categories/',
+                    '/api/v1/genres/'):
+            expected = client.get(url).json()
+            # Из базы читается только версия коллекции.
+            with django_assert_num_queries(1):
+                response = client.get(url)
+            assert response.status_code == 200
+            assert response.json() == expected, (
+                f'Ответ `{url}` из кэша должен совпадать с исходным.'
+            )
+
+    def test_02_normalized_query(self, client, admin_client,
+                                 django_assert_num_queries):
+        create_titles(admin_client)
+        expected = client.get(
+            '/api/v1/titles/?year=1984&category=films&limit=5'
+        ).json()
+        with django_assert_num_queries(1):
+            response = client.get(
+                '/api/v1/titles/?limit=5&category=films&genre=&year=1984'
+            )
+        assert response.json() == expected, (
+            'Порядок параметров и пустые фильтры не должны влиять на ключ '
+            'кэша.'
+        )
+        response = client.get('/api/v1/titles/?year=1988')
+        assert [title['name'] for title in response.json()['results']] == [
+            'Крепкий орешек'
+        ], 'Разные фильтры должны кэшироваться отдельно.'
+
+    def test_03_writes_invalidate(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get(url)
+        client.get('/api/v1/genres/')
+        admin_client.patch(url, data={'name': 'Терминатор 2'})
+        assert client.get(url).json()['name'] == 'Терминатор 2', (
+            'После изменения произведения кэш не должен отдавать старый '
+            'ответ.'
+        )
+        admin_client.delete('/api/v1/genres/horror/')
+        slugs = [
+            genre['slug']
+            for genre in client.get('/api/v1/genres/').json()['results']
+        ]
+        assert 'horror' not in slugs
+        assert 'horror' not in [
+            genre['slug'] for genre in client.get(url).json()['genre']
+        ], 'Удаление жанра должно сбрасывать кэш произведений.'
+
+    def test_04_metrics(self, client, admin_client):
+        from core.metrics import registry
+
+        create_titles(admin_client)
+        registry.reset()
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/categories/')
+        text = registry.render()
+        assert 'yamdb_response_cache_hits_total 1' in text
+        assert 'yamdb_response_cache_misses_total 1' in text
+
+    def test_05_links_per_host(self, client, admin_client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/?limit=1'
+        assert client.get(url, HTTP_HOST='backend:8000').json()[
+            'next'
+        ].startswith('http://backend:8000/')
+        response = client.get(url, HTTP_HOST='api.yamdb.fake', secure=True)
+        assert response.json()['next'].startswith(
+            'https://api.yamdb.fake/'
+        ), (
+            'Ссылки пагинации из кэша должны строиться для хоста и схемы '
+            'текущего запроса.'
+        )
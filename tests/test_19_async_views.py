@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import include, path, resolve
+
+from api.async_views import async_read_views, read_workers
+from api.urls import v1_router
+from core.db.replicas import ReplicaPinningMiddleware
+from core.metrics import MetricsMiddleware
+from tests.utils import create_comments
+
+# Конфигурация URL как под ASGI: чтение через асинхронные вьюхи.
+urlpatterns = [
+    path('api/v1/', include(async_read_views(v1_router.urls))),
+]
+
+
+@async_to_sync
+async def async_request(method, url, token=None, **kwargs):
+    # AsyncClient в Django 3.2 превращает лишние аргументы в заголовки
+    # ASGI как есть, без префикса HTTP_.
+    if token:
+        kwargs['authorization'] = f'Bearer {token}'
+    return await getattr(AsyncClient(), method)(url, **kwargs)
+
+
+def async_get(url):
+    return async_request('get', url)
+
+
+@pytest.mark.urls(__name__)
+@pytest.mark.django_db(transaction=True)
+class Test19AsyncViews:
+
+    def test_01_routes_are_async(self):
+        for url in ('/api/v1/titles/', '/api/v1/titles/1/',
+                    '/api/v1/titles/1/reviews/', '/api/v1/titles/1/reviews/1/',
+                    '/api/v1/titles/1/reviews/1/comments/',
+                    '/api/v1/titles/1/reviews/1/comments/1/'):
+            assert asyncio.iscoroutinefunction(resolve(url).func), (
+                f'Вьюха `{url}` под ASGI должна быть асинхронной.'
+            )
+        assert not asyncio.iscoroutinefunction(
+            resolve('/api/v1/categories/').func
+        )
+
+    def test_02_same_responses(self, admin_client, user_client, user,
+                               moderator, moderator_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        title = f'/api/v1/titles/{titles[0]["id"]}/'
+        review = f'{title}reviews/{reviews[0]["id"]}/'
+        for url in ('/api/v1/titles/', '/api/v1/titles/?year=1984', title,
+                    f'{title}reviews/', review, f'{review}comments/',
+                    f'{review}comments/{comments[0]["id"]}/'):
+            response = async_get(url)
+            assert response.status_code == 200
+            assert json.loads(response.content) == admin_client.get(
+                url
+            ).json(), f'Асинхронный `{url}` должен отвечать как синхронный.'
+        assert async_get('/api/v1/titles/404/reviews/').status_code == 404
+
+    def test_03_query_metrics(self, admin_client, user_client, user):
+        create_comments(admin_client, {user: user_client})
+        response = async_get('/api/v1/titles/')
+        assert 'queries;desc="4 queries"' in response['Server-Timing'], (
+            'Запросы из пула потоков должны попадать в `Server-Timing`.'
+        )
+
+    def test_04_writes(self, admin_client, token_user, user):
+        titles = admin_client.get('/api/v1/titles/').json()['results']
+        assert not titles
+        admin_client.post('/api/v1/categories/', data={
+            'name': 'Фильм', 'slug': 'films',
+        })
+        title = admin_client.post('/api/v1/titles/', data={
+            'name': 'Начало', 'year': 2010, 'category': 'films', 'genre': [],
+        }).json()
+        response = async_request(
+            'post', f'/api/v1/titles/{title["id"]}/reviews/',
+            token=token_user['access'],
+            data={'text': 'Хорошо', 'score': 8},
+            content_type='application/json',
+        )
+        assert response.status_code == 201, (
+            'Запись через асинхронную вьюху должна работать как раньше.'
+        )
+        assert async_get(
+            f'/api/v1/titles/{title["id"]}/'
+        ).json()['rating'] == 8
+
+    def test_05_pool_size(self, settings):
+        settings.ASYNC_READ_WORKERS = 16
+        assert read_workers() == 16
+        settings.DATABASES = {'default': {
+            **settings.DATABASES['default'],
+            'OPTIONS': {'pool': {'max_size': 5, 'max_overflow': 3}},
+        }}
+        assert read_workers() == 7, (
+            'Потоков чтения не должно быть больше соединений в пуле: одно '
+            'соединение остаётся для записи.'
+        )
+        settings.ASYNC_READ_WORKERS = 4
+        assert read_workers() == 4
+
+    def test_06_middleware_stays_async(self):
+        async def get_response(request):
+            pass
+
+        for middleware in (MetricsMiddleware, ReplicaPinningMiddleware):
+            assert asyncio.iscoroutinefunction(middleware(get_response)), (
+                f'`{middleware.__name__}` под ASGI должен работать без '
+                'переключения в синхронный режим.'
+            )
+            assert not asyncio.iscoroutinefunction(middleware(lambda r: r))
@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_reviews
+
+
+def selects_from(queries, table):
+    return [
+        query['sql'] for query in queries
+        if query['sql'].startswith('SELECT') and f'FROM "{table}"'
+        in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20NestedRoutes:
+
+    def test_01_review_post_reads_title_once(self, admin_client,
+                                             user_client, moderator_client,
+                                             user):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        with CaptureQueriesContext(connection) as context:
+            response = moderator_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': 'Второй отзыв', 'score': 7},
+            )
+        assert response.status_code == 201
+        assert len(selects_from(context.captured_queries, 'reviews_title')) \
+            == 1, 'Произведение должно читаться один раз за запрос.'
+
+    def test_02_comment_post_reads_review_once(self, admin_client,
+                                               user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                f'{reviews[0]["id"]}/comments/',
+                data={'text': 'Ещё комментарий'},
+            )
+        assert response.status_code == 201
+        assert len(selects_from(context.captured_queries, 'reviews_review')) \
+            == 1, 'Отзыв должен читаться один раз за запрос.'
+
+    def test_03_foreign_hierarchy(self, admin_client, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        # Отзыв принадлежит titles[0], а в URL стоит titles[1].
+        review = (
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        assert user_client.get(review).status_code == 404
+        assert user_client.get(f'{review}comments/').status_code == 404
+        assert user_client.get(
+            f'{review}comments/{comments[0]["id"]}/'
+        ).status_code == 404, (
+            'Комментарий доступен только по URL своего произведения.'
+        )
+        response = user_client.post(
+            f'{review}comments/', data={'text': 'Не туда'}
+        )
+        assert response.status_code == 404, (
+            'Нельзя комментировать отзыв через URL чужого произведения.'
+        )
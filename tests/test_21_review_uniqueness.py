@@ -0,0 +1,63 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+from rest_framework.test import APIClient
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ReviewUniqueness:
+
+    def test_01_review_per_title(self, admin_client, user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            create_single_review(user_client, title['id'], 'Отзыв', 6)
+        assert user.reviews.count() == len(titles), (
+            'Пользователь может оставить по отзыву на каждое произведение.'
+        )
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Ещё один', 'score': 1},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'non_field_errors' in response.json()
+
+    @pytest.mark.usefixtures('file_database')
+    def test_02_parallel_posts(self, admin_client, token_user, user):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        threads = 16
+        barrier = threading.Barrier(threads)
+
+        def post(idx):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}'
+            )
+            barrier.wait()
+            try:
+                return client.post(
+                    url, data={'text': f'Отзыв {idx}', 'score': 5}
+                ).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = sorted(executor.map(post, range(threads)))
+        assert statuses == (
+            [HTTPStatus.CREATED] + [HTTPStatus.BAD_REQUEST] * (threads - 1)
+        ), (
+            'Из параллельных POST-запросов одного автора должен пройти '
+            'ровно один, остальные — получить 400.'
+        )
+        assert Review.objects.filter(author=user).count() == 1
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_count, title.rating) == (1, 5), (
+            'Отклонённые отзывы не должны попадать в рейтинг.'
+        )
@@ -0,0 +1,125 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db import connection
+
+
+def connect():
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+class Test22ConnectionPool:
+
+    def test_01_reuse(self):
+        from core.db.pool import ConnectionPool
+
+        pool = ConnectionPool(max_size=2, max_overflow=0)
+        first = pool.acquire(connect)
+        pool.release(first)
+        assert pool.acquire(connect) is first, (
+            'Возвращённое соединение должно выдаваться повторно.'
+        )
+        assert pool.size == 1
+
+    def test_02_overflow_and_timeout(self):
+        from core.db.pool import ConnectionPool, PoolTimeout
+
+        pool = ConnectionPool(max_size=1, max_overflow=1, timeout=0.05)
+        first = pool.acquire(connect)
+        second = pool.acquire(connect)
+        assert pool.size == 2
+        with pytest.raises(PoolTimeout):
+            pool.acquire(connect)
+        pool.release(first)
+        pool.release(second)
+        assert pool.size == 1, (
+            'Временное соединение сверх `max_size` должно закрываться '
+            'при возврате.'
+        )
+
+    def test_03_waits_for_release(self):
+        from core.db.pool import ConnectionPool
+
+        pool = ConnectionPool(max_size=1, max_overflow=0, timeout=5)
+        held = pool.acquire(connect)
+        timer = threading.Timer(0.05, pool.release, args=(held,))
+        timer.start()
+        assert pool.acquire(connect) is held, (
+            'При исчерпанном пуле `acquire()` должен дождаться возврата.'
+        )
+        timer.join()
+
+    def test_04_pre_ping_replaces_broken(self):
+        from core.db.pool import ConnectionPool
+
+        pool = ConnectionPool(max_size=1, max_overflow=0)
+        broken = pool.acquire(connect)
+        pool.release(broken)
+        broken.close()
+        fresh = pool.acquire(connect)
+        assert fresh is not broken, (
+            'Оборванное соединение должно заменяться новым.'
+        )
+        fresh.execute('SELECT 1')
+        assert pool.size == 1
+
+    def test_05_recycle(self, monkeypatch):
+        from core.db import pool as pool_module
+
+        pool = pool_module.ConnectionPool(max_size=1, recycle=60)
+        first = pool.acquire(connect)
+        pool.release(first)
+        now = pool_module.time.monotonic() + 61
+        monkeypatch.setattr(pool_module.time, 'monotonic', lambda: now)
+        assert pool.acquire(connect) is not first, (
+            'Соединение старше `recycle` должно открываться заново.'
+        )
+
+    def test_06_release_rolls_back(self):
+        from core.db.pool import ConnectionPool
+
+        pool = ConnectionPool(max_size=1)
+        conn = pool.acquire(connect)
+        conn.execute('CREATE TABLE t (x INTEGER)')
+        conn.commit()
+        conn.execute('INSERT INTO t VALUES (1)')
+        pool.release(conn)
+        conn = pool.acquire(connect)
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone() == (0,), (
+            'Незакрытая транзакция должна откатываться при возврате в пул.'
+        )
+
+
+@pytest.mark.usefixtures('file_database')
+class Test22PersistentConnections:
+
+    def test_01_opened_counter(self):
+        from core.metrics import registry
+
+        registry.reset()
+        connection.close()
+        connection.ensure_connection()
+        assert registry.counters['yamdb_db_connections_opened_total'] == 1, (
+            'Открытие соединения должно учитываться в метриках.'
+        )
+
+    def test_02_health_check(self, monkeypatch):
+        from core.db.health import check_connections
+
+        connection.ensure_connection()
+        monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', None)
+        monkeypatch.setitem(
+            connection.settings_dict, 'CONN_HEALTH_CHECKS', True
+        )
+        monkeypatch.setattr(connection, 'is_usable', lambda: True)
+        check_connections()
+        assert connection.connection is not None, (
+            'Рабочее постоянное соединение не должно закрываться.'
+        )
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        check_connections()
+        assert connection.connection is None, (
+            'Оборванное постоянное соединение должно закрываться '
+            'в начале запроса.'
+        )
@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+from django.db import connection
+
+from tests.utils import create_titles
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.usefixtures('file_database')
+class Test23SqliteProfile:
+
+    def test_01_pragmas(self, settings):
+        expected = settings.SQLITE_PRAGMAS
+        assert pragma('journal_mode') == 'wal', (
+            'Файловая база SQLite должна работать в режиме WAL.'
+        )
+        assert pragma('synchronous') == 1, 'Ожидался `synchronous=NORMAL`.'
+        assert pragma('temp_store') == 2, 'Ожидался `temp_store=MEMORY`.'
+        assert pragma('busy_timeout') == expected['busy_timeout']
+        assert pragma('cache_size') == expected['cache_size']
+        assert pragma('foreign_keys') == 1, (
+            'Профиль не должен отменять PRAGMA, которые ставит Django.'
+        )
+
+    def test_02_readers_not_blocked_by_writer(self, admin_client,
+                                              client):
+        create_titles(admin_client)
+        writer = sqlite3.connect(
+            connection.settings_dict['NAME'], isolation_level=None
+        )
+        try:
+            # В режиме delete EXCLUSIVE не пустил бы читателей.
+            writer.execute('BEGIN EXCLUSIVE')
+            writer.execute(
+                "UPDATE reviews_title SET name = 'Незафиксировано'"
+            )
+            response = client.get('/api/v1/titles/')
+            assert response.status_code == 200, (
+                'Чтение не должно ждать незафиксированную запись.'
+            )
+            assert 'Незафиксировано' not in response.content.decode()
+        finally:
+            writer.execute('ROLLBACK')
+            writer.close()
+
+    def test_03_rejects_unsafe_values(self, monkeypatch):
+        monkeypatch.setitem(
+            connection.settings_dict['OPTIONS'], 'pragmas',
+            {'journal_mode': 'wal; DROP TABLE reviews_title'},
+        )
+        connection.close()
+        with pytest.raises(ValueError):
+            connection.ensure_connection()
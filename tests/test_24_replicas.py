@@ -0,0 +1,171 @@
+from contextlib import ExitStack
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+
+from api.async_views import async_read_views
+from api.urls import v1_router
+from tests.test_19_async_views import async_request
+from tests.utils import create_single_review, create_titles
+
+REPLICAS = ('replica1', 'replica2')
+
+urlpatterns = [
+    path('api/v1/', include(async_read_views(v1_router.urls))),
+]
+
+
+@pytest.fixture
+def replicas(tmp_path, settings):
+    """Две реплики SQLite — копии тестовой базы из `sync_replicas`."""
+    primary = connections['default'].settings_dict
+    for alias in REPLICAS:
+        connections.settings[alias] = {
+            **primary,
+            'NAME': tmp_path / f'{alias}.sqlite3',
+            'OPTIONS': {
+                'pragmas': {**settings.SQLITE_PRAGMAS, 'query_only': 1},
+            },
+        }
+    settings.DATABASE_REPLICAS = list(REPLICAS)
+    caches[settings.REPLICA_PIN_CACHE].clear()
+    yield REPLICAS
+    for alias in REPLICAS:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+    caches[settings.REPLICA_PIN_CACHE].clear()
+
+
+def reviews_count(client, title_id):
+    response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+    assert response.status_code == 200
+    return response.json()['count']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Replicas:
+
+    def test_01_request_reads_one_replica(self, replicas, admin_client,
+                                          user_client, client):
+        from core.db.replicas import ReplicaRouter, read_replica
+
+        router = ReplicaRouter()
+        assert router.db_for_read(None) == 'default', (
+            'Вне GET-запроса к API чтение должно идти в основную базу.'
+        )
+        token = read_replica.set('replica2')
+        try:
+            assert router.db_for_read(None) == 'replica2'
+            assert router.db_for_write(None) == 'default'
+        finally:
+            read_replica.reset(token)
+        assert not router.allow_migrate('replica1', 'reviews')
+        assert router.allow_migrate('default', 'reviews')
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 8)
+        for title in titles:
+            # Строки версий создаются при первом чтении; администратор
+            # после записи читает из основной базы.
+            reviews_count(admin_client, title['id'])
+        call_command('sync_replicas')
+        used = []
+        for title in titles * 2:
+            with ExitStack() as stack:
+                captured = {
+                    alias: stack.enter_context(
+                        CaptureQueriesContext(connections[alias])
+                    )
+                    for alias in ('default', *REPLICAS)
+                }
+                reviews_count(client, title['id'])
+            used.append(
+                [alias for alias, queries in captured.items() if queries]
+            )
+        assert used == [
+            ['replica1'], ['replica2'], ['replica1'], ['replica2']
+        ], (
+            'Все чтения одного запроса должны идти с одной реплики, а '
+            'запросы — распределяться по репликам по кругу.'
+        )
+
+    def test_02_read_your_writes(self, replicas, admin_client,
+                                 user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        call_command('sync_replicas')
+
+        response = user_client.post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            data={'text': 'Отзыв', 'score': 8},
+        )
+        assert response.status_code == 201
+        assert reviews_count(client, title_id) == 0, (
+            'Анонимный GET должен читать с реплики, ещё не получившей отзыв.'
+        )
+        assert reviews_count(user_client, title_id) == 1, (
+            'Автор записи должен читать из основной базы и видеть её.'
+        )
+
+        caches['default'].clear()
+        assert reviews_count(user_client, title_id) == 0, (
+            'После окна привязки автор снова читает с реплики.'
+        )
+        call_command('sync_replicas')
+        assert reviews_count(client, title_id) == 1
+        assert reviews_count(user_client, title_id) == 1
+
+    def test_03_failed_write_does_not_pin(self, replicas, admin_client,
+                                          user_client):
+        from core.db.replicas import is_pinned
+
+        titles, _, _ = create_titles(admin_client)
+        call_command('sync_replicas')
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'score': 11}
+        )
+        assert response.status_code == 400
+        assert not is_pinned(response.wsgi_request), (
+            'Отклонённая запись не должна привязывать клиента к основной '
+            'базе.'
+        )
+
+    @pytest.mark.urls(__name__)
+    def test_04_async_reads(self, replicas, admin_client, user_client,
+                            token_user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        call_command('sync_replicas')
+        user_client.post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            data={'text': 'Отзыв', 'score': 8},
+        )
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        assert async_request('get', url).json()['count'] == 0, (
+            'Под ASGI чтение тоже должно идти с реплики.'
+        )
+        assert async_request(
+            'get', url, token=token_user['access']
+        ).json()['count'] == 1
+
+    def test_05_version_missing_on_replica(self, replicas, admin_client,
+                                           client):
+        from reviews import versioning
+
+        create_titles(admin_client)
+        versioning.reset()
+        call_command('sync_replicas')
+        etags = set()
+        for _ in range(3):
+            response = client.get('/api/v1/titles/')
+            assert response.status_code == 200, (
+                'Строки версии, которой ещё нет на реплике, должна '
+                'находиться и создаваться в основной базе.'
+            )
+            etags.add(response['ETag'])
+        assert len(etags) == 1, 'Версия не должна меняться между чтениями.'
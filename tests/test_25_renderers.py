@@ -0,0 +1,88 @@
+import datetime
+import decimal
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_comments
+
+
+def both(data, **kwargs):
+    from api.renderers import FastJSONRenderer
+
+    return (
+        FastJSONRenderer().render(data, **kwargs),
+        JSONRenderer().render(data, **kwargs),
+    )
+
+
+class Test25Renderers:
+
+    def test_01_types(self):
+        data = {
+            'decimal': decimal.Decimal('7.25'),
+            'datetime': datetime.datetime(
+                2022, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+            ),
+            'date': datetime.date(2022, 1, 2),
+            'uuid': uuid.UUID(int=1),
+            'lazy': gettext_lazy('Произведение'),
+            'separators': 'строка\u2028абзац\u2029',
+            'nested': [{1: 'ключ-число'}, None, True, 1.5],
+        }
+        fast, stdlib = both(data)
+        assert fast == stdlib, (
+            'FastJSONRenderer должен выдавать те же байты, что JSONRenderer.'
+        )
+        assert '\u2028'.encode() not in fast
+
+    def test_02_indent_and_fallback(self, monkeypatch):
+        from api import renderers
+
+        data = {'name': 'Дюна', 'year': 1965}
+        fast, stdlib = both(
+            data, accepted_media_type='application/json; indent=4'
+        )
+        assert fast == stdlib, 'Запрос с отступом рендерится как в DRF.'
+        monkeypatch.setattr(renderers, 'orjson', None)
+        fast, stdlib = both(data)
+        assert fast == stdlib, 'Без orjson работает стандартный `json`.'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25JSONResponses:
+
+    def test_01_responses_match_stdlib(self, admin_client, user_client,
+                                       user):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        title = f'/api/v1/titles/{titles[0]["id"]}/'
+        review = f'{title}reviews/{reviews[0]["id"]}/'
+        for url in ('/api/v1/titles/?limit=100', title, f'{title}reviews/',
+                    f'{review}comments/', '/api/v1/genres/'):
+            response = admin_client.get(url)
+            assert response.status_code == 200
+            assert response.content == JSONRenderer().render(
+                response.data
+            ), f'Ответ `{url}` должен совпадать с рендерингом DRF.'
+
+    def test_02_parser(self, admin_client, user_client, user):
+        _, _, titles = create_comments(admin_client, {user: user_client})
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        response = user_client.post(
+            url, data='{"text": "Отзыв — ✓", "score": 9}',
+            content_type='application/json',
+        )
+        assert response.status_code == 201
+        assert response.json()['text'] == 'Отзыв — ✓'
+        for body in ('{"text": "обрыв', '{"text": "x", "score": NaN}'):
+            response = user_client.post(
+                url, data=body, content_type='application/json'
+            )
+            assert response.status_code == 400, (
+                'Некорректный JSON должен давать 400.'
+            )
+            assert 'JSON parse error' in response.json()['detail']
@@ -0,0 +1,162 @@
+import json
+import random
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+ALPHABET = 'abcxyzАБВЯёй "\'\\/<>& 😀\u2028'
+RUNS = 25
+
+
+def text(rng, size=12):
+    value = ''.join(rng.choices(ALPHABET, k=rng.randint(1, size))).strip()
+    return value or 'x'
+
+
+def random_catalog(rng):
+    """Каталог со всеми краевыми случаями формы ответа."""
+    from reviews.models import (Category, Comment, Genres, Review, Title,
+                                User)
+    from reviews.ratings import rebuild_ratings
+
+    categories = [
+        Category.objects.create(name=text(rng), slug=f'category-{idx}')
+        for idx in range(3)
+    ]
+    genres = [
+        Genres.objects.create(name=text(rng), slug=f'genre-{idx}')
+        for idx in range(5)
+    ]
+    users = [
+        User.objects.create(username=f'author{idx}',
+                            email=f'author{idx}@yamdb.fake')
+        for idx in range(6)
+    ]
+    now = timezone.now()
+    for idx in range(30):
+        title = Title.objects.create(
+            name=text(rng, 30),
+            year=rng.randint(1900, 2022),
+            description=rng.choice((None, '', text(rng, 60))),
+            category=rng.choice(categories + [None]),
+        )
+        title.genre.set(rng.sample(genres, rng.randint(0, 3)))
+        for author in rng.sample(users, rng.randint(0, len(users))):
+            review = Review.objects.create(
+                title=title, author=author, text=text(rng, 40),
+                score=rng.randint(1, 10),
+            )
+            # Одинаковые даты проверяют порядок по id.
+            Review.objects.filter(pk=review.pk).update(
+                pub_date=now - timedelta(seconds=rng.randint(0, 3))
+            )
+            for _ in range(rng.randint(0, 2)):
+                Comment.objects.create(
+                    review=review, author=rng.choice(users),
+                    text=text(rng, 20),
+                )
+    rebuild_ratings()
+
+
+def rendered(data):
+    return JSONRenderer().render(data)
+
+
+def same_output(serializer_class, lean_class, queryset, rng):
+    offset = rng.randint(0, 5)
+    limit = rng.randint(0, 15)
+    page = slice(offset, offset + limit)
+    lean = lean_class()
+    expected = rendered(serializer_class(queryset[page], many=True).data)
+    actual = rendered(lean.serialize(lean.rows(queryset)[page]))
+    return expected == actual, expected, actual
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26LeanSerializers:
+
+    @pytest.fixture
+    def catalog(self):
+        random_catalog(random.Random(20))
+
+    def test_01_titles(self, catalog):
+        from api.serializers import FirstTitleSerializer, LeanTitleSerializer
+        from api.views import TitleViewSet
+
+        rng = random.Random(1)
+        for _ in range(RUNS):
+            queryset = TitleViewSet.queryset.all()
+            choice = rng.randint(0, 3)
+            if choice == 1:
+                queryset = queryset.filter(
+                    genre__slug=f'genre-{rng.randint(0, 4)}'
+                )
+            elif choice == 2:
+                queryset = queryset.filter(category__isnull=True)
+            elif choice == 3:
+                queryset = queryset.order_by('-year', 'id')
+            same, expected, actual = same_output(
+                FirstTitleSerializer, LeanTitleSerializer,
+                queryset.order_by(*queryset.query.order_by, 'id'), rng,
+            )
+            assert same, (
+                'Быстрый сериализатор произведений должен выдавать тот же '
+                f'JSON:\n{expected}\n{actual}'
+            )
+
+    def test_02_reviews_and_comments(self, catalog):
+        from api.serializers import (CommentsSerializer,
+                                     LeanCommentSerializer,
+                                     LeanReviewSerializer, ReviewSerializer)
+        from reviews.models import Comment, Review, Title
+
+        rng = random.Random(2)
+        title_ids = list(Title.objects.values_list('id', flat=True))
+        review_ids = list(Review.objects.values_list('id', flat=True))
+        for _ in range(RUNS):
+            reviews = Review.objects.filter(
+                title_id=rng.choice(title_ids)
+            ).select_related('author').order_by('-pub_date', '-id')
+            same, expected, actual = same_output(
+                ReviewSerializer, LeanReviewSerializer, reviews, rng
+            )
+            assert same, f'Отзывы расходятся:\n{expected}\n{actual}'
+            comments = Comment.objects.filter(
+                review_id=rng.choice(review_ids)
+            ).select_related('author').order_by('-pub_date', '-id')
+            same, expected, actual = same_output(
+                CommentsSerializer, LeanCommentSerializer, comments, rng
+            )
+            assert same, f'Комментарии расходятся:\n{expected}\n{actual}'
+
+    def test_03_api_pages(self, catalog, client):
+        from api.serializers import FirstTitleSerializer, ReviewSerializer
+        from api.views import TitleViewSet
+        from reviews.models import Review, Title
+
+        title = Title.objects.filter(reviews__isnull=False).first()
+        pages = (
+            (TitleViewSet.queryset, FirstTitleSerializer,
+             ('/api/v1/titles/?limit=7&offset=3',
+              '/api/v1/titles/?pagination=cursor&limit=4',
+              '/api/v1/titles/?genre=genre-1',
+              '/api/v1/titles/?search=abc')),
+            (Review.objects.select_related('author'), ReviewSerializer,
+             (f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor',
+              f'/api/v1/titles/{title.pk}/reviews/?limit=2')),
+        )
+        for queryset, serializer_class, urls in pages:
+            for url in urls:
+                response = client.get(url)
+                assert response.status_code == 200, url
+                results = response.json()['results']
+                objects = queryset.in_bulk([item['id'] for item in results])
+                expected = serializer_class(
+                    [objects[item['id']] for item in results], many=True
+                ).data
+                assert results == json.loads(rendered(expected)), (
+                    f'Страница `{url}` должна совпадать с выводом '
+                    f'`{serializer_class.__name__}`.'
+                )
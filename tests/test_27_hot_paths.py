@@ -0,0 +1,64 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from tests.utils import create_comments
+
+
+def indexed_columns(table):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        constraint['columns'] for constraint in constraints.values()
+        if constraint['index']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27HotPaths:
+
+    def test_01_indexes(self):
+        assert ['author_id', 'title_id'] in indexed_columns(
+            'reviews_review'
+        ), 'Нужен составной индекс отзывов (author, title).'
+        assert ['category_id', 'name'] in indexed_columns('reviews_title'), (
+            'Нужен составной индекс произведений (category, name).'
+        )
+        assert ['title_id'] not in indexed_columns('reviews_review'), (
+            'Индекс по title_id покрыт составными и не нужен.'
+        )
+
+    def test_02_plans_use_indexes(self, admin_client, user_client, user):
+        create_comments(admin_client, {user: user_client})
+        out = StringIO()
+        call_command('explain_hot_paths', '--check', stdout=out)
+        output = out.getvalue()
+        assert 'review_title_pub_date_idx' in output
+        assert 'comment_review_pub_date_idx' in output
+        assert 'title_category_name_idx' in output
+        assert '!!' not in output
+
+    def test_03_flags(self, admin_client, user_client, user, monkeypatch):
+        from api.management.commands import explain_hot_paths
+
+        assert explain_hot_paths.problems(
+            '2 0 0 SCAN reviews_review\n5 0 0 USE TEMP B-TREE FOR ORDER BY'
+        ) == [
+            'полный просмотр таблицы reviews_review',
+            'сортировка без индекса',
+        ]
+        assert explain_hot_paths.problems(
+            'Limit\n  ->  Sort\n        ->  Seq Scan on reviews_title'
+        ) == ['сортировка без индекса', 'полный просмотр таблицы reviews_title']
+        assert not explain_hot_paths.problems(
+            '6 0 0 SCAN reviews_title USING INDEX title_name_id_idx'
+        ), 'Проход по индексу в порядке сортировки — не проблема.'
+
+        create_comments(admin_client, {user: user_client})
+        monkeypatch.setattr(
+            explain_hot_paths, 'problems', lambda plan: ['проблема']
+        )
+        with pytest.raises(CommandError):
+            call_command('explain_hot_paths', '--check', stdout=StringIO())
@@ -0,0 +1,142 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+def scores(**counts):
+    return {
+        str(score): counts.get(f's{score}', 0) for score in range(1, 11)
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TitleStats:
+
+    def get_stats(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/stats/')
+        assert response.status_code == 200, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/{title_id}/stats/` '
+            'возвращает статус 200.'
+        )
+        return response.json()
+
+    def test_01_stats_follow_writes(self, admin_client, user_client,
+                                    moderator_client, user, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_stats(client, title_id) == {
+            'scores': scores(), 'reviews_count': 0, 'comments_count': 0,
+            'last_review_at': None,
+        }, 'У нового произведения статистика должна быть нулевой.'
+
+        review = create_single_review(user_client, title_id, 'раз', 3).json()
+        second = create_single_review(
+            moderator_client, title_id, 'два', 8
+        ).json()
+        create_single_comment(user_client, title_id, second['id'], 'к')
+        create_single_comment(admin_client, title_id, review['id'], 'к')
+        create_single_comment(admin_client, title_id, review['id'], 'к')
+        stats = self.get_stats(client, title_id)
+        assert stats['scores'] == scores(s3=1, s8=1)
+        assert stats['reviews_count'] == 2
+        assert stats['comments_count'] == 3, (
+            'Статистика должна считать комментарии ко всем отзывам '
+            'произведения.'
+        )
+        assert stats['last_review_at'] == second['pub_date'], (
+            '`last_review_at` — дата последнего отзыва.'
+        )
+
+        user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 10}
+        )
+        assert self.get_stats(client, title_id)['scores'] == scores(
+            s8=1, s10=1
+        ), 'Смена оценки должна переносить отзыв в другую корзину.'
+
+        moderator_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{second["id"]}/'
+        )
+        stats = self.get_stats(client, title_id)
+        assert stats == {
+            'scores': scores(s10=1), 'reviews_count': 1, 'comments_count': 2,
+            'last_review_at': review['pub_date'],
+        }, (
+            'Удаление отзыва должно убирать его оценку и комментарии и '
+            'пересчитывать дату последнего отзыва.'
+        )
+
+        user.delete()
+        assert self.get_stats(client, title_id) == {
+            'scores': scores(), 'reviews_count': 0, 'comments_count': 0,
+            'last_review_at': None,
+        }, 'Статистика должна обновляться при каскадном удалении.'
+        response = client.get('/api/v1/titles/0/stats/')
+        assert response.status_code == 404
+
+    def test_02_expand(self, admin_client, user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'раз', 6).json()
+        response = client.get('/api/v1/titles/')
+        assert 'stats' not in response.json()['results'][0], (
+            'Без `?expand=stats` поле `stats` не выводится.'
+        )
+
+        response = client.get('/api/v1/titles/?expand=stats')
+        results = {item['id']: item for item in response.json()['results']}
+        expected = self.get_stats(client, title_id)
+        assert results[title_id]['stats'] == expected, (
+            'Список с `?expand=stats` должен встраивать статистику.'
+        )
+        assert results[titles[1]['id']]['stats']['reviews_count'] == 0
+        response = client.get(f'/api/v1/titles/{title_id}/?expand=stats')
+        assert response.json()['stats'] == expected
+
+        etag = client.get('/api/v1/titles/?expand=stats')['ETag']
+        create_single_comment(
+            admin_client, title_id, review['id'], 'комментарий'
+        )
+        response = client.get(
+            '/api/v1/titles/?expand=stats', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200, (
+            'Новый комментарий должен менять ETag списка с '
+            '`?expand=stats`.'
+        )
+        results = {item['id']: item for item in response.json()['results']}
+        assert results[title_id]['stats']['comments_count'] == 1
+
+    def test_03_rebuild(self, admin_client, user_client, client):
+        from reviews.models import Title, TitleStats
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'текст', 7)
+        expected = self.get_stats(client, title_id)
+        TitleStats.objects.filter(pk=title_id).update(
+            score_7=0, reviews_count=5
+        )
+        TitleStats.objects.filter(pk=titles[1]['id']).delete()
+
+        with pytest.raises(CommandError):
+            call_command(
+                'rebuild_title_stats', '--verify', stdout=StringIO()
+            )
+        out = StringIO()
+        call_command('rebuild_title_stats', stdout=out)
+        assert 'Исправлено расхождений: 2.' in out.getvalue()
+        call_command('rebuild_title_stats', '--verify', stdout=StringIO())
+        assert self.get_stats(client, title_id) == expected, (
+            'Команда `rebuild_title_stats` должна восстанавливать '
+            'статистику.'
+        )
+        assert TitleStats.objects.count() == Title.objects.count(), (
+            'Команда `rebuild_title_stats` должна досоздавать '
+            'недостающие строки.'
+        )
@@ -0,0 +1,141 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.fixture
+def leaderboard_settings(settings):
+    settings.LEADERBOARD_MIN_REVIEWS = 2
+    settings.LEADERBOARD_PRIOR_MEAN = 5
+    settings.LEADERBOARD_PRIOR_WEIGHT = 2
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29Leaderboards:
+
+    def top(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+        )
+        return [
+            (item['title']['id'], item['score'], item['reviews_count'])
+            for item in response.json()['results']
+        ]
+
+    def catalog(self, admin_client, user_client, moderator_client):
+        """Терминатор: 10 и 9; Крепкий орешек: три оценки 9, оба комедии."""
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = titles[0]['id'], titles[1]['id']
+        admin_client.patch(
+            f'/api/v1/titles/{die_hard}/',
+            data={'genre': ['drama', 'comedy']}, format='json',
+        )
+        create_single_review(user_client, terminator, 'раз', 10)
+        assert self.top(admin_client, '/api/v1/genres/comedy/top/') == [], (
+            'Произведение с числом отзывов меньше '
+            '`LEADERBOARD_MIN_REVIEWS` не должно попадать в рейтинг.'
+        )
+        review = create_single_review(
+            moderator_client, terminator, 'два', 9
+        ).json()
+        for client in (user_client, moderator_client, admin_client):
+            create_single_review(client, die_hard, 'текст', 9)
+        return terminator, die_hard, review
+
+    def test_01_rankings(self, leaderboard_settings, admin_client,
+                         user_client, moderator_client, client):
+        terminator, die_hard, _ = self.catalog(
+            admin_client, user_client, moderator_client
+        )
+        assert self.top(client, '/api/v1/genres/comedy/top/') == [
+            (terminator, 9.5, 2), (die_hard, 9.0, 3),
+        ], 'Рейтинг по умолчанию упорядочен по средней оценке.'
+        assert self.top(
+            client, '/api/v1/genres/comedy/top/?ranking=bayesian'
+        ) == [(die_hard, 7.4, 3), (terminator, 7.25, 2)], (
+            'С `?ranking=bayesian` рейтинг упорядочен по байесовской оценке.'
+        )
+        assert self.top(client, '/api/v1/categories/films/top/') == [
+            (terminator, 9.5, 2)
+        ]
+        assert self.top(client, '/api/v1/genres/drama/top/?limit=1') == [
+            (die_hard, 9.0, 3)
+        ]
+        response = client.get('/api/v1/genres/comedy/top/?limit=1')
+        item = response.json()['results'][0]
+        assert item['rank'] == 1
+        assert item['title']['name'] == 'Терминатор'
+        assert item['title']['category'] == {
+            'name': 'Фильм', 'slug': 'films'
+        }
+
+    def test_02_incremental_updates(self, leaderboard_settings,
+                                    admin_client, user_client,
+                                    moderator_client, client):
+        terminator, die_hard, review = self.catalog(
+            admin_client, user_client, moderator_client
+        )
+        etag = client.get('/api/v1/genres/comedy/top/')['ETag']
+        moderator_client.delete(
+            f'/api/v1/titles/{terminator}/reviews/{review["id"]}/'
+        )
+        response = client.get(
+            '/api/v1/genres/comedy/top/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+        assert self.top(client, '/api/v1/genres/comedy/top/') == [
+            (die_hard, 9.0, 3)
+        ], 'Произведение ниже порога отзывов должно выпадать из рейтинга.'
+
+        admin_client.patch(
+            f'/api/v1/titles/{die_hard}/', data={'category': 'films'}
+        )
+        assert self.top(client, '/api/v1/categories/books/top/') == []
+        assert self.top(client, '/api/v1/categories/films/top/') == [
+            (die_hard, 9.0, 3)
+        ], 'Смена категории должна переносить произведение в её рейтинг.'
+
+        admin_client.delete('/api/v1/genres/comedy/')
+        admin_client.delete('/api/v1/categories/films/')
+        call_command('rebuild_leaderboards', '--verify', stdout=StringIO())
+
+    def test_03_rebuild(self, leaderboard_settings, admin_client,
+                        user_client, moderator_client, client):
+        from reviews.models import LeaderboardEntry
+
+        terminator, die_hard, _ = self.catalog(
+            admin_client, user_client, moderator_client
+        )
+        call_command('rebuild_leaderboards', '--verify', stdout=StringIO())
+        expected = self.top(client, '/api/v1/genres/comedy/top/')
+        LeaderboardEntry.objects.filter(title_id=terminator).update(
+            average=0
+        )
+        LeaderboardEntry.objects.filter(
+            title_id=die_hard, kind=LeaderboardEntry.GENRE
+        ).delete()
+
+        with pytest.raises(CommandError):
+            call_command(
+                'rebuild_leaderboards', '--verify', stdout=StringIO()
+            )
+        call_command('rebuild_leaderboards', stdout=StringIO())
+        call_command('rebuild_leaderboards', '--verify', stdout=StringIO())
+        assert self.top(client, '/api/v1/genres/comedy/top/') == expected, (
+            'Команда `rebuild_leaderboards` должна восстанавливать рейтинги.'
+        )
+
+    def test_04_bad_requests(self, admin_client, client):
+        create_titles(admin_client)
+        for url in ('/api/v1/genres/comedy/top/?ranking=votes',
+                    '/api/v1/genres/comedy/top/?limit=0',
+                    '/api/v1/categories/films/top/?limit=101'):
+            assert client.get(url).status_code == 400, (
+                f'GET-запрос к `{url}` с неверными параметрами должен '
+                'вернуть 400.'
+            )
+        assert client.get('/api/v1/genres/unknown/top/').status_code == 404
@@ -0,0 +1,107 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre
+
+URL = '/api/v1/titles/bulk/'
+
+
+def items(count, **fields):
+    return [
+        {
+            'name': f'Сезон {idx}', 'year': 2000 + idx % 20,
+            'description': 'Новинка', 'category': 'films',
+            'genre': ['horror', 'drama'], **fields,
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30BulkTitles:
+
+    @pytest.fixture
+    def catalog(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+
+    def test_01_create(self, catalog, admin_client, client):
+        from reviews.models import Title, TitleStats
+
+        data = items(3)
+        data[1]['genre'] = ['comedy', 'comedy']
+        response = admin_client.post(URL, data, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что POST-запрос администратора к `/api/v1/titles/'
+            'bulk/` с корректными данными возвращает статус 201.'
+        )
+        ids = response.json()['ids']
+        assert len(ids) == 3
+        for title_id, item in zip(ids, data):
+            title = client.get(f'/api/v1/titles/{title_id}/').json()
+            assert title['name'] == item['name'], (
+                'id в ответе должны идти в порядке элементов запроса.'
+            )
+            assert sorted(genre['slug'] for genre in title['genre']) == \
+                sorted(set(item['genre']))
+            assert title['category']['slug'] == 'films'
+        assert TitleStats.objects.filter(pk__in=ids).count() == 3, (
+            'У созданных произведений должна быть строка статистики.'
+        )
+        response = client.get('/api/v1/titles/?search=Сезон')
+        assert response.json()['count'] == 3, (
+            'Созданные произведения должны находиться поиском.'
+        )
+        assert Title.objects.count() == 3
+
+    def test_02_queries_do_not_grow(self, catalog, admin_client):
+        counts = []
+        for count in (2, 40):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    URL, items(count, name=f'Пачка {count}'), format='json'
+                )
+            assert response.status_code == 201
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Число запросов к базе не должно зависеть от размера пачки: '
+            f'{counts}.'
+        )
+
+    def test_03_all_or_nothing(self, catalog, admin_client):
+        from reviews.models import Title
+
+        data = items(4)
+        data[1]['category'] = 'unknown'
+        data[3]['genre'] = ['drama', 'unknown']
+        data[2]['year'] = 'год'
+        response = admin_client.post(URL, data, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert len(errors) == 4 and errors[0] == {}, (
+            'Ошибки должны возвращаться списком, по элементу на '
+            'произведение.'
+        )
+        assert set(errors[1]) == {'category'}
+        assert set(errors[2]) == {'year'}
+        assert set(errors[3]) == {'genre'}
+        assert not Title.objects.exists(), (
+            'При ошибке в любом элементе не должно создаваться ничего.'
+        )
+
+    def test_04_limits_and_permissions(self, catalog, admin_client,
+                                       user_client, client, settings):
+        settings.TITLES_BULK_MAX = 2
+        response = admin_client.post(URL, items(3), format='json')
+        assert response.status_code == 400
+        response = admin_client.post(URL, items(1)[0], format='json')
+        assert response.status_code == 400, (
+            'Тело запроса должно быть списком.'
+        )
+        assert user_client.post(URL, items(1), format='json') \
+            .status_code == 403
+        response = client.post(
+            URL, items(1), content_type='application/json'
+        )
+        assert response.status_code == 401
@@ -0,0 +1,172 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+URL = '/api/v1/moderation/'
+
+
+def verify_counters():
+    for command in ('rebuild_ratings', 'rebuild_title_stats',
+                    'rebuild_leaderboards'):
+        call_command(command, '--verify', stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31Moderation:
+
+    def catalog(self, admin_client, user_client, moderator_client):
+        """Терминатор: отзывы 10 (user) и 4 (moderator), три комментария."""
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        spam = create_single_review(user_client, title_id, 'спам', 10).json()
+        review = create_single_review(
+            moderator_client, title_id, 'отзыв', 4
+        ).json()
+        comments = [
+            create_single_comment(client, title_id, review_id, 'текст')
+            .json()['id']
+            for client, review_id in (
+                (user_client, spam['id']), (user_client, review['id']),
+                (admin_client, review['id']),
+            )
+        ]
+        return title_id, spam['id'], review['id'], comments
+
+    def test_01_hide_and_unhide(self, admin_client, user_client,
+                                moderator_client, client):
+        title_id, spam, review, comments = self.catalog(
+            admin_client, user_client, moderator_client
+        )
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review}/comments/'
+        etag = client.get(reviews_url)['ETag']
+        response = moderator_client.post(
+            URL,
+            {'action': 'hide', 'reviews': [spam], 'comments': [comments[1]]},
+            format='json',
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что POST-запрос модератора к `/api/v1/moderation/` '
+            'возвращает статус 200.'
+        )
+        assert response.json() == {
+            'action': 'hide', 'reviews': 1, 'comments': 1, 'titles': 1,
+        }, 'Ответ должен содержать число затронутых объектов.'
+
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Скрытие отзыва должно менять ETag списка отзывов.'
+        )
+        assert [item['id'] for item in response.json()['results']] == [
+            review
+        ], 'Скрытый отзыв не должен выводиться в списке.'
+        assert client.get(f'{reviews_url}{spam}/').status_code == 404
+        assert client.get(
+            f'{reviews_url}{spam}/comments/'
+        ).status_code == 404, 'Комментарии скрытого отзыва недоступны.'
+        assert [
+            item['id'] for item in client.get(comments_url).json()['results']
+        ] == [comments[2]]
+        assert client.get(f'/api/v1/titles/{title_id}/').json()[
+            'rating'
+        ] == 4, 'Скрытый отзыв не должен учитываться в рейтинге.'
+        stats = client.get(f'/api/v1/titles/{title_id}/stats/').json()
+        assert (stats['reviews_count'], stats['comments_count']) == (1, 1), (
+            'Скрытые отзывы и комментарии не входят в статистику.'
+        )
+        verify_counters()
+
+        response = moderator_client.post(
+            URL, {'action': 'unhide', 'authors': ['TestUser']},
+            format='json',
+        )
+        assert response.json() == {
+            'action': 'unhide', 'reviews': 1, 'comments': 1, 'titles': 1,
+        }
+        assert client.get(f'/api/v1/titles/{title_id}/').json()[
+            'rating'
+        ] == 7
+        stats = client.get(f'/api/v1/titles/{title_id}/stats/').json()
+        assert (stats['reviews_count'], stats['comments_count']) == (2, 3), (
+            'Возвращённые отзывы и комментарии снова входят в статистику.'
+        )
+        verify_counters()
+
+    def test_02_delete(self, admin_client, user_client, moderator_client,
+                       client):
+        from reviews.models import Comment, Review
+
+        title_id, spam, review, comments = self.catalog(
+            admin_client, user_client, moderator_client
+        )
+        response = admin_client.post(
+            URL, {'action': 'delete', 'authors': ['TestUser']},
+            format='json',
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            'action': 'delete', 'reviews': 1, 'comments': 2, 'titles': 1,
+        }, (
+            'Удаляются все отзывы и комментарии автора, а с отзывом — '
+            'и комментарии к нему.'
+        )
+        assert not Review.objects.filter(pk=spam).exists()
+        assert list(
+            Comment.objects.values_list('pk', flat=True)
+        ) == [comments[2]]
+        stats = client.get(f'/api/v1/titles/{title_id}/stats/').json()
+        assert (stats['reviews_count'], stats['comments_count']) == (1, 1)
+        verify_counters()
+
+        moderator_client.post(
+            URL, {'action': 'hide', 'reviews': [review]}, format='json'
+        )
+        response = moderator_client.post(
+            URL, {'action': 'delete', 'reviews': [review, review + 100]},
+            format='json',
+        )
+        assert response.json()['reviews'] == 1, (
+            'Несуществующие id не должны мешать удалению остальных.'
+        )
+        assert client.get(f'/api/v1/titles/{title_id}/').json()[
+            'rating'
+        ] is None
+        verify_counters()
+
+    def test_03_hidden_review_signals(self, admin_client, user_client,
+                                      moderator_client, user):
+        title_id, spam, _, _ = self.catalog(
+            admin_client, user_client, moderator_client
+        )
+        moderator_client.post(
+            URL, {'action': 'hide', 'reviews': [spam]}, format='json'
+        )
+        user.delete()
+        verify_counters()
+
+    def test_04_bad_requests(self, admin_client, user_client,
+                             moderator_client, client, settings):
+        title_id, spam, _, _ = self.catalog(
+            admin_client, user_client, moderator_client
+        )
+        data = {'action': 'delete', 'reviews': [spam]}
+        assert user_client.post(URL, data, format='json').status_code == 403
+        assert client.post(
+            URL, data, content_type='application/json'
+        ).status_code == 401
+        settings.MODERATION_BATCH_MAX = 2
+        for data in ({'action': 'delete'},
+                     {'action': 'ban', 'reviews': [spam]},
+                     {'action': 'hide', 'authors': ['nobody']},
+                     {'action': 'hide', 'reviews': [1, 2, 3]}):
+            response = moderator_client.post(URL, data, format='json')
+            assert response.status_code == 400, (
+                f'POST-запрос с телом {data} должен вернуть 400.'
+            )
+        assert client.get(
+            f'/api/v1/titles/{title_id}/reviews/{spam}/'
+        ).status_code == 200, 'Неверный запрос ничего не должен менять.'